@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT ASGI APP
+Async serving mode: connections live on an event loop, renders run on executor threads
+
+Serve it with any ASGI server, for example ``uvicorn asgi:app`` (or
+SIGIL_SERVER=asgi with unified_server.py). It exposes /health, /ready,
+/api/vibes and /api/generate with the same payloads as the Flask app in
+main.py and shares its generator, render cache and executor.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MIMEAccept, MultiDict
+from werkzeug.http import parse_accept_header
+
+import main
+from encoders import get_encoder
+from render_executor import RenderQueueFull, RenderTimeout
+
+logger = logging.getLogger(__name__)
+
+# Threads that wait on renders (or run them, with the inline executor); connections cost none
+DEFAULT_ASYNC_THREADS = 32
+# Request bodies larger than this are refused before they are read in full
+MAX_BODY_BYTES = 1024 * 1024
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'GET,PUT,POST,DELETE,OPTIONS'
+}
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client goes away before its response is ready"""
+
+
+class Request:
+    """The parts of an HTTP request the routes read"""
+
+    def __init__(self, scope: Dict, body: bytes, receive: Callable[[], Awaitable[Dict]]):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        self.accept = parse_accept_header(self.headers.get('accept'), MIMEAccept)
+        self.body = body
+        self.receive = receive
+
+    def json(self) -> Optional[Dict]:
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+class Response:
+    """A complete response, or a streamed one when ``chunks`` is an iterator of bytes"""
+
+    def __init__(self, body: bytes = b'', status: int = 200, content_type: str = 'application/json',
+                 headers: Optional[Dict[str, str]] = None, chunks: Optional[Iterator[bytes]] = None):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        self.headers['Content-Type'] = content_type
+        self.chunks = chunks
+
+    @classmethod
+    def json(cls, payload: Dict, status: int = 200, headers: Optional[Dict[str, str]] = None) -> 'Response':
+        return cls(json.dumps(payload).encode('utf-8'), status, headers=headers)
+
+    def raw_headers(self) -> List[Tuple[bytes, bytes]]:
+        headers = dict(CORS_HEADERS, **self.headers)
+        if self.chunks is None:
+            headers['Content-Length'] = str(len(self.body))
+        return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+
+
+class AsyncSigilApp:
+    """ASGI application serving sigils from an event loop.
+
+    Connections cost a coroutine each; cache lookups and renders run on a
+    pool of ``threads`` threads (which, with the process executor, only
+    wait on render processes), so slow clients and long renders never hold
+    up other connections. While a render is pending the app also
+    listens for the client disconnecting; a render still waiting for a
+    thread is then dropped, and a tiled stream stops after its current
+    tile. A render that has already started runs to completion and still
+    fills the render cache.
+    """
+
+    def __init__(self, generator=None, threads: Optional[int] = None):
+        self.generator = generator or main.generator
+        self.threads = threads or int(os.getenv('SIGIL_ASYNC_THREADS', str(DEFAULT_ASYNC_THREADS)))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.disconnected = 0
+        self.routes: Dict[Tuple[str, str], Callable[[Request], Awaitable[Response]]] = {
+            ('GET', '/health'): self.health,
+            ('GET', '/ready'): self.ready,
+            ('GET', '/api/vibes'): self.vibes,
+            ('POST', '/api/generate'): self.generate,
+        }
+
+    @classmethod
+    def from_env(cls) -> 'AsyncSigilApp':
+        return cls()
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='sigil-async')
+        return self._pool
+
+    async def __call__(self, scope: Dict, receive: Callable[[], Awaitable[Dict]],
+                       send: Callable[[Dict], Awaitable[None]]):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Same per-worker warm-up as a forked gunicorn worker; /ready turns green when it is done
+                main.start_worker()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _http(self, scope, receive, send):
+        start = time.perf_counter()
+        route = self.routes.get((scope['method'], scope['path']))
+        self.in_flight += 1
+        try:
+            response = await self._respond(scope, route, receive)
+        except ClientDisconnected:
+            self.disconnected += 1
+            logger.info(f"🔌 Client left before {scope['path']} finished; render dropped")
+            return
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+
+        await send({'type': 'http.response.start', 'status': response.status,
+                    'headers': response.raw_headers()})
+        if response.chunks is None:
+            await send({'type': 'http.response.body', 'body': response.body})
+        else:
+            await self._stream(response.chunks, receive, send)
+        endpoint = scope['path'] if route is not None else 'unmatched'
+        main.metrics.observe_request(endpoint, scope['method'], response.status, time.perf_counter() - start)
+
+    async def _respond(self, scope, route, receive) -> Response:
+        if scope['method'] == 'OPTIONS':
+            return Response(status=204, content_type='text/plain')
+        if route is None:
+            logger.warning(f"404 - Path not found: {scope['path']}")
+            return Response.json({'success': False, 'error': 'Endpoint not found', 'code': 404,
+                                  'path': scope['path']}, 404)
+        body = await self._read_body(receive)
+        if body is None:
+            return Response.json({'success': False, 'error': 'Request body too large'}, 413)
+        return await route(Request(scope, body, receive))
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            body += message.get('body', b'')
+            if len(body) > MAX_BODY_BYTES:
+                return None
+            if not message.get('more_body'):
+                return bytes(body)
+
+    async def _stream(self, chunks: Iterator[bytes], receive, send):
+        """Send a stream's chunks as they are produced, stopping it if the client leaves"""
+        loop = asyncio.get_running_loop()
+        disconnect = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                pending = loop.run_in_executor(self.pool, next, chunks, None)
+                await asyncio.wait({pending, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+                if not pending.done():
+                    raise ClientDisconnected()
+                chunk = pending.result()
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        except ClientDisconnected:
+            self.disconnected += 1
+            logger.info("🔌 Client left during a tiled stream; remaining tiles dropped")
+            # The tile being rendered cannot be interrupted: stop after it, and let it finish before
+            # closing, since a generator cannot be closed while another thread is running it
+            getattr(chunks, 'cancel', lambda: None)()
+            await asyncio.gather(pending, return_exceptions=True)
+        finally:
+            disconnect.cancel()
+            # Runs the stream's cleanup, which releases its memory reservation
+            await loop.run_in_executor(self.pool, chunks.close)
+
+    async def _unless_disconnected(self, receive, work: Awaitable):
+        """Await ``work``, cancelling it and raising :class:`ClientDisconnected` if the client leaves first"""
+        work = asyncio.ensure_future(work)
+        disconnect = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not disconnect.done():
+                disconnect.cancel()
+        if work.done():
+            return work.result()
+        # A render still queued for a thread is dropped here; a running one finishes in the background
+        work.cancel()
+        raise ClientDisconnected()
+
+    @staticmethod
+    async def _wait_for_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _offload(self, request: Request, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await self._unless_disconnected(request.receive, loop.run_in_executor(self.pool, fn, *args))
+
+    # ===== Routes =====
+
+    async def health(self, request: Request) -> Response:
+        payload = main.health_status()
+        payload['server'] = self.stats()
+        return Response.json(payload)
+
+    async def ready(self, request: Request) -> Response:
+        state = main.readiness.stats()
+        return Response.json(state, 200 if state['ready'] else 503)
+
+    async def vibes(self, request: Request) -> Response:
+        return Response.json(main.vibes_payload())
+
+    async def generate(self, request: Request) -> Response:
+        start_time = datetime.now()
+        data = request.json()
+        if not data:
+            return Response.json({'success': False, 'error': 'Invalid JSON data'}, 400)
+        params, error = main._parse_generate_params(data, request.args)
+        if error:
+            return Response.json({'success': False, 'error': error}, 400)
+        phrase, vibe, advanced, seed_version, encoder, size = params
+        logger.info(f"🎨 Generating ultra-revolutionary sigil: '{phrase}' ({vibe}) [Advanced: {advanced}]")
+
+        try:
+            # Both hash the request, and the tiling check looks in the disk cache; neither belongs on the loop
+            render_key, streams = await self._offload(request, self._plan_generate, params, data, request)
+            if streams:
+                chunks = await self._open_stream(request, params)
+                return Response(status=200, content_type=get_encoder(encoder).mimetype,
+                                headers=main._tiled_headers(params, render_key), chunks=chunks)
+
+            image_bytes, encoding = await self._offload(request, self.generator.generate_sigil_image, *params)
+            duration = (datetime.now() - start_time).total_seconds()
+            logger.info(f"✅ Ultra-revolutionary sigil generated in {duration:.2f}s")
+
+            if main._wants_binary(data, encoding['mimetype'], request.args, request.accept):
+                return Response(image_bytes, content_type=encoding['mimetype'],
+                                headers=main._generated_headers(params, render_key, encoding, duration))
+            return Response.json(main._generated_payload(params, render_key, image_bytes, encoding, duration),
+                                 headers={'Server-Timing': main._server_timing(encoding, duration)})
+
+        except ClientDisconnected:
+            raise
+
+        except (RenderQueueFull, RenderTimeout) as e:
+            duration = (datetime.now() - start_time).total_seconds()
+            logger.warning(f"⚠️ Render rejected after {duration:.2f}s: {e}")
+            return Response.json({'success': False, 'error': str(e), 'duration': duration,
+                                  'timestamp': datetime.now().isoformat()},
+                                 503 if isinstance(e, RenderQueueFull) else 504)
+
+        except Exception as e:
+            duration = (datetime.now() - start_time).total_seconds()
+            logger.error(f"❌ Ultra-revolutionary generation failed after {duration:.2f}s: {e}")
+            return Response.json({'success': False, 'error': str(e), 'duration': duration,
+                                  'timestamp': datetime.now().isoformat()}, 500)
+
+    def _plan_generate(self, params: Tuple, data: Dict, request: Request) -> Tuple[str, bool]:
+        render_key = self.generator.render_key(*params)
+        return render_key, main._streams_tiles(params, render_key, data, request.args, request.accept)
+
+    async def _open_stream(self, request: Request, params: Tuple):
+        """Open a tiled stream on a thread; if the client leaves first, close it as soon as it is open"""
+        loop = asyncio.get_running_loop()
+        opening = loop.run_in_executor(self.pool, self.generator.open_tiled_stream, *params)
+        try:
+            return await self._unless_disconnected(request.receive, asyncio.shield(opening))
+        except ClientDisconnected:
+            def close(future: asyncio.Future):
+                if not future.cancelled() and future.exception() is None:
+                    self.pool.submit(future.result().close)
+            # An open stream holds memory and leads a single-flight call until it is closed
+            opening.add_done_callback(close)
+            raise
+
+    def stats(self) -> Dict:
+        return {
+            'mode': 'asgi',
+            'threads': self.threads,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'disconnected': self.disconnected
+        }
+
+
+app = AsyncSigilApp.from_env()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER BENCHMARK
+Times the render pipeline stage by stage over a fixed corpus and diffs runs
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import PIL
+
+from main import UltraRevolutionarySigilGenerator, NUMPY_AVAILABLE
+from render_memory import peak_rss_bytes
+
+# Fixed corpus: short, long, repeated, punctuated and non-ASCII phrases
+CORPUS = (
+    "I am calm",
+    "abundance flows to me",
+    "I attract love and light into my life every day",
+    "protection",
+    "clarity, focus & courage!",
+    "Ünïcödé straße İstanbul 🌟",
+    "the quick brown fox jumps over the lazy dog again and again",
+    "x y",
+)
+
+# In pipeline order; 'rasterize' replays the scene into the canvas
+STAGES = ('seed', 'base', 'text', 'vibe', 'rasterize', 'effects', 'resize', 'encode')
+PERCENTILES = (50, 95, 99)
+# Metrics compared by diff_reports; lower is better for all of them
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'peak_traced_bytes')
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """``q``-th percentile of ``values`` with linear interpolation, like numpy's default"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class StageRecorder:
+    """``stage_timer`` for the generator: records per-stage durations and, optionally, memory.
+
+    Memory is the peak of allocations traced by tracemalloc while the stage
+    runs (NumPy buffers included), above what was allocated when it started.
+    Pillow allocates pixel data outside tracemalloc, so canvases themselves
+    do not show up.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.current: Dict[str, float] = defaultdict(float)
+        self.peaks: Dict[str, int] = defaultdict(int)
+
+    def start_render(self):
+        self.current = defaultdict(float)
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        if self.trace_memory:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[stage] += (time.perf_counter() - start) * 1000
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                self.peaks[stage] = max(self.peaks[stage], peak)
+
+
+def _summary(samples: List[float]) -> Dict:
+    summary = {f'p{q}_ms': round(percentile(samples, q), 3) for q in PERCENTILES}
+    summary['mean_ms'] = round(sum(samples) / len(samples), 3) if samples else 0.0
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(phrases: Iterable[str] = CORPUS, vibes: Optional[Iterable[str]] = None,
+                  advanced: Iterable[bool] = (False, True), iterations: int = 1, encoder: str = 'png',
+                  size: Optional[int] = None, trace_memory: bool = True,
+                  generator: Optional[UltraRevolutionarySigilGenerator] = None) -> Dict:
+    """Render phrases x vibes ``iterations`` times per advanced setting and summarise.
+
+    Renders call ``_render_image`` directly, so the cache, executors and
+    request coalescing are bypassed and every sample is a full render. Each
+    combination is rendered once untimed first to warm templates and pools.
+    With ``trace_memory`` a further pass under tracemalloc records peak
+    memory per stage; it is kept out of the timed samples because tracing
+    slows allocation-heavy stages down.
+    """
+    generator = generator or UltraRevolutionarySigilGenerator()
+    phrases = list(phrases)
+    vibes = list(vibes or generator.vibe_styles)
+    seed_version = generator.resolve_seed_version()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pillow': PIL.__version__,
+            'numpy': NUMPY_AVAILABLE,
+            'glow_engine': generator.glow_engine,
+            'render_mode': generator.render_mode,
+            'encoder': encoder,
+            'size': generator.resolve_size(size, encoder),
+            'phrases': len(phrases),
+            'vibes': vibes,
+            'iterations': iterations
+        },
+        'groups': {}
+    }
+
+    recorder = StageRecorder()
+    previous_timer, generator.stage_timer = generator.stage_timer, recorder
+    try:
+        for advanced_flag in advanced:
+            combos = [(phrase, vibe) for phrase in phrases for vibe in vibes]
+            for phrase, vibe in combos:
+                generator._render_image(phrase, vibe, advanced_flag, seed_version, encoder, size)
+
+            totals: List[float] = []
+            per_vibe: Dict[str, List[float]] = defaultdict(list)
+            per_stage: Dict[str, List[float]] = defaultdict(list)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for phrase, vibe in combos:
+                    recorder.start_render()
+                    start = time.perf_counter()
+                    generator._render_image(phrase, vibe, advanced_flag, seed_version, encoder, size)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    totals.append(elapsed)
+                    per_vibe[vibe].append(elapsed)
+                    for stage, ms in recorder.current.items():
+                        per_stage[stage].append(ms)
+            wall = time.perf_counter() - started
+
+            group = {
+                'renders': len(totals),
+                'throughput_rps': round(len(totals) / wall, 3) if wall else 0.0,
+                'total': _summary(totals),
+                'stages': {stage: _summary(per_stage[stage]) for stage in STAGES if per_stage.get(stage)},
+                'vibes': {vibe: _summary(samples) for vibe, samples in per_vibe.items()}
+            }
+            if trace_memory:
+                for stage, peak in _trace_stage_memory(generator, combos, advanced_flag, seed_version,
+                                                       encoder, size).items():
+                    group['stages'].setdefault(stage, {})['peak_traced_bytes'] = peak
+            report['groups']['advanced' if advanced_flag else 'basic'] = group
+    finally:
+        generator.stage_timer = previous_timer
+
+    report['meta']['peak_rss_bytes'] = peak_rss_bytes()
+    return report
+
+
+def _trace_stage_memory(generator: UltraRevolutionarySigilGenerator, combos: List, advanced: bool,
+                        seed_version: int, encoder: str, size: Optional[int]) -> Dict[str, int]:
+    recorder = StageRecorder(trace_memory=True)
+    previous_timer, generator.stage_timer = generator.stage_timer, recorder
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        for phrase, vibe in combos:
+            generator._render_image(phrase, vibe, advanced, seed_version, encoder, size)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+        generator.stage_timer = previous_timer
+    return dict(recorder.peaks)
+
+
+def diff_reports(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[Dict]:
+    """Metrics of ``current`` more than ``threshold`` (a fraction) worse than ``baseline``"""
+    regressions = []
+    for group_name, group in current.get('groups', {}).items():
+        old_group = baseline.get('groups', {}).get(group_name)
+        if old_group is None:
+            continue
+        sections = [('total', group['total'], old_group.get('total', {}))]
+        sections += [(f'stages.{stage}', metrics, old_group.get('stages', {}).get(stage, {}))
+                     for stage, metrics in group.get('stages', {}).items()]
+        for path, metrics, old_metrics in sections:
+            for metric in COMPARED_METRICS:
+                old, new = old_metrics.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if change > threshold:
+                    regressions.append({'metric': f'{group_name}.{path}.{metric}', 'baseline': old,
+                                        'current': new, 'change': round(change, 4)})
+
+        old_rps = old_group.get('throughput_rps')
+        if old_rps and group['throughput_rps'] < old_rps * (1 - threshold):
+            regressions.append({'metric': f'{group_name}.throughput_rps', 'baseline': old_rps,
+                                'current': group['throughput_rps'],
+                                'change': round(group['throughput_rps'] / old_rps - 1, 4)})
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable table of a benchmark report"""
+    lines = []
+    meta = report['meta']
+    lines.append(f"Sigilcraft render benchmark @ {meta.get('commit') or 'unknown'} "
+                 f"({meta['glow_engine']} glow, {meta['render_mode']}, {meta['encoder']}, {meta['size']} px)")
+    for name, group in report['groups'].items():
+        total = group['total']
+        lines.append('')
+        lines.append(f"{name}: {group['renders']} renders, {group['throughput_rps']:.2f} renders/s, "
+                     f"p50 {total['p50_ms']:.1f} ms, p95 {total['p95_ms']:.1f} ms, p99 {total['p99_ms']:.1f} ms")
+        lines.append(f"  {'stage':<10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MiB':>9}")
+        for stage, metrics in group['stages'].items():
+            peak = metrics.get('peak_traced_bytes')
+            peak_text = f"{peak / 2**20:9.1f}" if peak is not None else f"{'-':>9}"
+            lines.append(f"  {stage:<10} {metrics.get('p50_ms', 0):9.2f} {metrics.get('p95_ms', 0):9.2f} "
+                         f"{metrics.get('p99_ms', 0):9.2f} {peak_text}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the Sigilcraft render pipeline')
+    parser.add_argument('--phrases', type=int, default=len(CORPUS),
+                        help='number of corpus phrases to render (default: all)')
+    parser.add_argument('--vibes', nargs='+', help='vibes to render (default: all)')
+    parser.add_argument('--mode', choices=('both', 'basic', 'advanced'), default='both')
+    parser.add_argument('--iterations', type=int, default=1, help='timed passes over the corpus')
+    parser.add_argument('--encoder', default='png')
+    parser.add_argument('--size', type=int)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', help='JSON report to compare against; exits 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed slowdown as a fraction before a metric counts as regressed')
+    args = parser.parse_args(argv)
+
+    # Per-render info logs would drown the report
+    logging.getLogger('main').setLevel(logging.WARNING)
+    advanced = {'both': (False, True), 'basic': (False,), 'advanced': (True,)}[args.mode]
+    report = run_benchmark(CORPUS[:args.phrases], args.vibes, advanced, args.iterations, args.encoder,
+                           args.size, trace_memory=not args.no_memory)
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n💾 Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = diff_reports(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}:")
+            for item in regressions:
+                print(f"  {item['metric']}: {item['baseline']} -> {item['current']} ({item['change']:+.1%})")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT OUTPUT ENCODERS
+Registry of image encoders trading encode CPU against output size
+"""
+
+import os
+import time
+import zlib
+import struct
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, features
+
+
+class ImageEncoder:
+    """Encodes a finished RGBA sigil into one output format"""
+
+    # Raster encoders take pixels; vector ones take the scene graph instead
+    vector = False
+
+    def __init__(self, name: str, format: str, mimetype: str, extension: str,
+                 background: Optional[Tuple[int, int, int]] = None, **save_options):
+        self.name = name
+        self.format = format
+        self.mimetype = mimetype
+        self.extension = extension
+        # Formats without alpha are flattened onto this colour first
+        self.background = background
+        self.save_options = save_options
+
+    def encode(self, img: Image.Image) -> bytes:
+        if self.background is not None:
+            flat = Image.new('RGB', img.size, self.background)
+            flat.paste(img, mask=img.getchannel('A'))
+            img = flat
+        buffer = BytesIO()
+        img.save(buffer, format=self.format, **self.save_options)
+        return buffer.getvalue()
+
+    def describe(self) -> Dict:
+        return {
+            'name': self.name,
+            'mimetype': self.mimetype,
+            'extension': self.extension,
+            'options': dict(self.save_options)
+        }
+
+
+class SvgEncoder:
+    """Serializes a sigil's scene graph (see scene.py) instead of encoding pixels"""
+
+    vector = True
+
+    def __init__(self, name: str = 'svg'):
+        self.name = name
+        self.format = 'SVG'
+        self.mimetype = 'image/svg+xml'
+        self.extension = 'svg'
+
+    def encode(self, scene) -> bytes:
+        return scene.to_svg().encode('utf-8')
+
+    def describe(self) -> Dict:
+        return {
+            'name': self.name,
+            'mimetype': self.mimetype,
+            'extension': self.extension,
+            'options': {}
+        }
+
+
+class PngStreamWriter:
+    """Incremental RGBA PNG encoder for images too large to hold in memory.
+
+    Rows are fed in bands as HxWx4 uint8 arrays and come out as compressed
+    IDAT chunks, so only one band and the zlib window are held at a time.
+    Rows use PNG's Sub filter, which suits the mostly transparent sigils.
+    """
+
+    CHUNK_BYTES = 256 * 1024
+
+    def __init__(self, width: int, height: int, compress_level: int = 6):
+        self.width = width
+        self.height = height
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = []
+        self._pending_bytes = 0
+        self.rows_written = 0
+
+    @staticmethod
+    def _chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    def header(self) -> bytes:
+        ihdr = struct.pack('>IIBBBBB', self.width, self.height, 8, 6, 0, 0, 0)
+        return b'\x89PNG\r\n\x1a\n' + self._chunk(b'IHDR', ihdr)
+
+    def write_rows(self, rows) -> bytes:
+        """Compress a band of rows, returning any IDAT chunks that are ready"""
+        import numpy as np
+        height = rows.shape[0]
+        filtered = np.empty((height, self.width * 4 + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        flat = rows.reshape(height, self.width * 4)
+        filtered[:, 1:5] = flat[:, :4]
+        np.subtract(flat[:, 4:], flat[:, :-4], out=filtered[:, 5:])
+        self.rows_written += height
+        return self._emit(self._compressor.compress(filtered.tobytes()))
+
+    def finish(self) -> bytes:
+        if self.rows_written != self.height:
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+        tail = self._emit(self._compressor.flush(), force=True)
+        return tail + self._chunk(b'IEND', b'')
+
+    def _emit(self, data: bytes, force: bool = False) -> bytes:
+        if data:
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        if not self._pending or (self._pending_bytes < self.CHUNK_BYTES and not force):
+            return b''
+        chunk = self._chunk(b'IDAT', b''.join(self._pending))
+        self._pending, self._pending_bytes = [], 0
+        return chunk
+
+
+ENCODERS: Dict[str, ImageEncoder] = {}
+
+def register_encoder(encoder: ImageEncoder):
+    """Add or replace an encoder in the registry"""
+    ENCODERS[encoder.name] = encoder
+
+def get_encoder(name: Optional[str] = None) -> ImageEncoder:
+    """Look up an encoder by name, defaulting to SIGIL_DEFAULT_ENCODER"""
+    name = name or DEFAULT_ENCODER
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown encoder: {name} (available: {sorted(ENCODERS)})")
+    return ENCODERS[name]
+
+def encode_image(img: Image.Image, name: Optional[str] = None) -> Tuple[bytes, Dict]:
+    """Encode ``img`` and report what it cost"""
+    encoder = get_encoder(name)
+    if encoder.vector:
+        raise ValueError(f"Encoder {encoder.name} encodes scenes, not images")
+    return _timed_encode(encoder, img)
+
+def encode_scene(scene, name: str) -> Tuple[bytes, Dict]:
+    """Serialize a scene graph with a vector encoder and report what it cost"""
+    encoder = get_encoder(name)
+    if not encoder.vector:
+        raise ValueError(f"Encoder {encoder.name} encodes images, not scenes")
+    return _timed_encode(encoder, scene)
+
+def _timed_encode(encoder, source) -> Tuple[bytes, Dict]:
+    start = time.perf_counter()
+    data = encoder.encode(source)
+    encode_ms = (time.perf_counter() - start) * 1000
+    return data, {
+        'encoder': encoder.name,
+        'mimetype': encoder.mimetype,
+        'bytes': len(data),
+        'encode_ms': round(encode_ms, 3)
+    }
+
+
+# The original output: smallest PNG, slowest to produce
+register_encoder(ImageEncoder('png', 'PNG', 'image/png', 'png', optimize=True, compress_level=6))
+register_encoder(ImageEncoder('png-fast', 'PNG', 'image/png', 'png', compress_level=1))
+register_encoder(ImageEncoder('jpeg', 'JPEG', 'image/jpeg', 'jpg', background=(0, 0, 0),
+                              quality=85, optimize=False))
+
+if features.check('webp'):
+    register_encoder(ImageEncoder('webp', 'WEBP', 'image/webp', 'webp', quality=80, method=2))
+    register_encoder(ImageEncoder('webp-lossless', 'WEBP', 'image/webp', 'webp', lossless=True,
+                                  quality=25, method=1))
+
+if features.check('avif'):
+    register_encoder(ImageEncoder('avif', 'AVIF', 'image/avif', 'avif', quality=60, speed=8))
+
+# Resolution-independent output straight from the scene graph; glow becomes an SVG filter
+register_encoder(SvgEncoder())
+
+DEFAULT_ENCODER = os.getenv('SIGIL_DEFAULT_ENCODER', 'png')
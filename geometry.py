@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT GEOMETRY ENGINE
+Turns a phrase into NumPy arrays describing every glyph, without rasterizing
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Glyph caps of the original sigil design; None lifts them (dense geometry)
+BASE_GLYPH_LIMIT = 12
+WORD_GLYPH_LIMIT = 8
+
+# Shape kinds, indexed by the ``shape`` arrays below
+BASE_SHAPES = ('ellipse', 'cross', 'hexagon')
+WORD_SHAPES = ('triangle', 'square', 'hexagon')
+
+
+def codepoints(text: str) -> np.ndarray:
+    """Code point of every character in ``text`` as int64"""
+    raw = text.encode('utf-32-le', errors='surrogatepass')
+    return np.frombuffer(raw, dtype='<u4').astype(np.int64)
+
+
+def polar(center: int, radius: np.ndarray, angle: np.ndarray):
+    """Cartesian coordinates of points ``radius`` away from ``(center, center)`` at ``angle`` degrees"""
+    theta = np.radians(angle)
+    return center + radius * np.cos(theta), center + radius * np.sin(theta)
+
+
+def regular_polygons(x: np.ndarray, y: np.ndarray, radius: np.ndarray, sides: int) -> np.ndarray:
+    """Vertices of one regular polygon per centre, shaped (N, sides, 2)"""
+    theta = np.radians(np.arange(sides) * (360 // sides))
+    vertices = np.empty((len(x), sides, 2))
+    vertices[:, :, 0] = x[:, None] + radius[:, None] * np.cos(theta)
+    vertices[:, :, 1] = y[:, None] + radius[:, None] * np.sin(theta)
+    return vertices
+
+
+def base_glyphs(phrase: str, size: int, n_colors: int,
+                limit: Optional[int] = BASE_GLYPH_LIMIT) -> Dict[str, np.ndarray]:
+    """One glyph per character: a ring of ellipses, crosses and hexagons.
+
+    Returns arrays ``x``, ``y``, ``angle``, ``radius``, ``size_factor``,
+    ``color`` (index into the vibe palette), ``shape`` (index into
+    :data:`BASE_SHAPES`) and ``vertices`` (hexagon corners for every glyph).
+    """
+    codes = codepoints(phrase)[:limit]
+    index = np.arange(len(codes))
+
+    angle = (codes * 13 + index * 30) % 360
+    radius = size // 10 + codes % (size // 20)
+    x, y = polar(size // 2, radius, angle)
+    size_factor = np.maximum(3, codes % 15)
+
+    return {
+        'x': x,
+        'y': y,
+        'angle': angle,
+        'radius': radius,
+        'size_factor': size_factor,
+        'color': index % n_colors,
+        'shape': codes % 3,
+        'vertices': regular_polygons(x, y, size_factor, 6)
+    }
+
+
+def word_glyphs(phrase: str, size: int, n_colors: int,
+                limit: Optional[int] = WORD_GLYPH_LIMIT) -> Dict[str, np.ndarray]:
+    """One glyph per word: triangles, squares and hexagons tied to the centre.
+
+    Returns arrays ``x``, ``y``, ``angle``, ``distance``, ``energy`` (sum of
+    the lowercased code points), ``color``, ``shape`` (index into
+    :data:`WORD_SHAPES`) and ``extent`` (the shape's radius or half-width).
+    """
+    words = phrase.split()[:limit]
+    index = np.arange(len(words))
+    lengths = np.array([len(word) for word in words], dtype=np.int64)
+
+    lowered = [word.lower() for word in words]
+    energy = np.zeros(len(words), dtype=np.int64)
+    if words:
+        offsets = np.cumsum([0] + [len(word) for word in lowered[:-1]])
+        energy = np.add.reduceat(codepoints(''.join(lowered)), offsets)
+
+    angle = (energy * 7 + index * 45) % 360
+    distance = size // 6 + lengths * size // 40
+    x, y = polar(size // 2, distance, angle)
+    shape = np.where(lengths <= 3, 0, np.where(lengths <= 6, 1, 2))
+    extent = np.array([size // 40, size // 50, size // 35], dtype=np.int64)[shape]
+
+    return {
+        'x': x,
+        'y': y,
+        'angle': angle,
+        'distance': distance,
+        'energy': energy,
+        'color': (energy + index) % n_colors,
+        'shape': shape,
+        'extent': extent
+    }
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT GUNICORN HOOKS
+Loaded by unified_server.py with ``--config python:gunicorn_config``
+"""
+
+
+def post_fork(server, worker):
+    """Warm each forked worker's render pool before it is reported ready on /ready"""
+    from main import start_worker
+    start_worker()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT LOAD TEST
+Drives /api/generate at rising concurrency and reports throughput, latency, errors, CPU and RSS
+
+    python loadtest.py --concurrency 1 2 4 8 --duration 10
+    python loadtest.py --url http://127.0.0.1:5000 --concurrency 4 16 64
+    python loadtest.py --spawn --concurrency 1 4 16 --output load.json
+
+Requests are closed-loop: each of the step's N clients sends a request,
+waits for the answer and sends the next one. Phrases follow a Zipf
+distribution over a synthetic corpus (popular phrases repeat, as in
+production traffic), vibes follow a weighted mix and a fraction of
+requests is advanced.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import threading
+import subprocess
+import http.client
+import logging
+from bisect import bisect
+from collections import Counter
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from benchmark import CORPUS, _git_commit, percentile
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+DEFAULT_VIBES = ('mystical', 'cosmic', 'elemental', 'crystal', 'shadow', 'light', 'storm', 'void')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class Workload:
+    """Reproducible stream of /api/generate payloads.
+
+    Phrase ``i`` of ``phrases`` is drawn with probability proportional to
+    ``1 / (i + 1) ** zipf_s``; ``vibes`` maps vibe names to relative weights.
+    """
+
+    def __init__(self, phrases: int = 200, zipf_s: float = 1.1, vibes: Optional[Dict[str, float]] = None,
+                 advanced_ratio: float = 0.1, size: Optional[int] = None, binary: bool = False):
+        self.phrases = [f"{CORPUS[i % len(CORPUS)]} {i}" for i in range(max(1, phrases))]
+        self._phrase_cdf = list(accumulate(1.0 / (rank + 1) ** zipf_s for rank in range(len(self.phrases))))
+        vibes = vibes or {vibe: 1.0 for vibe in DEFAULT_VIBES}
+        self.vibe_weights = dict(vibes)
+        self.vibes = list(vibes)
+        self._vibe_cdf = list(accumulate(vibes.values()))
+        self.advanced_ratio = advanced_ratio
+        self.size = size
+        self.binary = binary
+
+    @staticmethod
+    def _pick(rng: random.Random, items: List, cdf: List[float]):
+        return items[min(bisect(cdf, rng.random() * cdf[-1]), len(items) - 1)]
+
+    def next_payload(self, rng: random.Random) -> Dict:
+        payload = {'phrase': self._pick(rng, self.phrases, self._phrase_cdf),
+                   'vibe': self._pick(rng, self.vibes, self._vibe_cdf),
+                   'advanced': rng.random() < self.advanced_ratio}
+        if self.size:
+            payload['size'] = self.size
+        if self.binary:
+            payload['format'] = 'binary'
+        return payload
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """``'cosmic=3,storm=1'`` (or ``'cosmic,storm'`` for equal weights) -> weights"""
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight) if weight else 1.0
+    if not mix or any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError(f"Invalid vibe mix: {text!r}")
+    return mix
+
+
+# ===== TARGETS =====
+
+class InProcessTarget:
+    """The Flask app driven through its test client, one client per load thread"""
+
+    name = 'inprocess'
+
+    def __init__(self, app=None):
+        if app is None:
+            from main import app
+        self.app = app
+        self.pid = os.getpid()
+        self._local = threading.local()
+
+    def post(self, path: str, payload: Dict) -> Tuple[int, Dict[str, str]]:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(path, json=payload)
+        response.get_data()
+        return response.status_code, dict(response.headers)
+
+    def close(self):
+        pass
+
+
+class HttpTarget:
+    """A running server, over one keep-alive connection per load thread"""
+
+    name = 'http'
+
+    def __init__(self, base_url: str, timeout: float = 120.0, pid: Optional[int] = None):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        # Server process whose CPU and RSS are reported; None when it is not local
+        self.pid = pid
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port,
+                                                                             timeout=self.timeout)
+        return connection
+
+    def get(self, path: str) -> int:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request('GET', self.prefix + path)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def post(self, path: str, payload: Dict) -> Tuple[int, Dict[str, str]]:
+        connection = self._connection()
+        try:
+            connection.request('POST', self.prefix + path, body=json.dumps(payload),
+                               headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status, dict(response.getheaders())
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+
+
+class SpawnedServer:
+    """Starts ``command`` on ``port`` and waits until /ready answers 200"""
+
+    def __init__(self, command: Sequence[str], port: int, startup_timeout: float = 120.0):
+        self.command = list(command)
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> HttpTarget:
+        env = dict(os.environ, PORT=str(self.port))
+        self.process = subprocess.Popen(self.command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        cwd=os.path.dirname(os.path.abspath(__file__)))
+        target = HttpTarget(f'http://127.0.0.1:{self.port}', pid=self.process.pid)
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {self.process.returncode} during start-up")
+            try:
+                status = target.get('/ready')
+                if status == 404:
+                    # Servers from before /ready existed
+                    status = target.get('/health')
+                if status == 200:
+                    return target
+            except OSError:
+                pass
+            time.sleep(0.25)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"Server was not ready within {self.startup_timeout}s")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+# ===== RESOURCE SAMPLING =====
+
+def _proc_tree(pid: int) -> List[int]:
+    """``pid`` and all of its descendants, from /proc"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, ()))
+    return tree
+
+
+def process_usage(pid: Optional[int]) -> Optional[Dict[str, float]]:
+    """CPU seconds and resident bytes of ``pid`` and its children (render pools included).
+
+    Uses /proc; elsewhere only the current process can be measured, with
+    its peak rather than current RSS. None when ``pid`` cannot be measured.
+    """
+    if pid is None:
+        return None
+    if not os.path.isdir('/proc'):
+        if pid != os.getpid():
+            return None
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return {'cpu_seconds': usage.ru_utime + usage.ru_stime, 'rss_bytes': usage.ru_maxrss * scale}
+    cpu, rss = 0.0, 0
+    for member in _proc_tree(pid):
+        try:
+            with open(f'/proc/{member}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            rss += int(fields[21]) * resource.getpagesize()
+        except (OSError, IndexError, ValueError):
+            continue
+    return {'cpu_seconds': cpu, 'rss_bytes': rss}
+
+
+class UsageSampler:
+    """Polls :func:`process_usage` during a step to catch the peak RSS"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sigil-load-sampler', daemon=True)
+
+    def __enter__(self) -> 'UsageSampler':
+        self.start = process_usage(self.pid)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end = process_usage(self.pid)
+
+    def _run(self):
+        while True:
+            usage = process_usage(self.pid)
+            if usage:
+                self.peak_rss = max(self.peak_rss, usage['rss_bytes'])
+            if self._stop.wait(self.interval):
+                return
+
+
+# ===== RUNNER =====
+
+def _cache_outcome(headers: Dict[str, str]) -> Optional[str]:
+    timing = next((value for name, value in headers.items() if name.lower() == 'server-timing'), '')
+    if timing.startswith('cache;desc="'):
+        return timing[len('cache;desc="'):].split('"', 1)[0]
+    return None
+
+
+def run_step(target, workload: Workload, concurrency: int, duration: Optional[float] = None,
+             requests: Optional[int] = None, seed: int = 0) -> Dict:
+    """Run ``concurrency`` closed-loop clients for ``duration`` seconds or ``requests`` requests in total"""
+    if duration is None and requests is None:
+        raise ValueError("run_step needs a duration or a request count")
+    samples: List[Tuple[float, object, Optional[str]]] = []
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = time.perf_counter() + duration if duration is not None else None
+
+    def claim() -> bool:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if remaining[0] is None:
+            return True
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def client(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while claim():
+            payload = workload.next_payload(rng)
+            start = time.perf_counter()
+            try:
+                status, headers = target.post('/api/generate', payload)
+                outcome = status
+                cache = _cache_outcome(headers)
+            except Exception as e:
+                outcome, cache = type(e).__name__, None
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append((elapsed, outcome, cache))
+        target.close()
+
+    with UsageSampler(target.pid) as usage:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(index,), name=f'sigil-load-{index}')
+                   for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+    return summarize_step(concurrency, samples, wall, usage)
+
+
+def summarize_step(concurrency: int, samples: List[Tuple[float, object, Optional[str]]], wall: float,
+                   usage: Optional[UsageSampler] = None) -> Dict:
+    latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+    outcomes = Counter(str(outcome) for _, outcome, _ in samples)
+    errors = {outcome: count for outcome, count in outcomes.items() if outcome != '200'}
+    caches = Counter(cache for _, _, cache in samples if cache)
+    step = {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'wall_seconds': round(wall, 3),
+        'rps': round(len(samples) / wall, 3) if wall else 0.0,
+        'latency_ms': {f'p{q}': round(percentile(latencies, q), 3) for q in LATENCY_PERCENTILES},
+        'error_rate': round(sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        'errors': errors,
+        'cache': dict(caches)
+    }
+    step['latency_ms']['max'] = round(max(latencies), 3) if latencies else 0.0
+    if usage is not None and usage.start and usage.end:
+        cpu = usage.end['cpu_seconds'] - usage.start['cpu_seconds']
+        step['cpu_seconds'] = round(cpu, 3)
+        # Percent of one core; above 100 when renders run on several
+        step['cpu_percent'] = round(cpu / wall * 100, 1) if wall else 0.0
+        step['rss_bytes'] = usage.end['rss_bytes']
+        step['peak_rss_bytes'] = max(usage.peak_rss, usage.end['rss_bytes'])
+    return step
+
+
+def run_load_test(target, workload: Workload, concurrency: Sequence[int], duration: Optional[float] = 10.0,
+                  requests: Optional[int] = None, warmup: int = 0, seed: int = 0) -> Dict:
+    """Run one step per concurrency level against ``target`` and collect the report"""
+    if warmup:
+        run_step(target, workload, 1, requests=warmup, seed=seed)
+    steps = [run_step(target, workload, level, duration, requests, seed=seed + index)
+             for index, level in enumerate(concurrency)]
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'target': target.name,
+            'phrases': len(workload.phrases),
+            'vibes': workload.vibe_weights,
+            'advanced_ratio': workload.advanced_ratio,
+            'size': workload.size,
+            'binary': workload.binary,
+            'duration': duration,
+            'requests_per_step': requests
+        },
+        'steps': steps
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Throughput-vs-concurrency table"""
+    meta = report['meta']
+    lines = [f"Sigilcraft load test @ {meta.get('commit') or 'unknown'} ({meta['target']}, "
+             f"{meta['phrases']} phrases, {meta['advanced_ratio']:.0%} advanced)",
+             f"{'conc':>5} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} "
+             f"{'hit %':>6} {'cpu %':>7} {'rss MiB':>8}"]
+    for step in report['steps']:
+        latency = step['latency_ms']
+        hits = step['cache'].get('hit', 0) / step['requests'] * 100 if step['requests'] else 0.0
+        cpu = f"{step['cpu_percent']:7.0f}" if 'cpu_percent' in step else f"{'-':>7}"
+        rss = f"{step['peak_rss_bytes'] / 2**20:8.0f}" if 'peak_rss_bytes' in step else f"{'-':>8}"
+        lines.append(f"{step['concurrency']:>5} {step['requests']:>7} {step['rps']:>8.2f} {latency['p50']:>9.1f} "
+                     f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {step['error_rate']:>7.1%} "
+                     f"{hits:>6.0f} {cpu} {rss}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test /api/generate at increasing concurrency')
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--url', help='base URL of a running server (default: the Flask app in-process)')
+    where.add_argument('--spawn', action='store_true', help='start unified_server.py locally and test it')
+    parser.add_argument('--server-cmd', default=f'{sys.executable} unified_server.py',
+                        help='command --spawn runs (PORT is set in its environment)')
+    parser.add_argument('--port', type=int, default=5099, help='port for --spawn')
+    parser.add_argument('--pid', type=int, help='server process to sample CPU/RSS from with --url')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per concurrency step')
+    parser.add_argument('--requests', type=int, help='requests per step instead of a duration')
+    parser.add_argument('--warmup', type=int, default=0, help='untimed requests before the first step')
+    parser.add_argument('--phrases', type=int, default=200, help='distinct phrases in the corpus')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of phrase popularity')
+    parser.add_argument('--vibes', help="vibe mix, e.g. 'cosmic=3,storm=1' (default: all vibes equally)")
+    parser.add_argument('--advanced-ratio', type=float, default=0.1)
+    parser.add_argument('--size', type=int)
+    parser.add_argument('--binary', action='store_true', help='ask for raw image bytes instead of JSON')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here')
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.phrases, args.zipf, parse_mix(args.vibes) if args.vibes else None,
+                        args.advanced_ratio, args.size, args.binary)
+    duration = None if args.requests else args.duration
+    run = lambda target: run_load_test(target, workload, args.concurrency, duration, args.requests,
+                                       args.warmup, args.seed)
+    if args.spawn:
+        with SpawnedServer(args.server_cmd.split(), args.port) as target:
+            report = run(target)
+    elif args.url:
+        report = run(HttpTarget(args.url, pid=args.pid))
+    else:
+        # Per-request logs would drown the report
+        logging.getLogger('main').setLevel(logging.WARNING)
+        report = run(InProcessTarget())
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
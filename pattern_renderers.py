@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT PATTERN RENDERERS
+Vibe-layer drawing functions, loaded on first use through patterns.py
+
+Each renderer draws into an ``ImageDraw`` or a :class:`scene.Scene` and
+reads only the vibe style, never the phrase. Shapes are shaped by the
+style's ``energy_flow``, ``geometry_type``, ``symbol_density``,
+``pattern_scale`` and ``stroke_multiplier``.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+# How many repeats a pattern draws relative to a 'moderate' vibe
+DENSITY = {
+    'sparse': 0.6,
+    'moderate': 1.0,
+    'organic': 1.0,
+    'precise': 1.0,
+    'high': 1.3,
+    'luminous': 1.2,
+    'intense': 1.3,
+    'deep': 1.2,
+}
+
+# Flows that pull toward the centre wind the opposite way
+INWARD_FLOWS = ('inward_spiral', 'consuming', 'recursive')
+
+
+def _density(style: Dict) -> float:
+    return DENSITY.get(style.get('symbol_density'), 1.0)
+
+
+def _count(style: Dict, base: int, minimum: int = 1) -> int:
+    return max(minimum, round(base * _density(style)))
+
+
+def _reach(style: Dict, size: int, fraction: float) -> float:
+    """Radius for ``fraction`` of the canvas, stretched by pattern_scale and kept on the canvas"""
+    scale = 0.75 + 0.25 * style.get('pattern_scale', 1.0)
+    return min(size * fraction * scale, size * 0.45)
+
+
+def _width(style: Dict, base: float, size: int) -> int:
+    return max(1, round(base * style.get('stroke_multiplier', 1.0) * size / 1024))
+
+
+def _winding(style: Dict) -> int:
+    return -1 if style.get('energy_flow') in INWARD_FLOWS else 1
+
+
+def _polar(center: Tuple[int, int], radius: float, angle: float) -> Tuple[float, float]:
+    return (center[0] + radius * math.cos(math.radians(angle)),
+            center[1] + radius * math.sin(math.radians(angle)))
+
+
+def _color(style: Dict, index: int) -> Tuple[int, ...]:
+    return style['colors'][index % len(style['colors'])]
+
+
+# ----- Original vibe layers (output unchanged from the pre-registry renderer) -----
+
+def sacred_circle(draw, style: Dict, size: int):
+    """Rings of dots: the mystical layer, and the fallback for every other vibe"""
+    center = (size // 2, size // 2)
+    for ring in range(4):
+        ring_radius = (size // 12) + (ring * size // 20)
+        segments = 8 + (ring * 2)
+
+        for i in range(segments):
+            angle = (360 / segments) * i + (ring * 15)
+            x = center[0] + ring_radius * math.cos(math.radians(angle))
+            y = center[1] + ring_radius * math.sin(math.radians(angle))
+
+            color = style['colors'][(ring + i) % len(style['colors'])]
+            symbol_size = max(2, size // 80)
+
+            try:
+                draw.ellipse([x-symbol_size, y-symbol_size, x+symbol_size, y+symbol_size],
+                           fill=color)
+            except:
+                pass
+
+
+def constellation(draw, style: Dict, size: int):
+    """Star pattern of eight rays tipped with points"""
+    center = (size // 2, size // 2)
+    for i in range(8):
+        angle = i * 45
+        radius = size // 4
+        x = center[0] + radius * math.cos(math.radians(angle))
+        y = center[1] + radius * math.sin(math.radians(angle))
+
+        color = style['colors'][i % len(style['colors'])]
+        try:
+            # Draw star rays
+            draw.line([center, (x, y)], fill=color, width=3)
+            # Add star points
+            star_size = size // 60
+            draw.ellipse([x-star_size, y-star_size, x+star_size, y+star_size], fill=color)
+        except:
+            pass
+
+
+def nature_flow(draw, style: Dict, size: int):
+    """Natural flow pattern of six curling strands"""
+    center = (size // 2, size // 2)
+    for i in range(6):
+        start_angle = i * 60
+        for j in range(5):
+            angle = start_angle + (j * 10)
+            radius = (size // 8) + (j * size // 40)
+            x = center[0] + radius * math.cos(math.radians(angle))
+            y = center[1] + radius * math.sin(math.radians(angle))
+
+            if j > 0:
+                color = style['colors'][(i + j) % len(style['colors'])]
+                try:
+                    draw.line([prev_pos, (x, y)], fill=color, width=2)
+                except:
+                    pass
+            prev_pos = (x, y)
+
+
+def crystal_lattice(draw, style: Dict, size: int):
+    """Geometric crystal pattern of nested polygons"""
+    center = (size // 2, size // 2)
+    for layer in range(3):
+        layer_radius = (size // 8) + (layer * size // 12)
+        sides = 6 + (layer * 2)
+
+        points = []
+        for i in range(sides):
+            angle = (360 / sides) * i
+            x = center[0] + layer_radius * math.cos(math.radians(angle))
+            y = center[1] + layer_radius * math.sin(math.radians(angle))
+            points.append((x, y))
+
+        color = style['colors'][layer % len(style['colors'])]
+        try:
+            if len(points) >= 3:
+                draw.polygon(points, outline=color, width=2)
+        except:
+            pass
+
+
+# ----- Shadow -----
+
+def void_portal(draw, style: Dict, size: int):
+    """Concentric portal rings, torn into jagged polygons for jagged geometry"""
+    center = (size // 2, size // 2)
+    rings = _count(style, 4, minimum=2)
+    outer = _reach(style, size, 0.30)
+    width = _width(style, 2, size)
+    jagged = style.get('geometry_type') in ('jagged', 'electric')
+    for ring in range(rings):
+        radius = outer * (1 - ring / (rings + 1))
+        color = _color(style, ring)
+        if not jagged:
+            draw.ellipse([center[0]-radius, center[1]-radius, center[0]+radius, center[1]+radius],
+                         outline=color, width=width)
+            continue
+        sides = 9 + 2 * ring
+        offset = ring * 15 * _winding(style)
+        points = [_polar(center, radius * (1.08 if i % 2 else 0.92), offset + 180 * i / sides)
+                  for i in range(2 * sides)]
+        draw.polygon(points, outline=color, width=width)
+
+
+def shadow_tendrils(draw, style: Dict, size: int):
+    """Tendrils reaching in from the rim and curling toward the centre"""
+    center = (size // 2, size // 2)
+    tendrils = _count(style, 6, minimum=3)
+    outer = _reach(style, size, 0.42)
+    width = _width(style, 2, size)
+    winding = _winding(style)
+    for tendril in range(tendrils):
+        start = 360 * tendril / tendrils
+        points = []
+        for step in range(12):
+            progress = step / 11
+            points.append(_polar(center, outer * (1 - 0.7 * progress), start + winding * 120 * progress))
+        draw.line(points, fill=_color(style, tendril), width=width)
+
+
+# ----- Light -----
+
+def radiant_sun(draw, style: Dict, size: int):
+    """A sun disc with alternating long and short rays"""
+    center = (size // 2, size // 2)
+    rays = _count(style, 16, minimum=8)
+    inner = size / 14
+    width = _width(style, 3, size)
+    for ray in range(rays):
+        angle = 360 * ray / rays
+        outer = _reach(style, size, 0.36 if ray % 2 == 0 else 0.26)
+        draw.line([_polar(center, inner, angle), _polar(center, outer, angle)],
+                  fill=_color(style, ray), width=width)
+    draw.ellipse([center[0]-inner, center[1]-inner, center[0]+inner, center[1]+inner],
+                 outline=_color(style, 0), width=width)
+
+
+def brilliant_star(draw, style: Dict, size: int):
+    """An eight-pointed star outline"""
+    center = (size // 2, size // 2)
+    tip, notch = _reach(style, size, 0.22), _reach(style, size, 0.10)
+    points = [_polar(center, tip if i % 2 == 0 else notch, 22.5 * i) for i in range(16)]
+    draw.polygon(points, outline=_color(style, 1), width=_width(style, 2, size))
+
+
+# ----- Storm -----
+
+def _bolt(style: Dict, lines: List, start: Tuple[float, float], angle: float,
+          length: float, depth: int, index: int):
+    end = (start[0] + length * math.cos(math.radians(angle)),
+           start[1] + length * math.sin(math.radians(angle)))
+    # Jog the midpoint sideways so every segment zigzags
+    jog = length * 0.15 * (1 if depth % 2 else -1)
+    normal = math.radians(angle + 90)
+    mid = ((start[0] + end[0]) / 2 + jog * math.cos(normal), (start[1] + end[1]) / 2 + jog * math.sin(normal))
+    lines.append(([start, mid, end], _color(style, index + depth)))
+    if depth > 0:
+        for turn in (-25, 25):
+            _bolt(style, lines, end, angle + turn, length * 0.6, depth - 1, index)
+
+
+def lightning_tree(draw, style: Dict, size: int):
+    """Forked zigzag bolts bursting out from the centre"""
+    center = (size // 2, size // 2)
+    bolts = _count(style, 5, minimum=3)
+    length = _reach(style, size, 0.15)
+    width = _width(style, 2, size)
+    lines: List = []
+    for bolt in range(bolts):
+        angle = 360 * bolt / bolts
+        _bolt(style, lines, _polar(center, size / 10, angle), angle, length, 2, bolt)
+    for points, color in lines:
+        draw.line(points, fill=color, width=width)
+
+
+def electric_web(draw, style: Dict, size: int):
+    """Two rings of nodes joined by crossing arcs of current"""
+    center = (size // 2, size // 2)
+    nodes = _count(style, 10, minimum=6)
+    inner_radius, outer_radius = _reach(style, size, 0.15), _reach(style, size, 0.33)
+    width = _width(style, 1, size)
+    inner = [_polar(center, inner_radius, 360 * i / nodes) for i in range(nodes)]
+    outer = [_polar(center, outer_radius, 360 * (i + 0.5) / nodes) for i in range(nodes)]
+    for i in range(nodes):
+        color = _color(style, i)
+        following = (i + 1) % nodes
+        draw.line([inner[i], outer[i]], fill=color, width=width)
+        draw.line([outer[i], inner[following]], fill=color, width=width)
+        draw.line([outer[i], outer[following]], fill=color, width=width)
+
+
+# ----- Void -----
+
+def infinite_spiral(draw, style: Dict, size: int):
+    """Three logarithmic spiral arms winding into the centre"""
+    center = (size // 2, size // 2)
+    outer = _reach(style, size, 0.40)
+    width = _width(style, 2, size)
+    winding = _winding(style)
+    steps = 48
+    for arm in range(3):
+        points = [_polar(center, outer * 0.95 ** step, arm * 120 + winding * step * 15)
+                  for step in range(steps)]
+        draw.line(points, fill=_color(style, arm + 2), width=width)
+
+
+def dimensional_portal(draw, style: Dict, size: int):
+    """Nested squares, each smaller and turned further than the last"""
+    center = (size // 2, size // 2)
+    frames = _count(style, 5, minimum=3)
+    radius = _reach(style, size, 0.30)
+    width = _width(style, 1.5, size)
+    winding = _winding(style)
+    for frame in range(frames):
+        offset = 45 + winding * 15 * frame
+        points = [_polar(center, radius, offset + 90 * corner) for corner in range(4)]
+        draw.polygon(points, outline=_color(style, frame), width=width)
+        radius *= 0.8
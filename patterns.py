@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT PATTERN REGISTRY
+Named vibe-layer renderers, resolved from a vibe's declared base_patterns
+"""
+
+import importlib
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# Drawn for vibes that declare no registered pattern (the original fall-through)
+FALLBACK_PATTERN = 'sacred_circle'
+
+# Vibe layers before the registry existed; vibes that still resolve to these
+# keep their render keys (see UltraRevolutionarySigilGenerator.render_key)
+LEGACY_VIBE_PATTERNS = {
+    'mystical': ('sacred_circle',),
+    'cosmic': ('constellation',),
+    'elemental': ('nature_flow',),
+    'crystal': ('crystal_lattice',),
+}
+
+DEFAULT_PATTERN_BUDGET = 100
+
+
+class PatternSpec:
+    """A registered pattern renderer, imported the first time it is drawn.
+
+    ``target`` is a ``'module:function'`` path to a callable
+    ``render(draw, style, size)`` that draws into an ``ImageDraw`` or a
+    :class:`scene.Scene`. ``cost`` estimates the draw calls it makes at
+    1024 px and normal symbol density; budgets are expressed in the same
+    unit.
+    """
+
+    def __init__(self, name: str, cost: int, target: str):
+        self.name = name
+        self.cost = cost
+        self.target = target
+        self._render: Optional[Callable] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._render is not None
+
+    def load(self) -> Callable:
+        if self._render is None:
+            module_name, _, attribute = self.target.partition(':')
+            self._render = getattr(importlib.import_module(module_name), attribute)
+        return self._render
+
+    def render(self, draw, style: Dict, size: int):
+        self.load()(draw, style, size)
+
+
+PATTERN_REGISTRY: Dict[str, PatternSpec] = {}
+
+
+def register_pattern(name: str, cost: int, target: str) -> PatternSpec:
+    """Register (or replace) the renderer for pattern ``name``"""
+    spec = PatternSpec(name, cost, target)
+    PATTERN_REGISTRY[name] = spec
+    return spec
+
+
+def get_pattern(name: str) -> PatternSpec:
+    try:
+        return PATTERN_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown pattern: {name}") from None
+
+
+def resolve_patterns(base_patterns: Sequence[str], budget: Optional[int] = DEFAULT_PATTERN_BUDGET) -> Tuple[str, ...]:
+    """Registered patterns to draw for a vibe, in declaration order, within ``budget``.
+
+    Unregistered names are skipped. The first registered pattern is always
+    drawn; later ones only while their summed cost stays within ``budget``
+    (None for no limit). A vibe without registered patterns falls back to
+    :data:`FALLBACK_PATTERN`.
+    """
+    chosen, spent = [], 0
+    for name in base_patterns:
+        spec = PATTERN_REGISTRY.get(name)
+        if spec is None or name in chosen:
+            continue
+        if chosen and budget is not None and spent + spec.cost > budget:
+            continue
+        chosen.append(name)
+        spent += spec.cost
+    return tuple(chosen) or (FALLBACK_PATTERN,)
+
+
+def pattern_cost(names: Sequence[str]) -> int:
+    return sum(get_pattern(name).cost for name in names)
+
+
+_RENDERERS = 'pattern_renderers'
+
+# Original vibe layers
+register_pattern('sacred_circle', 44, f'{_RENDERERS}:sacred_circle')
+register_pattern('constellation', 16, f'{_RENDERERS}:constellation')
+register_pattern('nature_flow', 24, f'{_RENDERERS}:nature_flow')
+register_pattern('crystal_lattice', 3, f'{_RENDERERS}:crystal_lattice')
+# Layers for the vibes that used to fall through to sacred_circle
+register_pattern('void_portal', 4, f'{_RENDERERS}:void_portal')
+register_pattern('shadow_tendrils', 6, f'{_RENDERERS}:shadow_tendrils')
+register_pattern('radiant_sun', 17, f'{_RENDERERS}:radiant_sun')
+register_pattern('brilliant_star', 1, f'{_RENDERERS}:brilliant_star')
+register_pattern('lightning_tree', 35, f'{_RENDERERS}:lightning_tree')
+register_pattern('electric_web', 30, f'{_RENDERERS}:electric_web')
+register_pattern('infinite_spiral', 3, f'{_RENDERERS}:infinite_spiral')
+register_pattern('dimensional_portal', 6, f'{_RENDERERS}:dimensional_portal')
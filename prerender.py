@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT BULK PRE-RENDER
+Fills the render cache's disk tier from a phrase list ahead of traffic
+
+    python -m sigilcraft prerender phrases.txt
+    python prerender.py phrases.txt --cache-dir /var/cache/sigils --vibes cosmic storm --mode basic
+
+Every phrase is rendered for each selected vibe and advanced flag with the
+server's render settings (SIGIL_RENDER_MODE, SIGIL_GLOW_ENGINE, ... are read
+from the environment as usual), keyed with ``render_key`` and written with
+the same layout and metadata the server reads. Keys already on disk are
+skipped, so an interrupted run picks up where it stopped.
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from encoders import get_encoder
+from main import LEGACY_SEED_VERSION, SUPPORTED_SEED_VERSIONS, UltraRevolutionarySigilGenerator
+from render_cache import RenderCache
+from render_executor import InlineRenderExecutor, ProcessPoolRenderExecutor
+
+logger = logging.getLogger(__name__)
+
+# Same limits /api/generate applies, so every pre-rendered phrase is one the server can be asked for
+MIN_PHRASE_LENGTH = 2
+MAX_PHRASE_LENGTH = 500
+# Seconds between throughput lines
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+
+def read_phrases(lines: Iterable[str]) -> List[str]:
+    """Phrases from a text file: one per line, stripped like the server does.
+
+    Blank lines and ``#`` comments are skipped, duplicates are dropped and
+    phrases the server would reject are logged and left out.
+    """
+    phrases, seen = [], set()
+    for number, line in enumerate(lines, 1):
+        phrase = line.strip()
+        if not phrase or phrase.startswith('#') or phrase in seen:
+            continue
+        if not MIN_PHRASE_LENGTH <= len(phrase) <= MAX_PHRASE_LENGTH:
+            logger.warning(f"⚠️ Line {number}: phrase must be {MIN_PHRASE_LENGTH}-{MAX_PHRASE_LENGTH} "
+                           f"characters, skipped")
+            continue
+        seen.add(phrase)
+        phrases.append(phrase)
+    return phrases
+
+
+def plan_renders(generator: UltraRevolutionarySigilGenerator, phrases: Sequence[str], vibes: Sequence[str],
+                 advanced_flags: Sequence[bool], seed_version: Optional[int] = None,
+                 encoder: Optional[str] = None, size: Optional[int] = None) -> List[Tuple[str, Tuple]]:
+    """``(render_key, (phrase, vibe, advanced, seed_version, encoder, size))`` for every combination"""
+    seed_version = generator.resolve_seed_version(seed_version)
+    if seed_version == LEGACY_SEED_VERSION:
+        raise ValueError("Legacy seeds are not content-addressable and cannot be pre-rendered")
+    encoder = get_encoder(encoder).name
+    size = generator.resolve_size(size, encoder)
+
+    plan, keys = [], set()
+    for phrase in phrases:
+        for vibe in vibes:
+            for advanced in advanced_flags:
+                item = (phrase, vibe, bool(advanced), seed_version, encoder, size)
+                key = generator.render_key(*item)
+                if key not in keys:
+                    keys.add(key)
+                    plan.append((key, item))
+    return plan
+
+
+class Progress:
+    """Counts outcomes and reports throughput every ``interval`` seconds"""
+
+    def __init__(self, total: int, interval: float = DEFAULT_PROGRESS_INTERVAL,
+                 report: Callable[[str], None] = print, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.interval = interval
+        self.report = report
+        self.clock = clock
+        self.started = clock()
+        self._last_report = self.started
+        self._reported_done: Optional[int] = None
+        self.rendered = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+
+    @property
+    def done(self) -> int:
+        return self.rendered + self.skipped + self.failed
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    def rate(self) -> float:
+        """Renders per second, not counting skipped keys"""
+        elapsed = self.elapsed()
+        return self.rendered / elapsed if elapsed > 0 else 0.0
+
+    def tick(self, force: bool = False):
+        now = self.clock()
+        if self.done == self._reported_done or (not force and now - self._last_report < self.interval):
+            return
+        self._last_report, self._reported_done = now, self.done
+        rate = self.rate()
+        remaining = self.total - self.done
+        eta = f", ~{remaining / rate:.0f}s left" if rate and remaining else ''
+        self.report(f"⚡ {self.done}/{self.total} done: {self.rendered} rendered, {self.skipped} cached, "
+                    f"{self.failed} failed, {rate:.2f} renders/s{eta}")
+
+    def summary(self) -> Dict:
+        return {
+            'total': self.total,
+            'rendered': self.rendered,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'seconds': round(self.elapsed(), 3),
+            'renders_per_second': round(self.rate(), 3)
+        }
+
+
+def prerender(generator: UltraRevolutionarySigilGenerator, cache: RenderCache, plan: Sequence[Tuple[str, Tuple]],
+              workers: Optional[int] = None, progress: Optional[Progress] = None) -> Dict:
+    """Render every planned key missing from ``cache`` on ``workers`` processes and store it.
+
+    Up to twice ``workers`` renders are in flight at a time, so memory stays
+    bounded however long the plan is. A failed render is logged and counted;
+    it does not stop the run.
+    """
+    progress = progress or Progress(len(plan))
+    pending = []
+    for key, item in plan:
+        if key in cache:
+            progress.skipped += 1
+        else:
+            pending.append((key, item))
+    progress.tick(force=True)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    window = workers * 2
+    if workers == 1:
+        executor = InlineRenderExecutor(generator._render_image)
+    else:
+        executor = ProcessPoolRenderExecutor(type(generator), generator.worker_options(),
+                                             pool_size=workers, queue_depth=window)
+
+    in_flight: Dict[Future, Tuple[str, Tuple]] = {}
+
+    def collect(done: Set[Future]):
+        for future in done:
+            key, item = in_flight.pop(future)
+            try:
+                data, _ = future.result()
+            except Exception as e:
+                progress.failed += 1
+                logger.error(f"❌ Pre-render failed for '{item[0]}' ({item[1]}): {e}")
+                continue
+            cache.put(key, data, generator._request_meta(*item))
+            progress.rendered += 1
+            progress.bytes += len(data)
+        progress.tick()
+
+    try:
+        for key, item in pending:
+            if len(in_flight) >= window:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            in_flight[executor.submit(*item, block=True)] = (key, item)
+        while in_flight:
+            collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+    finally:
+        executor.shutdown()
+
+    progress.tick(force=True)
+    return dict(progress.summary(), workers=workers)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Pre-render a phrase list into the render cache')
+    parser.add_argument('phrases', help="text file with one phrase per line ('-' for stdin)")
+    parser.add_argument('--cache-dir', default=os.getenv('SIGIL_CACHE_DIR'),
+                        help="render cache disk tier to fill (default: $SIGIL_CACHE_DIR)")
+    parser.add_argument('--vibes', nargs='+', help='vibes to render (default: all)')
+    parser.add_argument('--mode', choices=('both', 'basic', 'advanced'), default='both')
+    parser.add_argument('--seed-version', type=int,
+                        choices=[v for v in SUPPORTED_SEED_VERSIONS if v != LEGACY_SEED_VERSION])
+    parser.add_argument('--encoder', help='encoder to render with (default: the server default)')
+    parser.add_argument('--size', type=int)
+    parser.add_argument('--workers', type=int, help='render processes (default: one per CPU)')
+    parser.add_argument('--progress', type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help='seconds between throughput lines')
+    args = parser.parse_args(argv)
+
+    if not args.cache_dir:
+        parser.error('a disk cache is required: pass --cache-dir or set SIGIL_CACHE_DIR')
+
+    # Per-render info logs would drown the progress lines
+    logging.getLogger('main').setLevel(logging.WARNING)
+    generator = UltraRevolutionarySigilGenerator()
+    vibes = [vibe.lower() for vibe in args.vibes] if args.vibes else list(generator.vibe_styles)
+    unknown = sorted(set(vibes) - set(generator.vibe_styles))
+    if unknown:
+        parser.error(f"unknown vibe(s): {', '.join(unknown)} (available: {', '.join(generator.vibe_styles)})")
+    advanced = {'both': (False, True), 'basic': (False,), 'advanced': (True,)}[args.mode]
+
+    if args.phrases == '-':
+        phrases = read_phrases(sys.stdin)
+    else:
+        with open(args.phrases, encoding='utf-8') as f:
+            phrases = read_phrases(f)
+    try:
+        plan = plan_renders(generator, phrases, vibes, advanced, args.seed_version, args.encoder, args.size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Only the disk tier matters here; keeping renders in memory as well would just grow the process
+    cache = RenderCache(max_bytes=0, disk_dir=args.cache_dir)
+    print(f"🎨 Pre-rendering {len(phrases)} phrase(s) × {len(vibes)} vibe(s) × {len(advanced)} mode(s) "
+          f"= {len(plan)} render(s) into {args.cache_dir}")
+    summary = prerender(generator, cache, plan, args.workers, Progress(len(plan), args.progress))
+    print(f"✅ {summary['rendered']} rendered, {summary['skipped']} already cached, {summary['failed']} failed "
+          f"in {summary['seconds']:.1f}s on {summary['workers']} worker(s) "
+          f"({summary['renders_per_second']:.2f} renders/s, {summary['bytes'] / 2**20:.1f} MiB)")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -259,7 +259,8 @@
 
                 const timeoutId = setTimeout(() => controller.abort(), 60000); // 60 second timeout
 
-                const response = await fetch('/api/generate', {
+                // Progressive stream: a low-resolution preview arrives first, then the full sigil
+                const response = await fetch('/api/generate/stream', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -268,20 +269,24 @@
                     signal: controller.signal
                 });
 
-                clearTimeout(timeoutId);
-
                 if (!response.ok) {
+                    clearTimeout(timeoutId);
                     const errorData = await response.json().catch(() => ({}));
                     throw new Error(errorData.error || `Server error: ${response.status}`);
                 }
 
-                const data = await response.json();
+                const data = await this.readSigilStream(response, (preview) => {
+                    this.hideLoadingOverlay();
+                    this.displaySigil(preview, { preview: true });
+                });
 
-                if (data.success && data.image) {
+                clearTimeout(timeoutId);
+
+                if (data && data.success && data.image) {
                     this.displaySigil(data);
                     this.showToast('Revolutionary sigil manifested!', 'success');
                 } else {
-                    throw new Error(data.error || 'Invalid response from server');
+                    throw new Error((data && data.error) || 'Invalid response from server');
                 }
 
             } catch (error) {
@@ -299,18 +304,56 @@
             }
         },
 
-        // Display generated sigil
-        displaySigil(data) {
+        // Read server-sent events until the final (or error) event arrives
+        async readSigilStream(response, onPreview) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) return null;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const block = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let event = 'message';
+                    let payload = '';
+                    for (const line of block.split('\n')) {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) payload += line.slice(6);
+                    }
+                    const data = JSON.parse(payload || '{}');
+
+                    if (event === 'preview') {
+                        onPreview(data);
+                    } else {
+                        return data;
+                    }
+                }
+            }
+        },
+
+        // Display generated sigil (previews are shown but not offered for download)
+        displaySigil(data, { preview = false } = {}) {
             if (this.elements.sigilImage) {
-                this.elements.sigilImage.src = `data:image/png;base64,${data.image}`;
+                this.elements.sigilImage.src = `data:${data.mimetype || 'image/png'};base64,${data.image}`;
                 this.elements.sigilImage.alt = `Sigil for: ${data.phrase}`;
+                this.elements.sigilImage.classList.toggle('sigil-preview', preview);
             }
 
             if (this.elements.resultContainer) {
                 this.elements.resultContainer.style.display = 'block';
-                this.elements.resultContainer.scrollIntoView({ behavior: 'smooth' });
+                if (!preview) {
+                    this.elements.resultContainer.scrollIntoView({ behavior: 'smooth' });
+                }
             }
 
+            if (preview) return;
+
             // Store image data for download
             this.currentSigilData = data;
 
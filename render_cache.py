@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER CACHE
+Content-addressed cache of finished sigil images, keyed on render keys
+"""
+
+import os
+import json
+import threading
+import tempfile
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_META_ENTRIES = 10000
+# Pruning the disk tier goes down to this fraction of its limit, so it does not rescan on every store
+DISK_PRUNE_TARGET = 0.9
+
+
+class RenderCache:
+    """Byte-bounded in-process LRU cache with an optional on-disk tier.
+
+    The memory tier evicts least recently used entries once the total size of
+    the stored images exceeds ``max_bytes``. When ``disk_dir`` is set, every
+    stored image is also written there so it survives worker recycling; disk
+    hits are promoted back into memory.
+
+    ``disk_max_bytes`` bounds the disk tier. Once a store takes it over the
+    limit the directory is rescanned (other workers share it) and the files
+    with the oldest modification time go first; disk hits touch their file,
+    so that order is least recently used. Images are pruned before the
+    metadata kept with them. Without a limit the directory is never pruned.
+
+    Entries may carry a small metadata dict (the request parameters), which
+    outlives the image itself so an evicted key can be rendered again.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, disk_dir: Optional[str] = None,
+                 suffix: str = '.bin', max_meta_entries: int = DEFAULT_MAX_META_ENTRIES,
+                 disk_max_bytes: Optional[int] = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = int(disk_max_bytes) if disk_max_bytes else None
+        self.suffix = suffix
+        self.max_meta_entries = max_meta_entries
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._meta: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+        self.disk_evictions = 0
+        self._disk_bytes = 0
+        self._prune_lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            if self.disk_max_bytes:
+                self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+
+    @classmethod
+    def from_env(cls) -> 'RenderCache':
+        """Build a cache from SIGIL_CACHE_MAX_BYTES / SIGIL_CACHE_DIR / SIGIL_CACHE_DISK_MAX_MB"""
+        max_bytes = int(os.getenv('SIGIL_CACHE_MAX_BYTES', str(DEFAULT_CACHE_MAX_BYTES)))
+        disk_dir = os.getenv('SIGIL_CACHE_DIR') or None
+        disk_max_mb = float(os.getenv('SIGIL_CACHE_DISK_MAX_MB', '0'))
+        return cls(max_bytes=max_bytes, disk_dir=disk_dir, disk_max_bytes=int(disk_max_mb * 1024 * 1024))
+
+    def disk_path(self, key: str, suffix: Optional[str] = None) -> Optional[str]:
+        """Location of ``key`` in the disk tier, sharded by key prefix"""
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, key[:2], key + (suffix or self.suffix))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes for ``key`` or None, updating counters"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._read_disk(key)
+        if data is not None and self.disk_max_bytes:
+            self._touch(self.disk_path(key))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store_memory(key, data)
+        return data
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        path = self.disk_path(key)
+        return bool(path and os.path.exists(path))
+
+    def put(self, key: str, data: bytes, meta: Optional[Dict] = None):
+        """Store ``data`` under ``key`` in memory and, if enabled, on disk"""
+        with self._lock:
+            self.stores += 1
+            self._store_memory(key, data)
+            if meta is not None:
+                self._store_meta(key, meta)
+        written = self._write_disk(key, data)
+        if meta is not None:
+            written += self._write_disk(key, json.dumps(meta).encode('utf-8'), suffix='.json')
+        if written and self.disk_max_bytes:
+            with self._lock:
+                self._disk_bytes += written
+                over = self._disk_bytes > self.disk_max_bytes
+            if over:
+                self._prune_disk()
+
+    def get_meta(self, key: str) -> Optional[Dict]:
+        """Return the metadata stored with ``key``, if it is still known"""
+        with self._lock:
+            meta = self._meta.get(key)
+            if meta is not None:
+                self._meta.move_to_end(key)
+                return meta
+
+        raw = self._read_disk(key, suffix='.json')
+        if raw is None:
+            return None
+        try:
+            meta = json.loads(raw)
+        except ValueError:
+            return None
+        with self._lock:
+            self._store_meta(key, meta)
+        return meta
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Counters for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stores': self.stores,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'disk_enabled': bool(self.disk_dir),
+                'disk_bytes': self._disk_bytes,
+                'disk_max_bytes': self.disk_max_bytes,
+                'disk_evictions': self.disk_evictions
+            }
+
+    def _store_memory(self, key: str, data: bytes):
+        # Caller holds the lock
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _store_meta(self, key: str, meta: Dict):
+        # Caller holds the lock
+        self._meta[key] = meta
+        self._meta.move_to_end(key)
+        while len(self._meta) > self.max_meta_entries:
+            self._meta.popitem(last=False)
+
+    def _read_disk(self, key: str, suffix: Optional[str] = None) -> Optional[bytes]:
+        path = self.disk_path(key, suffix)
+        if not path:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ Render cache read failed for {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, data: bytes, suffix: Optional[str] = None) -> int:
+        """Write one file of the disk tier; returns the bytes written"""
+        path = self.disk_path(key, suffix)
+        if not path or os.path.exists(path):
+            return 0
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temp file first so readers never see partial images
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            return len(data)
+        except OSError as e:
+            logger.warning(f"⚠️ Render cache write failed for {key}: {e}")
+            return 0
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _scan_disk(self) -> List[Tuple[float, int, str]]:
+        """``(mtime, size, path)`` of every cache file on disk"""
+        files = []
+        try:
+            shards = [entry.path for entry in os.scandir(self.disk_dir) if entry.is_dir()]
+        except OSError:
+            return files
+        for shard in shards:
+            try:
+                entries = list(os.scandir(shard))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _prune_disk(self):
+        """Delete the least recently used files until the disk tier is back under its limit"""
+        if not self._prune_lock.acquire(blocking=False):
+            return  # Another thread is already pruning
+        try:
+            files = self._scan_disk()
+            total = sum(size for _, size, _ in files)
+            target = int(self.disk_max_bytes * DISK_PRUNE_TARGET)
+            removed = 0
+            # Images first, oldest first; metadata only once no images are left to drop
+            for mtime, size, path in sorted(files, key=lambda f: (f[2].endswith('.json'), f[0])):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Pruned by another worker
+                except OSError as e:
+                    logger.warning(f"⚠️ Render cache prune failed for {path}: {e}")
+                    continue
+                total -= size
+                removed += 1
+            with self._lock:
+                self._disk_bytes = total
+                self.disk_evictions += removed
+            if removed:
+                logger.info(f"🧹 Pruned {removed} file(s) from the render cache directory")
+        finally:
+            self._prune_lock.release()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER EXECUTORS
+Pluggable strategies for running CPU-bound sigil renders off the request thread
+"""
+
+import os
+import threading
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ('inline', 'process')
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when an executor already holds its maximum number of jobs"""
+
+
+class RenderTimeout(TimeoutError):
+    """Raised when a render does not finish within the executor's timeout"""
+
+
+# ===== PROCESS POOL CHILD STATE =====
+_worker_generator = None
+
+def _init_worker(generator_factory: Callable, generator_options: Dict, warm: bool = False):
+    global _worker_generator
+    _worker_generator = generator_factory(**generator_options)
+    if warm:
+        # Forked children inherit warm modules but build a fresh generator with empty templates
+        from warmup import warm_up
+        warm_up(_worker_generator, render=False)
+
+def _warm_worker() -> int:
+    return os.getpid()
+
+def _render_in_worker(phrase: str, vibe: str, advanced: bool, seed_version: int,
+                      encoder: str, size: Optional[int]) -> Tuple[bytes, Dict]:
+    return _worker_generator.generate_sigil_image(phrase, vibe, advanced, seed_version, encoder, size)
+
+
+class InlineRenderExecutor:
+    """Renders in the calling thread; the default for tests and the dev server"""
+
+    kind = 'inline'
+
+    def __init__(self, render_fn: Callable[..., Tuple[bytes, Dict]]):
+        self.render_fn = render_fn
+        self.timeout = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Nothing to start; renders run in the calling thread"""
+
+    def submit(self, phrase: str, vibe: str, advanced: bool, seed_version: int, encoder: str = 'png',
+               size: Optional[int] = None, block: bool = False) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future.set_result(self.render_fn(phrase, vibe, advanced, seed_version, encoder, size))
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            future.set_exception(e)
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        return future
+
+    def render(self, phrase: str, vibe: str, advanced: bool, seed_version: int,
+               encoder: str = 'png', size: Optional[int] = None) -> Tuple[bytes, Dict]:
+        return self.submit(phrase, vibe, advanced, seed_version, encoder, size).result()
+
+    def stats(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'in_flight': self._in_flight,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+    def shutdown(self):
+        pass
+
+
+class ProcessPoolRenderExecutor:
+    """Warm process pool with a generator pre-instantiated in every child.
+
+    At most ``queue_depth`` jobs may be queued or running at once; further
+    submissions are rejected with :class:`RenderQueueFull` (or wait, when
+    ``block`` is set). :meth:`render` gives up after ``timeout`` seconds with
+    :class:`RenderTimeout`; a job that is already running keeps its child busy
+    until it finishes. The pool is created lazily and re-created after a fork,
+    so it is safe to build the executor before gunicorn forks its workers.
+    With ``warm`` every child runs a render-free warm-up as it starts.
+
+    A child that dies breaks the whole pool: the jobs it held fail, and the
+    next submission builds a fresh pool. If that fails too, ``on_broken`` is
+    called with the error so the worker can report itself unready.
+
+    When a ``memory_budget`` is given, every job reserves
+    ``estimate_bytes(phrase, vibe, advanced, seed_version, encoder, size)``
+    of it before it is submitted and returns it when it finishes, so the
+    pool as a whole stays within the one per-worker budget. Each child only
+    runs one render at a time and keeps the whole budget for it.
+    """
+
+    kind = 'process'
+
+    def __init__(self, generator_factory: Callable, generator_options: Optional[Dict] = None,
+                 pool_size: Optional[int] = None, queue_depth: Optional[int] = None,
+                 timeout: Optional[float] = None, warm: bool = False, memory_budget: Any = None,
+                 estimate_bytes: Optional[Callable[..., int]] = None,
+                 on_broken: Optional[Callable[[str], Any]] = None):
+        self.generator_factory = generator_factory
+        self.generator_options = dict(generator_options or {})
+        self.pool_size = max(1, pool_size or os.cpu_count() or 1)
+        self.queue_depth = max(self.pool_size, queue_depth or self.pool_size * 4)
+        self.timeout = timeout
+        self.warm = warm
+        self.memory_budget = memory_budget
+        self.estimate_bytes = estimate_bytes
+        self.on_broken = on_broken
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def start(self):
+        """Create the pool now and wait until every child is up and initialized"""
+        pool = self._ensure_pool()
+        warmups = [pool.submit(_warm_worker) for _ in range(self.pool_size)]
+        pids = {future.result() for future in warmups}
+        logger.info(f"🔥 Render pool warm with {len(pids)} worker process(es)")
+
+    def submit(self, phrase: str, vibe: str, advanced: bool, seed_version: int, encoder: str = 'png',
+               size: Optional[int] = None, block: bool = False) -> Future:
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self.rejected += 1
+            raise RenderQueueFull(f"Render queue is full ({self.queue_depth} jobs)")
+
+        nbytes = 0
+        try:
+            if self.memory_budget is not None and self.estimate_bytes is not None:
+                nbytes = self.estimate_bytes(phrase, vibe, advanced, seed_version, encoder, size)
+                self.memory_budget.acquire(nbytes)
+            try:
+                future, pool = self._submit_to_pool(phrase, vibe, advanced, seed_version, encoder, size)
+            except Exception:
+                if nbytes:
+                    self.memory_budget.release(nbytes)
+                raise
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.submitted += 1
+            self._in_flight += 1
+        future.add_done_callback(lambda done: self._job_done(done, pool, nbytes))
+        return future
+
+    def render(self, phrase: str, vibe: str, advanced: bool, seed_version: int,
+               encoder: str = 'png', size: Optional[int] = None) -> Tuple[bytes, Dict]:
+        future = self.submit(phrase, vibe, advanced, seed_version, encoder, size)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise RenderTimeout(f"Render did not finish within {self.timeout}s")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'pool_size': self.pool_size,
+                'queue_depth': self.queue_depth,
+                'timeout': self.timeout,
+                'started': self._pool is not None and self._pool_pid == os.getpid(),
+                'in_flight': self._in_flight,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'restarts': self.restarts
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # A pool inherited through fork is unusable; its management thread did not survive
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    initializer=_init_worker,
+                    initargs=(self.generator_factory, self.generator_options, self.warm)
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _submit_to_pool(self, *args) -> Tuple[Future, ProcessPoolExecutor]:
+        pool = self._ensure_pool()
+        try:
+            return pool.submit(_render_in_worker, *args), pool
+        except BrokenProcessPool:
+            with self._lock:
+                self.failed += 1
+            logger.warning("⚠️ Render pool is broken, rebuilding it")
+            self._discard_pool(pool)
+        try:
+            pool = self._ensure_pool()
+            return pool.submit(_render_in_worker, *args), pool
+        except Exception as e:
+            error = f"Render pool could not be rebuilt: {e}"
+            logger.error(f"❌ {error}")
+            if self.on_broken is not None:
+                self.on_broken(error)
+            raise
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Forget a broken pool; it has already terminated its children"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self.restarts += 1
+
+    def _job_done(self, future: Future, pool: ProcessPoolExecutor, nbytes: int = 0):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_pool(pool)
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        if nbytes:
+            self.memory_budget.release(nbytes)
+        self._slots.release()
+
+
+def create_render_executor(kind: Optional[str], render_fn: Callable[..., Tuple[bytes, Dict]],
+                           generator_factory: Callable, generator_options: Dict, memory_budget: Any = None,
+                           estimate_bytes: Optional[Callable[..., int]] = None) -> Any:
+    """Build the executor selected by ``kind`` / SIGIL_RENDER_EXECUTOR.
+
+    A process pool admits its jobs against ``memory_budget``; inline renders
+    reserve it themselves.
+    """
+    kind = kind or os.getenv('SIGIL_RENDER_EXECUTOR', 'inline')
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Unsupported render executor: {kind}")
+    if kind == 'inline':
+        return InlineRenderExecutor(render_fn)
+
+    timeout = os.getenv('SIGIL_RENDER_TIMEOUT')
+    return ProcessPoolRenderExecutor(
+        generator_factory,
+        generator_options,
+        pool_size=int(os.getenv('SIGIL_RENDER_POOL_SIZE', '0')) or None,
+        queue_depth=int(os.getenv('SIGIL_RENDER_QUEUE_DEPTH', '0')) or None,
+        timeout=float(timeout) if timeout else None,
+        warm=os.getenv('SIGIL_WARMUP', 'false').lower() == 'true',
+        memory_budget=memory_budget,
+        estimate_bytes=estimate_bytes
+    )
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER JOBS
+In-process job queue for renders that clients poll instead of waiting on
+"""
+
+import os
+import time
+import uuid
+import queue
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from render_executor import RenderQueueFull
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are served first
+JOB_LANES = {'preview': 0, 'standard': 1, 'advanced': 2}
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_RESULT_TTL = 300.0
+DEFAULT_JOB_MAX_QUEUED = 256
+DEFAULT_JOB_MAX_RESULT_BYTES = 64 * 1024 * 1024
+
+
+class RenderJob:
+    """One queued render and, once finished, its result"""
+
+    def __init__(self, key: str, lane: str, task: Callable[[], Tuple[bytes, Dict]],
+                 meta: Optional[Dict] = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.lane = lane
+        self.task = task
+        self.meta = dict(meta or {})
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Tuple[bytes, Dict]] = None
+        self.error: Optional[str] = None
+        self.attached = 0
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes or ``timeout`` seconds pass"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict:
+        info = {
+            'job_id': self.id,
+            'status': self.status,
+            'lane': self.lane,
+            'render_key': self.key,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'attached': self.attached
+        }
+        info.update(self.meta)
+        if self.error is not None:
+            info['error'] = self.error
+        return info
+
+
+class RenderJobQueue:
+    """Priority queue of render jobs drained by a pool of worker threads.
+
+    Jobs are deduplicated on their key: submitting a key that is already
+    queued, running or finished (and not yet expired) returns the existing
+    job, so client retries attach to it instead of starting another render.
+    Finished jobs keep their result for ``result_ttl`` seconds, or until the
+    results held exceed ``max_result_bytes`` and the oldest finished jobs are
+    evicted (the newest result is always kept); failed jobs are not reused.
+    Worker threads do little more than wait when renders run
+    on a process pool executor. They start lazily and again after a fork.
+    """
+
+    def __init__(self, workers: int = DEFAULT_JOB_WORKERS, result_ttl: float = DEFAULT_JOB_RESULT_TTL,
+                 max_queued: int = DEFAULT_JOB_MAX_QUEUED,
+                 max_result_bytes: int = DEFAULT_JOB_MAX_RESULT_BYTES):
+        self.workers = max(1, workers)
+        self.result_ttl = result_ttl
+        self.max_queued = max(1, max_queued)
+        self.max_result_bytes = max(0, int(max_result_bytes))
+
+        self._queue: 'queue.PriorityQueue[Tuple[int, int, RenderJob]]' = queue.PriorityQueue()
+        self._jobs: Dict[str, RenderJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._result_bytes = 0
+        self._threads: List[threading.Thread] = []
+        self._threads_pid: Optional[int] = None
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls) -> 'RenderJobQueue':
+        """Build a queue from SIGIL_JOB_WORKERS / SIGIL_JOB_RESULT_TTL / SIGIL_JOB_MAX_QUEUED /
+        SIGIL_JOB_MAX_RESULT_BYTES"""
+        return cls(
+            workers=int(os.getenv('SIGIL_JOB_WORKERS', str(DEFAULT_JOB_WORKERS))),
+            result_ttl=float(os.getenv('SIGIL_JOB_RESULT_TTL', str(DEFAULT_JOB_RESULT_TTL))),
+            max_queued=int(os.getenv('SIGIL_JOB_MAX_QUEUED', str(DEFAULT_JOB_MAX_QUEUED))),
+            max_result_bytes=int(os.getenv('SIGIL_JOB_MAX_RESULT_BYTES', str(DEFAULT_JOB_MAX_RESULT_BYTES)))
+        )
+
+    def submit(self, key: str, lane: str, task: Callable[[], Tuple[bytes, Dict]],
+               meta: Optional[Dict] = None) -> Tuple[RenderJob, bool]:
+        """Queue ``task`` under ``key``, returning ``(job, created)``"""
+        if lane not in JOB_LANES:
+            raise ValueError(f"Unknown job lane: {lane}")
+
+        with self._lock:
+            self._expire()
+            existing = self._jobs.get(self._by_key.get(key, ''))
+            if existing is not None and existing.status != 'failed':
+                existing.attached += 1
+                self.deduplicated += 1
+                return existing, False
+
+            if self._queue.qsize() >= self.max_queued:
+                self.rejected += 1
+                raise RenderQueueFull(f"Job queue is full ({self.max_queued} jobs)")
+
+            job = RenderJob(key, lane, task, meta)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._seq += 1
+            self.submitted += 1
+            self._queue.put((JOB_LANES[lane], self._seq, job))
+
+        self._ensure_workers()
+        return job, True
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        """Look up a job; expired jobs are gone"""
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        """Counters for the health endpoint"""
+        with self._lock:
+            states = {state: 0 for state in JOB_STATES}
+            lanes = {lane: 0 for lane in JOB_LANES}
+            for job in self._jobs.values():
+                states[job.status] += 1
+                if job.status == 'queued':
+                    lanes[job.lane] += 1
+            return {
+                'workers': self.workers,
+                'result_ttl': self.result_ttl,
+                'max_queued': self.max_queued,
+                'result_bytes': self._result_bytes,
+                'max_result_bytes': self.max_result_bytes,
+                'jobs': states,
+                'queued_by_lane': lanes,
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+                'evicted': self.evicted
+            }
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads_pid == os.getpid():
+                return
+            # Threads do not survive a fork; start a fresh set in this process
+            self._threads_pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._work, name=f'sigil-job-{index}', daemon=True)
+                for index in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            with self._lock:
+                job.status = 'running'
+                job.started_at = time.time()
+            result, error = None, None
+            try:
+                result = job.task()
+            except BaseException as e:
+                # Anything the render raises fails the job, never the worker thread
+                logger.error(f"❌ Render job {job.id} failed: {e!r}")
+                error = str(e) or type(e).__name__
+            with self._lock:
+                job.finished_at = time.time()
+                job.task = None
+                if error is None:
+                    job.result = result
+                    job.status = 'done'
+                    self.completed += 1
+                    self._result_bytes += len(result[0])
+                    self._evict(keep=job)
+                else:
+                    job.error = error
+                    job.status = 'failed'
+                    self.failed += 1
+            job._done.set()
+
+    def _expire(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            self._drop(job_id)
+            self.expired += 1
+
+    def _evict(self, keep: RenderJob):
+        # Caller holds the lock
+        if self._result_bytes <= self.max_result_bytes:
+            return
+        done = sorted((job for job in self._jobs.values() if job.status == 'done' and job is not keep),
+                      key=lambda job: job.finished_at)
+        for job in done:
+            if self._result_bytes <= self.max_result_bytes:
+                break
+            self._drop(job.id)
+            self.evicted += 1
+
+    def _drop(self, job_id: str):
+        # Caller holds the lock
+        job = self._jobs.pop(job_id)
+        if self._by_key.get(job.key) == job_id:
+            del self._by_key[job.key]
+        if job.result is not None:
+            self._result_bytes -= len(job.result[0])
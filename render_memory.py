@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER MEMORY
+Reusable canvas buffers and a per-worker budget for render working memory
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from render_executor import RenderQueueFull
+
+logger = logging.getLogger(__name__)
+
+MEMORY_POLICIES = ('queue', 'reject')
+
+DEFAULT_POOL_MAX_BYTES = 96 * 1024 * 1024
+DEFAULT_POOL_MAX_PER_KEY = 2
+DEFAULT_MEMORY_BUDGET_MB = 1024
+DEFAULT_MEMORY_WAIT = 10.0
+
+_BYTES_PER_PIXEL = {'RGBA': 4, 'RGB': 3, 'LA': 2, 'L': 1}
+
+
+class RenderMemoryExceeded(RenderQueueFull):
+    """Raised when a render does not fit the worker's memory budget"""
+
+
+def image_bytes(mode: str, size: Tuple[int, int]) -> int:
+    """Pixel storage of a PIL image of ``mode`` and ``size``"""
+    return _BYTES_PER_PIXEL.get(mode, 4) * size[0] * size[1]
+
+
+class BufferPool:
+    """Transparent canvases keyed by (mode, size), reused across renders.
+
+    Large images are allocated with mmap by the C allocator, so every fresh
+    2048 px canvas costs page faults and returns its pages on free; reusing
+    one keeps the worker's footprint flat. Released canvases are cleared
+    before they are handed out again. At most ``max_per_key`` idle canvases
+    are kept per key and ``max_bytes`` in total, least recently used keys
+    going first.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_POOL_MAX_BYTES, max_per_key: int = DEFAULT_POOL_MAX_PER_KEY):
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_per_key = max(0, int(max_per_key))
+        self._idle: 'OrderedDict[Tuple[str, Tuple[int, int]], List[Image.Image]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> 'BufferPool':
+        """Build a pool from SIGIL_BUFFER_POOL_BYTES / SIGIL_BUFFER_POOL_PER_KEY"""
+        return cls(max_bytes=int(os.getenv('SIGIL_BUFFER_POOL_BYTES', str(DEFAULT_POOL_MAX_BYTES))),
+                   max_per_key=int(os.getenv('SIGIL_BUFFER_POOL_PER_KEY', str(DEFAULT_POOL_MAX_PER_KEY))))
+
+    def acquire(self, mode: str, size: Tuple[int, int]) -> Image.Image:
+        """A fully transparent canvas, recycled when one is idle"""
+        key = (mode, tuple(size))
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                img = idle.pop()
+                if not idle:
+                    del self._idle[key]
+                self._bytes -= image_bytes(mode, key[1])
+                self.hits += 1
+            else:
+                img = None
+                self.misses += 1
+
+        if img is None:
+            return Image.new(mode, key[1], 0)
+        img.paste(0, (0, 0) + key[1])
+        return img
+
+    def release(self, img: Image.Image):
+        """Return ``img`` to the pool; the caller must not touch it afterwards"""
+        key = (img.mode, img.size)
+        nbytes = image_bytes(*key)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) >= self.max_per_key:
+                return
+            idle.append(img)
+            self._idle.move_to_end(key)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = next(iter(self._idle.items()))
+                evicted.pop(0)
+                self._bytes -= image_bytes(*evicted_key)
+                if not evicted:
+                    del self._idle[evicted_key]
+
+    @contextmanager
+    def canvas(self, mode: str, size: Tuple[int, int]) -> Iterator[Image.Image]:
+        """Borrow a canvas for the duration of a ``with`` block"""
+        img = self.acquire(mode, size)
+        try:
+            yield img
+        finally:
+            self.release(img)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'idle': sum(len(images) for images in self._idle.values()),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class MemoryBudget:
+    """Admission control for render working memory within one worker process.
+
+    Each render reserves its estimated peak before it starts and gives it
+    back when it finishes. A render that would push the reservations past
+    ``limit_bytes`` either waits up to ``wait`` seconds for others to
+    finish (policy 'queue') or fails at once (policy 'reject'), raising
+    RenderMemoryExceeded either way. A render larger than the whole budget
+    is always rejected. A limit of 0 disables the budget.
+    """
+
+    def __init__(self, limit_bytes: int = DEFAULT_MEMORY_BUDGET_MB * 1024 * 1024, policy: str = 'queue',
+                 wait: float = DEFAULT_MEMORY_WAIT):
+        if policy not in MEMORY_POLICIES:
+            raise ValueError(f"Unknown memory policy: {policy} (expected one of {', '.join(MEMORY_POLICIES)})")
+        self.limit_bytes = max(0, int(limit_bytes))
+        self.policy = policy
+        self.wait = wait
+        self.reserved = 0
+        self.peak_reserved = 0
+        self.admitted = 0
+        self.waited = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls) -> 'MemoryBudget':
+        """Build a budget from SIGIL_WORKER_MEMORY_MB / SIGIL_MEMORY_POLICY / SIGIL_MEMORY_WAIT"""
+        limit_mb = float(os.getenv('SIGIL_WORKER_MEMORY_MB', str(DEFAULT_MEMORY_BUDGET_MB)))
+        return cls(limit_bytes=int(limit_mb * 1024 * 1024),
+                   policy=os.getenv('SIGIL_MEMORY_POLICY', 'queue').lower(),
+                   wait=float(os.getenv('SIGIL_MEMORY_WAIT', str(DEFAULT_MEMORY_WAIT))))
+
+    def acquire(self, nbytes: int):
+        """Reserve ``nbytes`` or raise RenderMemoryExceeded"""
+        if not self.limit_bytes:
+            return
+        with self._cond:
+            if nbytes > self.limit_bytes:
+                self.rejected += 1
+                logger.warning(f"🧱 Rejecting a {nbytes // 2**20} MiB render over the worker memory budget")
+                raise RenderMemoryExceeded(
+                    f"Render needs ~{nbytes // 2**20} MiB, over the worker budget of {self.limit_bytes // 2**20} MiB")
+
+            if self.reserved + nbytes > self.limit_bytes:
+                if self.policy == 'reject':
+                    self.rejected += 1
+                    raise RenderMemoryExceeded("Worker memory budget exhausted, try again shortly")
+                self.waited += 1
+                deadline = time.monotonic() + self.wait
+                while self.reserved + nbytes > self.limit_bytes:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise RenderMemoryExceeded(
+                            f"Worker memory budget still exhausted after {self.wait:g}s, try again shortly")
+                    self._cond.wait(remaining)
+
+            self.reserved += nbytes
+            self.peak_reserved = max(self.peak_reserved, self.reserved)
+            self.admitted += 1
+
+    def release(self, nbytes: int):
+        if not self.limit_bytes:
+            return
+        with self._cond:
+            self.reserved -= nbytes
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[None]:
+        """Hold ``nbytes`` of the budget for the duration of a ``with`` block"""
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'limit_bytes': self.limit_bytes,
+                'policy': self.policy,
+                'reserved': self.reserved,
+                'peak_reserved': self.peak_reserved,
+                'admitted': self.admitted,
+                'waited': self.waited,
+                'rejected': self.rejected,
+                'peak_rss': peak_rss_bytes()
+            }
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
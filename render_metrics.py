@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER METRICS
+Per-stage render histograms and a Prometheus text exposition, without dependencies
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Render stages take from microseconds (seed) to seconds (advanced glow, print sizes)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, as Prometheus exposes them"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (not cumulative), sum, count
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def expose(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, [list(counts), total, count]) for key, (counts, total, count)
+                            in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, ("le", _number(bound)))} '
+                             f'{cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+def expose_value(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Exposition lines for a gauge or counter whose values are read at scrape time"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(f'{name}{_labels(list(labels), list(labels.values()))} {_number(value)}')
+    return lines
+
+
+class RenderMetrics:
+    """Histograms of render stages, whole renders and HTTP requests.
+
+    Renders report their stage timings in the info dict they return
+    (``stages_ms``), so renders run in worker processes are observed by the
+    process that serves the request. Values are per process; under
+    gunicorn each worker exposes its own.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.stages = Histogram('sigil_render_stage_seconds', 'Time spent in each render stage',
+                                ('stage', 'vibe', 'advanced'), buckets)
+        self.renders = Histogram('sigil_render_seconds', 'Wall time of renders that were not served from cache',
+                                 ('vibe', 'advanced'), buckets)
+        self.requests = Histogram('sigil_http_request_seconds', 'HTTP request latency',
+                                  ('endpoint', 'method', 'status'), buckets)
+
+    def observe_render(self, vibe: str, advanced: bool, seconds: float, stages_ms: Optional[Dict] = None):
+        advanced = str(bool(advanced)).lower()
+        self.renders.observe(seconds, vibe=vibe, advanced=advanced)
+        for stage, ms in (stages_ms or {}).items():
+            self.stages.observe(ms / 1000.0, stage=stage, vibe=vibe, advanced=advanced)
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        self.requests.observe(seconds, endpoint=endpoint, method=method, status=status)
+
+    def expose(self) -> List[str]:
+        return self.stages.expose() + self.renders.expose() + self.requests.expose()
+
+
+def server_timing(stages_ms: Optional[Dict] = None, total_ms: Optional[float] = None,
+                  cache: Optional[str] = None) -> str:
+    """``Server-Timing`` header value for one response"""
+    entries = [f'cache;desc="{cache}"'] if cache else []
+    entries += [f'{stage};dur={ms:.2f}' for stage, ms in (stages_ms or {}).items()]
+    if total_ms is not None:
+        entries.append(f'total;dur={total_ms:.2f}')
+    return ', '.join(entries)
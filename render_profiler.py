@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER PROFILER
+Opt-in profiles of slow or sampled renders, written to a rotating local directory
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+import cProfile
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sampler', 'cprofile')
+PROFILE_SUFFIXES = ('.collapsed', '.pstats', '.json')
+
+DEFAULT_PROFILE_MAX_FILES = 100
+DEFAULT_PROFILE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+# Only one cProfile profiler may be active per process on Python 3.12+
+_cprofile_lock = threading.Lock()
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a helper thread.
+
+    Every ``interval`` seconds the target thread's current frame is walked
+    and counted as a collapsed stack (``outer;inner`` function names), the
+    format flame graph tools read. The profiled thread only pays for the
+    sampler's share of the GIL.
+    """
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sigil-stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RenderProfiler:
+    """Profiles renders that are slow, or a random sample of them, without a profiler attached.
+
+    With ``slow_ms`` every render is captured and the profile is kept only
+    if the render took at least that long; ``sample_rate`` keeps a random
+    fraction regardless of latency. ``mode`` 'sampler' records collapsed
+    stacks with a :class:`StackSampler` (cheap enough to leave on);
+    'cprofile' records deterministic pstats, which costs more in Python-heavy
+    code, and skips renders while another one in the process is being
+    profiled.
+
+    Each kept profile is written to ``directory`` next to a JSON file with
+    the render's parameters and timing. The oldest profiles are deleted
+    once there are more than ``max_files`` or they take more than
+    ``max_bytes``. Profiling never fails a render: write errors are logged.
+    """
+
+    def __init__(self, directory: Optional[str] = None, slow_ms: Optional[float] = None,
+                 sample_rate: float = 0.0, mode: str = 'sampler', max_files: int = DEFAULT_PROFILE_MAX_FILES,
+                 max_bytes: int = DEFAULT_PROFILE_MAX_BYTES, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+        self.directory = directory
+        self.slow_ms = slow_ms
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.mode = mode
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.profiled = 0
+        self.saved = 0
+        self.busy = 0
+
+    @classmethod
+    def from_env(cls) -> 'RenderProfiler':
+        """Build a profiler from SIGIL_PROFILE_DIR / _SLOW_MS / _SAMPLE_RATE / _MODE / _MAX_FILES / _MAX_BYTES"""
+        slow_ms = os.getenv('SIGIL_PROFILE_SLOW_MS')
+        return cls(directory=os.getenv('SIGIL_PROFILE_DIR') or None,
+                   slow_ms=float(slow_ms) if slow_ms else None,
+                   sample_rate=float(os.getenv('SIGIL_PROFILE_SAMPLE_RATE', '0')),
+                   mode=os.getenv('SIGIL_PROFILE_MODE', 'sampler').lower(),
+                   max_files=int(os.getenv('SIGIL_PROFILE_MAX_FILES', str(DEFAULT_PROFILE_MAX_FILES))),
+                   max_bytes=int(os.getenv('SIGIL_PROFILE_MAX_BYTES', str(DEFAULT_PROFILE_MAX_BYTES))))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and (self.slow_ms is not None or self.sample_rate > 0)
+
+    @contextmanager
+    def profile(self, params: Dict) -> Iterator[None]:
+        """Profile the ``with`` block, keeping the result if it was slow or sampled"""
+        if not self.enabled:
+            yield
+            return
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_ms is None:
+            yield
+            return
+
+        capture = self._start()
+        if capture is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._stop(capture)
+            with self._lock:
+                self.profiled += 1
+            trigger = 'sampled' if sampled else 'slow' if elapsed_ms >= self.slow_ms else None
+            if trigger:
+                self._save(capture, dict(params, duration_ms=round(elapsed_ms, 3), trigger=trigger))
+
+    def _start(self):
+        if self.mode == 'sampler':
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            return sampler
+        if not _cprofile_lock.acquire(blocking=False):
+            with self._lock:
+                self.busy += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) already owns the hook
+            _cprofile_lock.release()
+            with self._lock:
+                self.busy += 1
+            return None
+        return profile
+
+    def _stop(self, capture):
+        if isinstance(capture, StackSampler):
+            capture.stop()
+        else:
+            capture.disable()
+            _cprofile_lock.release()
+
+    def _save(self, capture, meta: Dict):
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}-{sequence}-{meta['trigger']}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, stem)
+            if isinstance(capture, StackSampler):
+                profile_path = base + '.collapsed'
+                with open(profile_path, 'w') as f:
+                    f.write(capture.collapsed())
+            else:
+                profile_path = base + '.pstats'
+                capture.dump_stats(profile_path)
+            meta.update(mode=self.mode, pid=os.getpid(), timestamp=datetime.now().isoformat(),
+                        profile=os.path.basename(profile_path))
+            with open(base + '.json', 'w') as f:
+                json.dump(meta, f, indent=2, sort_keys=True, default=str)
+            with self._lock:
+                self.saved += 1
+            logger.info(f"🔬 Saved {meta['trigger']} render profile ({meta['duration_ms']:.0f} ms) to {profile_path}")
+            self._rotate()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save render profile: {e}")
+
+    def _rotate(self):
+        """Delete the oldest profiles beyond ``max_files`` profiles or ``max_bytes`` in total"""
+        groups: Dict[str, List] = {}
+        for name in os.listdir(self.directory):
+            stem, suffix = os.path.splitext(name)
+            if suffix not in PROFILE_SUFFIXES:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            group = groups.setdefault(stem, [0.0, 0, []])
+            group[0] = max(group[0], stat.st_mtime)
+            group[1] += stat.st_size
+            group[2].append(path)
+
+        # Stems start with a timestamp, so they order by age even within one mtime tick
+        ordered = sorted(groups.items(), key=lambda item: (item[1][0], item[0]))
+        total = sum(size for _, size, _ in groups.values())
+        while ordered and (len(ordered) > self.max_files or total > self.max_bytes):
+            _, (_, size, paths) = ordered.pop(0)
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'mode': self.mode,
+                'slow_ms': self.slow_ms,
+                'sample_rate': self.sample_rate,
+                'profiled': self.profiled,
+                'saved': self.saved,
+                'busy': self.busy
+            }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT RENDER STREAMS
+Closeable, thread-safe iterators over the chunks of an image being rendered
+"""
+
+import threading
+from typing import Callable, Iterator, List, Optional
+
+from single_flight import FlightAbandoned
+
+
+class RenderStream:
+    """The chunks of a streamed render, for a WSGI or ASGI response body.
+
+    Construction pulls the first chunk, so everything a render does before
+    its first byte (validation, memory admission, the image header) has
+    either succeeded or raised before a response is committed. Chunks are
+    kept as they pass; once the source is exhausted ``on_complete`` gets the
+    whole image. If the stream fails, is cancelled or is closed before that,
+    ``on_abort`` gets the error (:class:`FlightAbandoned` when nothing
+    failed). Exactly one of the two is called.
+
+    ``close`` may be called from any thread: it waits for a chunk that is
+    being rendered on another thread rather than closing the source under
+    it. ``cancel`` sets ``cancel_event``, which the source should check
+    between tiles so a close does not wait for the rest of the image.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], cancel_event: Optional[threading.Event] = None,
+                 on_complete: Optional[Callable[[bytes], None]] = None,
+                 on_abort: Optional[Callable[[BaseException], None]] = None):
+        self._chunks = chunks
+        self.cancel_event = cancel_event or threading.Event()
+        self._on_complete = on_complete
+        self._on_abort = on_abort
+        self._kept: List[bytes] = []
+        self._lock = threading.Lock()
+        self._finished = False
+        self._first: Optional[bytes] = self._pull()
+
+    @classmethod
+    def of(cls, data: bytes) -> 'RenderStream':
+        """A stream over an image that is already complete"""
+        return cls(iter([data]))
+
+    def __iter__(self) -> 'RenderStream':
+        return self
+
+    def __next__(self) -> bytes:
+        with self._lock:
+            if self._first is not None:
+                chunk, self._first = self._first, None
+                return chunk
+            if self._finished:
+                raise StopIteration
+            chunk = self._pull()
+            if chunk is None:
+                raise StopIteration
+            return chunk
+
+    def cancel(self):
+        """Ask the source to stop at its next tile boundary"""
+        self.cancel_event.set()
+
+    def close(self):
+        """Stop the render and release what it holds; a stream closed before its end is abandoned"""
+        self.cancel()
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            self._kept = []
+            # Runs the source's cleanup, such as returning its memory reservation
+            getattr(self._chunks, 'close', lambda: None)()
+            self._abort(FlightAbandoned("Stream closed before the render finished"))
+
+    def __del__(self):
+        # A stream dropped without close() must still end its render, or coalesced callers wait forever
+        self.close()
+
+    def _pull(self) -> Optional[bytes]:
+        # Caller holds the lock, or is the constructor
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._finished = True
+            if self.cancel_event.is_set():
+                self._kept = []
+                self._abort(FlightAbandoned("Render cancelled before it finished"))
+            else:
+                data, self._kept = b''.join(self._kept), []
+                if self._on_complete is not None:
+                    self._on_complete(data)
+            return None
+        except BaseException as e:
+            self._finished = True
+            self._kept = []
+            self._abort(e)
+            raise
+        self._kept.append(chunk)
+        return chunk
+
+    def _abort(self, error: BaseException):
+        if self._on_abort is not None:
+            self._on_abort(error)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT SCENE GRAPH
+Resolution-independent list of drawing primitives with PIL and SVG backends
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import quoteattr
+
+Primitive = Tuple[str, Sequence, Dict]
+
+
+def _flatten(xy: Sequence) -> List[float]:
+    """Coordinates as a flat [x0, y0, x1, y1, ...] list, whether given as pairs or flat"""
+    flat: List[float] = []
+    for item in xy:
+        if isinstance(item, (tuple, list)):
+            flat.extend(item)
+        else:
+            flat.append(item)
+    return flat
+
+
+def _transform(xy: Sequence, scale: float = 1.0, dx: float = 0.0, dy: float = 0.0) -> List:
+    """Scale then translate coordinates, keeping their pair or flat layout"""
+    out: List = []
+    flat = [item for item in xy if not isinstance(item, (tuple, list))]
+    if flat:
+        for index, value in enumerate(xy):
+            out.append(value * scale + (dx if index % 2 == 0 else dy))
+        return out
+    return [(x * scale + dx, y * scale + dy) for x, y in xy]
+
+
+def _svg_color(color: Optional[Tuple[int, ...]]) -> str:
+    if color is None:
+        return 'none'
+    return '#{:02x}{:02x}{:02x}'.format(*color[:3])
+
+
+def _num(value: float) -> str:
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+class Scene:
+    """Primitives emitted by the pattern methods, in drawing order.
+
+    Scene exposes the subset of the ``ImageDraw`` API the patterns use
+    (``line``, ``ellipse``, ``polygon``, ``rectangle``), so a pattern can draw
+    into a scene exactly as it would into a bitmap. ``glow`` carries the
+    effect hints (blur radii and intensities, in scene units) for backends
+    that can express them.
+    """
+
+    def __init__(self, size: int, glow: Optional[Dict] = None, display_size: Optional[int] = None):
+        self.size = size
+        self.glow = glow or {}
+        # Nominal width/height of vector output; the viewBox stays in scene units
+        self.display_size = display_size or size
+        self.primitives: List[Primitive] = []
+
+    def line(self, xy, fill=None, width=1):
+        self.primitives.append(('line', xy, {'fill': fill, 'width': width}))
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self.primitives.append(('ellipse', xy, {'fill': fill, 'outline': outline, 'width': width}))
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.primitives.append(('polygon', xy, {'fill': fill, 'outline': outline, 'width': width}))
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.primitives.append(('rectangle', xy, {'fill': fill, 'outline': outline, 'width': width}))
+
+    def extend(self, primitives: Sequence[Primitive]):
+        """Append already-built primitives, e.g. a precompiled template layer"""
+        self.primitives.extend(primitives)
+
+    def replay(self, draw):
+        """PIL backend: replay every primitive into an ``ImageDraw`` (or another scene)"""
+        for kind, xy, style in self.primitives:
+            getattr(draw, kind)(xy, **style)
+
+    def replay_region(self, draw, box: Tuple[int, int, int, int],
+                      bounds: Optional[List[Tuple[float, float, float, float]]] = None):
+        """Replay the primitives touching ``box`` into a tile whose origin is the box corner.
+
+        ``bounds`` (from :meth:`bounds`) can be passed in when many tiles of
+        the same scene are drawn.
+        """
+        left, top, right, bottom = box
+        for (kind, xy, style), (x0, y0, x1, y1) in zip(self.primitives, bounds or self.bounds()):
+            if x1 >= left and x0 <= right and y1 >= top and y0 <= bottom:
+                getattr(draw, kind)(_transform(xy, 1.0, -left, -top), **style)
+
+    def bounds(self) -> List[Tuple[float, float, float, float]]:
+        """Bounding box of every primitive, padded by its stroke width"""
+        boxes = []
+        for _, xy, style in self.primitives:
+            points = _flatten(xy)
+            pad = style.get('width', 1) + 1
+            xs, ys = points[::2], points[1::2]
+            boxes.append((min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad))
+        return boxes
+
+    def scaled(self, factor: float) -> 'Scene':
+        """Copy of the scene ``factor`` times larger, stroke widths included"""
+        if factor == 1:
+            return self
+        scene = Scene(int(round(self.size * factor)),
+                      glow={key: [value * factor for value in values] if key == 'radii' else values
+                            for key, values in self.glow.items()},
+                      display_size=int(round(self.display_size * factor)))
+        for kind, xy, style in self.primitives:
+            style = dict(style, width=max(1, int(round(style.get('width', 1) * factor))))
+            scene.primitives.append((kind, _transform(xy, factor), style))
+        return scene
+
+    def to_svg(self) -> str:
+        """SVG backend: one element per primitive, glow hints as an SVG filter"""
+        size, display = self.size, self.display_size
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{display}" height="{display}" '
+                 f'viewBox="0 0 {size} {size}">']
+
+        filter_attr = ''
+        if self.glow.get('radii'):
+            parts.append(self._svg_glow_filter())
+            filter_attr = ' filter="url(#glow)"'
+
+        parts.append(f'<g fill="none" stroke-linecap="round" stroke-linejoin="round"{filter_attr}>')
+        for kind, xy, style in self.primitives:
+            parts.append(self._svg_element(kind, _flatten(xy), style))
+        parts.append('</g></svg>')
+        return ''.join(parts)
+
+    def _svg_element(self, kind: str, points: List[float], style: Dict) -> str:
+        if kind == 'line':
+            stroke = _svg_color(style['fill'])
+            paint = f'stroke="{stroke}" stroke-width="{style["width"]}"'
+        else:
+            paint = f'fill="{_svg_color(style["fill"])}"'
+            if style['outline'] is not None:
+                paint += f' stroke="{_svg_color(style["outline"])}" stroke-width="{style["width"]}"'
+
+        if kind == 'ellipse':
+            x0, y0, x1, y1 = points
+            return (f'<ellipse cx="{_num((x0 + x1) / 2)}" cy="{_num((y0 + y1) / 2)}" '
+                    f'rx="{_num((x1 - x0) / 2)}" ry="{_num((y1 - y0) / 2)}" {paint}/>')
+        if kind == 'rectangle':
+            x0, y0, x1, y1 = points
+            return (f'<rect x="{_num(x0)}" y="{_num(y0)}" width="{_num(x1 - x0)}" '
+                    f'height="{_num(y1 - y0)}" {paint}/>')
+
+        coords = ' '.join(f'{_num(x)},{_num(y)}' for x, y in zip(points[::2], points[1::2]))
+        tag = 'polyline' if kind == 'line' else 'polygon'
+        return f'<{tag} points={quoteattr(coords)} {paint}/>'
+
+    def _svg_glow_filter(self) -> str:
+        # Each glow is a brightened blur of the geometry, composited over it like the raster chain
+        parts = ['<defs><filter id="glow" x="-50%" y="-50%" width="200%" height="200%">']
+        merge = ['<feMergeNode in="SourceGraphic"/>']
+        for index, (radius, intensity) in enumerate(zip(self.glow['radii'], self.glow['intensities'])):
+            parts.append(f'<feGaussianBlur in="SourceGraphic" stdDeviation="{_num(radius)}" result="blur{index}"/>')
+            parts.append(f'<feComponentTransfer in="blur{index}" result="glow{index}">'
+                         f'<feFuncR type="linear" slope="{_num(intensity)}"/>'
+                         f'<feFuncG type="linear" slope="{_num(intensity)}"/>'
+                         f'<feFuncB type="linear" slope="{_num(intensity)}"/>'
+                         '</feComponentTransfer>')
+            merge.append(f'<feMergeNode in="glow{index}"/>')
+        if self.glow.get('saturation'):
+            parts.append('<feMerge result="merged">' + ''.join(merge) + '</feMerge>')
+            parts.append(f'<feColorMatrix in="merged" type="saturate" values="{_num(self.glow["saturation"])}"/>')
+        else:
+            parts.append('<feMerge>' + ''.join(merge) + '</feMerge>')
+        parts.append('</filter></defs>')
+        return ''.join(parts)
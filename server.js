@@ -112,7 +112,7 @@ app.post('/api/generate', generateLimiter, async (req, res) => {
   const requestId = Math.random().toString(36).substring(7);
 
   try {
-    const { phrase, vibe, advanced } = req.body;
+    const { phrase, vibe, advanced, encoder, size } = req.body;
 
     // Validation
     if (!phrase || typeof phrase !== 'string' || phrase.trim().length === 0) {
@@ -140,6 +140,10 @@ app.post('/api/generate', generateLimiter, async (req, res) => {
     const validVibes = ['mystical', 'cosmic', 'elemental', 'crystal', 'shadow', 'light', 'storm', 'void'];
     const selectedVibe = validVibes.includes(vibe) ? vibe : 'mystical';
 
+    // Binary mode streams the PNG straight through instead of re-encoding JSON
+    const wantsBinary = req.query.format === 'binary' || req.body.format === 'binary' ||
+      req.accepts(['application/json', 'image/png']) === 'image/png';
+
     console.log(`🎨 [${requestId}] Generating sigil: "${cleanPhrase}" (${selectedVibe}) [Advanced: ${advanced}]`);
     console.log(`🔗 [${requestId}] Backend URL: ${FLASK_URL}/api/generate`);
 
@@ -153,12 +157,16 @@ app.post('/api/generate', generateLimiter, async (req, res) => {
         method: 'POST',
         headers: { 
           'Content-Type': 'application/json',
+          'Accept': wantsBinary ? 'image/png' : 'application/json',
           'X-Request-ID': requestId
         },
         body: JSON.stringify({ 
           phrase: cleanPhrase, 
           vibe: selectedVibe,
-          advanced: advanced 
+          advanced: advanced,
+          encoder: encoder,
+          size: size,
+          format: wantsBinary ? 'binary' : undefined
         }),
         signal: controller.signal
       });
@@ -178,11 +186,28 @@ app.post('/api/generate', generateLimiter, async (req, res) => {
       throw new Error(`Backend service error: ${response.status} - ${errorText}`);
     }
 
+    if (wantsBinary) {
+      const image = Buffer.from(await response.arrayBuffer());
+      const duration = Date.now() - startTime;
+      console.log(`✅ [${requestId}] Generation completed in ${duration}ms (binary)`);
+
+      for (const [name, value] of response.headers) {
+        if (name.startsWith('x-sigil-') || ['etag', 'cache-control', 'content-location', 'server-timing'].includes(name)) {
+          res.set(name, value);
+        }
+      }
+      res.set('X-Request-ID', requestId);
+      return res.type(response.headers.get('content-type') || 'image/png').send(image);
+    }
+
     const data = await response.json();
     const duration = Date.now() - startTime;
 
     console.log(`✅ [${requestId}] Generation completed in ${duration}ms`);
 
+    if (response.headers.get('server-timing')) {
+      res.set('Server-Timing', response.headers.get('server-timing'));
+    }
     res.json({
       success: true,
       image: data.image,
@@ -226,6 +251,131 @@ app.post('/api/generate', generateLimiter, async (req, res) => {
   }
 });
 
+// Progressive generation: relays the backend's server-sent events (preview, then final)
+app.post('/api/generate/stream', generateLimiter, async (req, res) => {
+  const requestId = Math.random().toString(36).substring(7);
+  const controller = new AbortController();
+  // Stop the upstream render when the browser goes away. The request's 'close' fires once its body
+  // has been read; the response only closes before it has ended if the client disconnected
+  res.on('close', () => {
+    if (!res.writableEnded) controller.abort();
+  });
+
+  try {
+    const { phrase, vibe, advanced, encoder, size } = req.body;
+    if (!phrase || typeof phrase !== 'string' || phrase.trim().length < 2 || phrase.trim().length > 500) {
+      return res.status(400).json({
+        success: false,
+        error: 'Phrase must be between 2 and 500 characters'
+      });
+    }
+
+    console.log(`🎨 [${requestId}] Streaming sigil: "${phrase.trim()}" (${vibe}) [Advanced: ${advanced}]`);
+
+    const response = await fetch(`${FLASK_URL}/api/generate/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Request-ID': requestId
+      },
+      body: JSON.stringify({ phrase: phrase.trim(), vibe, advanced, encoder, size }),
+      signal: controller.signal
+    });
+
+    if (!response.ok) {
+      return res.status(response.status).type('application/json').send(await response.text());
+    }
+
+    res.set({
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'X-Request-ID': requestId
+    });
+    res.flushHeaders();
+    response.body.on('data', (chunk) => {
+      res.write(chunk);
+      // compression() buffers output unless told to flush
+      if (res.flush) res.flush();
+    });
+    response.body.on('end', () => res.end());
+    response.body.on('error', () => res.end());
+  } catch (error) {
+    if (error.name === 'AbortError') return;
+    console.error(`❌ [${requestId}] Streaming generation failed:`, error.message);
+    if (!res.headersSent) {
+      res.status(503).json({
+        success: false,
+        error: 'Backend service unavailable - please try again',
+        code: 'SERVICE_UNAVAILABLE'
+      });
+    } else {
+      res.end();
+    }
+  }
+});
+
+// Render jobs: queue a render, then poll for it (proxy to Flask backend)
+app.post('/api/jobs', generateLimiter, async (req, res) => {
+  try {
+    const response = await fetch(`${FLASK_URL}/api/jobs`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(req.body)
+    });
+    if (response.headers.get('location')) {
+      res.set('Location', response.headers.get('location'));
+    }
+    res.status(response.status).json(await response.json());
+  } catch (error) {
+    console.error('Error submitting render job:', error.message);
+    res.status(503).json({
+      success: false,
+      error: 'Backend service unavailable - please try again',
+      code: 'SERVICE_UNAVAILABLE'
+    });
+  }
+});
+
+app.get('/api/jobs/:id', async (req, res) => {
+  try {
+    const wait = req.query.wait ? `?wait=${encodeURIComponent(req.query.wait)}` : '';
+    const response = await fetch(`${FLASK_URL}/api/jobs/${encodeURIComponent(req.params.id)}${wait}`);
+    res.status(response.status).json(await response.json());
+  } catch (error) {
+    console.error('Error polling render job:', error.message);
+    res.status(503).json({
+      success: false,
+      error: 'Backend service unavailable - please try again',
+      code: 'SERVICE_UNAVAILABLE'
+    });
+  }
+});
+
+// Cacheable sigil images by render key (proxy to Flask backend)
+app.get('/api/sigil/:file', async (req, res) => {
+  try {
+    const headers = {};
+    if (req.get('If-None-Match')) {
+      headers['If-None-Match'] = req.get('If-None-Match');
+    }
+    const response = await fetch(`${FLASK_URL}/api/sigil/${encodeURIComponent(req.params.file)}`, { headers });
+
+    for (const name of ['content-type', 'etag', 'cache-control', 'x-sigil-render-key']) {
+      if (response.headers.get(name)) {
+        res.set(name, response.headers.get(name));
+      }
+    }
+    res.status(response.status).send(Buffer.from(await response.arrayBuffer()));
+  } catch (error) {
+    console.error('Error fetching sigil image:', error.message);
+    res.status(503).json({
+      success: false,
+      error: 'Backend service unavailable - please try again',
+      code: 'SERVICE_UNAVAILABLE'
+    });
+  }
+});
+
 // Available vibes endpoint
 app.get('/api/vibes', async (req, res) => {
   try {
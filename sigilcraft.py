@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT COMMAND LINE
+One entry point for the operational tools
+
+    python -m sigilcraft prerender phrases.txt
+    python -m sigilcraft benchmark --output bench.json
+    python -m sigilcraft loadtest --spawn
+    python -m sigilcraft warmup --imports
+"""
+
+import sys
+import importlib
+from typing import Optional, Sequence
+
+# Subcommand -> module whose main(argv) runs it; modules are imported only when their command is used
+COMMANDS = {
+    'prerender': 'prerender',
+    'benchmark': 'benchmark',
+    'loadtest': 'loadtest',
+    'warmup': 'warmup',
+}
+
+
+def usage() -> str:
+    return f"usage: python -m sigilcraft {{{','.join(COMMANDS)}}} [args ...]"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"{usage()}\nsigilcraft: unknown command '{command}'", file=sys.stderr)
+        return 2
+    module = importlib.import_module(COMMANDS[command])
+    return module.main(rest)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT SINGLE-FLIGHT
+Coalesces identical concurrent renders so only one of them does the work
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FlightAbandoned(Exception):
+    """Set on a call whose leader gave up without a result; waiting callers retry instead of failing"""
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait on the leader's future and receive the
+    same result, or the same exception. Nothing is remembered once the call
+    finishes; that is the render cache's job. Leaders that cannot run their
+    call as one function (a streamed render) use :meth:`begin` and
+    :meth:`end` directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(fn(), shared)``, where ``shared`` is True for callers that waited on a leader"""
+        while True:
+            future, leader = self.begin(key)
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except FlightAbandoned:
+                # The leader went away without a result; take the call over
+                continue
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.end(key, future, error=e)
+            raise
+        self.end(key, future, result)
+        return result, False
+
+    def begin(self, key: str) -> Tuple[Future, bool]:
+        """Join the call for ``key``, returning ``(future, leader)``; a leader must :meth:`end` it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+                return future, True
+            self.coalesced += 1
+            return future, False
+
+    def end(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        """Finish a call started with :meth:`begin`, handing ``result`` (or ``error``) to its waiters"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Counters for the health endpoint; ``coalesced`` is the number of renders saved"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced
+            }
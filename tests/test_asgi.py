@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Async (ASGI) serving mode tests for Sigilcraft
+"""
+import os
+import sys
+import json
+import base64
+import asyncio
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import app as flask_app
+from asgi import AsyncSigilApp
+
+@pytest.fixture
+def client():
+    flask_app.testing = True
+    with flask_app.test_client() as c:
+        yield c
+
+@pytest.fixture
+def asgi_app():
+    app = AsyncSigilApp(threads=2)
+    yield app
+    app.shutdown()
+
+async def _request(app, method, path, body=b'', headers=(), query=b'', disconnect=None):
+    """Run one request through ``app``; returns (status, headers, body).
+
+    The client disconnects once ``disconnect`` (an asyncio.Event) is set.
+    """
+    incoming = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        if disconnect is not None:
+            await disconnect.wait()
+        else:
+            await asyncio.Event().wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(name.encode(), value.encode()) for name, value in headers]}
+    await app(scope, receive, send)
+    if not sent:
+        return None, {}, b''
+    response_headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+def _call(app, *args, **kwargs):
+    return asyncio.run(_request(app, *args, **kwargs))
+
+def _generate(app, payload, **kwargs):
+    return _call(app, 'POST', '/api/generate', json.dumps(payload).encode(), **kwargs)
+
+class TestRoutes:
+    """Test the async routes answer like the Flask ones"""
+
+    def test_health_ready_and_vibes(self, asgi_app, client):
+        status, headers, body = _call(asgi_app, 'GET', '/health')
+        health = json.loads(body)
+        assert status == 200 and health['status'] == 'healthy' and health['server']['mode'] == 'asgi'
+        assert headers['access-control-allow-origin'] == '*'
+
+        status, _, body = _call(asgi_app, 'GET', '/ready')
+        assert status == 200 and json.loads(body)['ready']
+
+        status, _, body = _call(asgi_app, 'GET', '/api/vibes')
+        assert status == 200 and json.loads(body) == client.get('/api/vibes').get_json()
+
+    def test_generate_json_matches_flask(self, asgi_app, client):
+        payload = {'phrase': 'async sigil', 'vibe': 'cosmic'}
+        status, headers, body = _generate(asgi_app, payload)
+        data = json.loads(body)
+        assert status == 200 and data['success']
+        assert base64.b64decode(data['image']).startswith(b'\x89PNG')
+        assert headers['server-timing'].startswith('cache;desc=')
+        expected = client.post('/api/generate', json=payload).get_json()
+        assert data['metadata']['render_key'] == expected['metadata']['render_key']
+        assert data['image'] == expected['image']
+
+    def test_generate_binary(self, asgi_app):
+        status, headers, body = _generate(asgi_app, {'phrase': 'async binary', 'vibe': 'void'},
+                                          headers=[('Accept', 'image/png')])
+        assert status == 200 and headers['content-type'] == 'image/png'
+        assert body.startswith(b'\x89PNG') and int(headers['content-length']) == len(body)
+        assert headers['etag'] == f'"{headers["x-sigil-render-key"]}"'
+
+        status, headers, _ = _generate(asgi_app, {'phrase': 'async binary', 'vibe': 'void'},
+                                       query=b'format=binary&encoder=jpeg')
+        assert status == 200 and headers['content-type'] == 'image/jpeg'
+
+    def test_errors(self, asgi_app):
+        assert _generate(asgi_app, {'phrase': 'x'})[0] == 400
+        assert _call(asgi_app, 'POST', '/api/generate', b'not json')[0] == 400
+        assert _call(asgi_app, 'GET', '/nowhere')[0] == 404
+        assert _call(asgi_app, 'POST', '/api/generate', b' ' * (2 * 1024 * 1024))[0] == 413
+
+    def test_tiled_sizes_stream(self, asgi_app, monkeypatch):
+        monkeypatch.setattr(main, 'TILE_THRESHOLD', 256)
+        monkeypatch.setattr(main, 'TILE_SIZE', 128)
+        status, headers, body = _generate(asgi_app, {'phrase': 'async tiles', 'vibe': 'crystal', 'size': 384},
+                                          headers=[('Accept', 'image/png')])
+        assert status == 200 and 'content-length' not in headers and headers['x-sigil-size'] == '384'
+        assert body.startswith(b'\x89PNG') and body.endswith(b'IEND\xaeB`\x82')
+
+class TestConcurrency:
+    """Test the event loop stays free while renders run, and disconnects drop queued renders"""
+
+    def _blocking_generator(self, monkeypatch, release):
+        calls = []
+        real = main.generator.generate_sigil_image
+
+        def render(*args, **kwargs):
+            calls.append(args[0])
+            release.wait(30)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(main.generator, 'generate_sigil_image', render)
+        return calls
+
+    def test_other_requests_are_served_during_a_render(self, monkeypatch):
+        release = threading.Event()
+        calls = self._blocking_generator(monkeypatch, release)
+        app = AsyncSigilApp(threads=1)
+
+        async def scenario():
+            render = asyncio.ensure_future(_request(app, 'POST', '/api/generate',
+                                                    json.dumps({'phrase': 'slow render'}).encode()))
+            while not calls:
+                await asyncio.sleep(0.01)
+            health = await asyncio.gather(*[_request(app, 'GET', '/health') for _ in range(50)])
+            assert not render.done()
+            release.set()
+            return health, await render
+
+        try:
+            health, (status, _, _) = asyncio.run(scenario())
+        finally:
+            release.set()
+            app.shutdown()
+        assert all(response[0] == 200 for response in health)
+        assert status == 200
+
+    def test_disconnect_drops_a_queued_render(self, monkeypatch):
+        release = threading.Event()
+        calls = self._blocking_generator(monkeypatch, release)
+        app = AsyncSigilApp(threads=1)
+
+        async def scenario():
+            first = asyncio.ensure_future(_request(app, 'POST', '/api/generate',
+                                                   json.dumps({'phrase': 'first in line'}).encode()))
+            while not calls:
+                await asyncio.sleep(0.01)
+            gone = asyncio.Event()
+            second = asyncio.ensure_future(_request(app, 'POST', '/api/generate',
+                                                    json.dumps({'phrase': 'walks away'}).encode(),
+                                                    disconnect=gone))
+            await asyncio.sleep(0.05)
+            gone.set()
+            dropped = await second
+            release.set()
+            return dropped, await first
+
+        try:
+            dropped, (status, _, _) = asyncio.run(scenario())
+        finally:
+            release.set()
+            app.shutdown()
+        assert dropped == (None, {}, b'')
+        assert status == 200 and calls == ['first in line']
+        assert app.stats()['disconnected'] == 1
+
+    def test_disconnect_mid_tile_stops_the_stream_and_releases_its_memory(self, monkeypatch):
+        monkeypatch.setattr(main, 'TILE_THRESHOLD', 256)
+        monkeypatch.setattr(main, 'TILE_SIZE', 128)
+        monkeypatch.setattr(main.generator, 'cache', None)
+        rendering, release, tiles = threading.Event(), threading.Event(), []
+        glow_stack = main.generator._numpy_glow.glow_stack
+
+        def slow_tile(*args, **kwargs):
+            tiles.append(1)
+            rendering.set()
+            release.wait(10)
+            return glow_stack(*args, **kwargs)
+
+        monkeypatch.setattr(main.generator._numpy_glow, 'glow_stack', slow_tile)
+        app = AsyncSigilApp(threads=2)
+
+        async def scenario():
+            gone = asyncio.Event()
+            request = asyncio.ensure_future(_request(app, 'POST', '/api/generate',
+                                                     json.dumps({'phrase': 'left mid tile', 'vibe': 'cosmic',
+                                                                 'size': 384}).encode(),
+                                                     headers=[('Accept', 'image/png')], disconnect=gone))
+            while not rendering.is_set():
+                await asyncio.sleep(0.01)
+            gone.set()
+            await asyncio.sleep(0.05)
+            release.set()
+            return await request
+
+        try:
+            status, _, body = asyncio.run(scenario())
+        finally:
+            release.set()
+            app.shutdown()
+        assert status == 200 and body.startswith(b'\x89PNG') and not body.endswith(b'IEND\xaeB`\x82')
+        assert len(tiles) == 1
+        assert main.generator.memory_budget.stats()['reserved'] == 0
+        assert main.generator.single_flight.stats()['in_flight'] == 0
+        assert app.stats()['disconnected'] == 1
+
+    def test_disconnect_waits_for_the_running_chunk_before_closing(self):
+        running, release, cleaned_up = threading.Event(), threading.Event(), []
+
+        def chunks():
+            try:
+                yield b'header'
+                running.set()
+                release.wait(10)
+                yield b'rows'
+            finally:
+                cleaned_up.append(True)
+
+        app = AsyncSigilApp(threads=2)
+        sent = []
+
+        async def scenario():
+            gone = asyncio.Event()
+
+            async def receive():
+                await gone.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            stream = asyncio.ensure_future(app._stream(chunks(), receive, send))
+            while not running.is_set():
+                await asyncio.sleep(0.01)
+            gone.set()
+            await asyncio.sleep(0.05)
+            assert not stream.done()
+            release.set()
+            await stream
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            release.set()
+            app.shutdown()
+        assert cleaned_up == [True] and app.stats()['disconnected'] == 1
+        assert [message.get('body') for message in sent] == [b'header']
+
+class TestLifespan:
+    """Test startup warms the worker and shutdown stops the thread pool"""
+
+    def test_lifespan(self, monkeypatch):
+        started = []
+        monkeypatch.setattr(main, 'start_worker', lambda: started.append(True))
+        app = AsyncSigilApp(threads=1)
+        app.pool  # created on first use; shutdown must release it
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(app({'type': 'lifespan'}, receive, send))
+        assert started == [True]
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        assert app._pool is None
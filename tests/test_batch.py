@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Batch generation tests for Sigilcraft
+"""
+import os
+import sys
+import json
+import zipfile
+import pytest
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, UltraRevolutionarySigilGenerator
+from render_cache import RenderCache
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+class TestGenerateSigils:
+    """Test UltraRevolutionarySigilGenerator.generate_sigils"""
+
+    def test_results_follow_request_order_and_deduplicate(self):
+        cache = RenderCache()
+        gen = UltraRevolutionarySigilGenerator(cache=cache)
+        requests = [
+            ("abundance", "cosmic", False),
+            {"phrase": "protection", "vibe": "crystal"},
+            ("abundance", "cosmic", False),
+        ]
+        results = gen.generate_sigils(requests, max_workers=2)
+        assert [r['phrase'] for r in results] == ["abundance", "protection", "abundance"]
+        assert results[0]['image'] == results[2]['image']
+        assert results[0]['render_key'] == results[2]['render_key']
+        assert cache.stats()['stores'] == 2
+
+    def test_pool_matches_inline_rendering(self):
+        gen = UltraRevolutionarySigilGenerator()
+        requests = [("abundance", "cosmic", False), ("protection", "void", False)]
+        pooled = gen.generate_sigils(requests, max_workers=2)
+        inline = gen.generate_sigils(requests, max_workers=1)
+        assert [r['image'] for r in pooled] == [r['image'] for r in inline]
+
+    def test_cached_items_are_not_rerendered(self):
+        cache = RenderCache()
+        gen = UltraRevolutionarySigilGenerator(cache=cache)
+        gen.generate_sigil_png("abundance", "cosmic")
+        results = gen.generate_sigils([("abundance", "cosmic", False)])
+        assert results[0]['cached'] is True
+
+class TestBatchEndpoint:
+    """Test /api/generate/batch"""
+
+    ITEMS = [
+        {"phrase": "abundance", "vibe": "cosmic"},
+        {"phrase": "abundance", "vibe": "cosmic"},
+        {"phrase": "clarity", "vibe": "light"},
+    ]
+
+    def test_ndjson_stream(self, client):
+        response = client.post("/api/generate/batch", json={"items": self.ITEMS})
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert lines[-1]['done'] is True and lines[-1]['success'] is True
+        assert sorted(line['index'] for line in lines[:-1]) == [0, 1, 2]
+        assert all(line['image'] for line in lines[:-1])
+
+    def test_zip_archive(self, client):
+        response = client.post("/api/generate/batch", json={"items": self.ITEMS, "format": "zip"})
+        assert response.status_code == 200
+        with zipfile.ZipFile(BytesIO(response.data)) as zf:
+            manifest = json.loads(zf.read("manifest.json"))
+            assert len(manifest) == 3
+            assert zf.read(manifest[0]['file']).startswith(b"\x89PNG")
+
+    def test_validation(self, client):
+        assert client.post("/api/generate/batch", json={}).status_code == 400
+        assert client.post("/api/generate/batch", json={"items": [{"phrase": "a"}]}).status_code == 400
+        response = client.post("/api/generate/batch", json={"items": self.ITEMS, "format": "tar"})
+        assert response.status_code == 400
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Render benchmark harness tests for Sigilcraft
+
+The full benchmark (corpus x all vibes x advanced on/off) only runs when
+SIGIL_BENCHMARK=1; set SIGIL_BENCHMARK_OUTPUT to keep its JSON report and
+SIGIL_BENCHMARK_BASELINE to fail on regressions against an earlier one.
+"""
+import os
+import sys
+import json
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+from benchmark import STAGES, diff_reports, percentile, run_benchmark
+
+@pytest.fixture(scope="module")
+def small_report():
+    return run_benchmark(["abundance flows to me"], ["cosmic", "storm"], iterations=2)
+
+class TestHarness:
+    """Test the benchmark harness on a tiny corpus"""
+
+    def test_percentile_matches_numpy(self):
+        np = pytest.importorskip("numpy")
+        values = [5.0, 1.0, 9.0, 3.0, 7.0, 2.0]
+        for q in (0, 50, 95, 99, 100):
+            assert percentile(values, q) == pytest.approx(np.percentile(values, q))
+        assert percentile([], 50) == 0.0
+
+    def test_report_covers_every_stage(self, small_report):
+        assert set(small_report['groups']) == {'basic', 'advanced'}
+        for group in small_report['groups'].values():
+            assert group['renders'] == 4
+            assert group['throughput_rps'] > 0
+            assert set(group['vibes']) == {'cosmic', 'storm'}
+            assert set(group['stages']) == set(STAGES)
+            assert group['total']['p50_ms'] <= group['total']['p95_ms'] <= group['total']['p99_ms']
+            assert group['stages']['effects']['peak_traced_bytes'] > 0
+        json.dumps(small_report)
+
+    def test_diff_flags_slower_metrics_only(self, small_report):
+        assert diff_reports(small_report, small_report) == []
+        slower = json.loads(json.dumps(small_report))
+        slower['groups']['basic']['stages']['encode']['p50_ms'] *= 2
+        regressions = diff_reports(small_report, slower, threshold=0.5)
+        assert [item['metric'] for item in regressions] == ['basic.stages.encode.p50_ms']
+        assert diff_reports(slower, small_report) == []
+
+    def test_cli_writes_report_and_fails_on_regression(self, tmp_path, capsys):
+        output = tmp_path / "bench.json"
+        args = ["--phrases", "1", "--vibes", "cosmic", "--mode", "basic", "--no-memory"]
+        assert benchmark.main(args + ["--output", str(output)]) == 0
+        report = json.loads(output.read_text())
+        assert report['groups']['basic']['renders'] == 1
+
+        report['groups']['basic']['total']['p50_ms'] /= 100
+        output.write_text(json.dumps(report))
+        assert benchmark.main(args + ["--baseline", str(output)]) == 1
+        assert "regressed" in capsys.readouterr().out
+
+@pytest.mark.skipif(os.getenv("SIGIL_BENCHMARK") != "1", reason="set SIGIL_BENCHMARK=1 to run the full benchmark")
+def test_full_benchmark():
+    report = run_benchmark()
+    print(benchmark.format_report(report))
+    if os.getenv("SIGIL_BENCHMARK_OUTPUT"):
+        with open(os.environ["SIGIL_BENCHMARK_OUTPUT"], "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if os.getenv("SIGIL_BENCHMARK_BASELINE"):
+        with open(os.environ["SIGIL_BENCHMARK_BASELINE"]) as f:
+            assert diff_reports(json.load(f), report, float(os.getenv("SIGIL_BENCHMARK_THRESHOLD", "0.10"))) == []
@@ -7,11 +7,16 @@ import os
 import sys
 import pytest
 import json
+import base64
+import random
+from io import BytesIO
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import app, generator
+from main import app, generator, UltraRevolutionarySigilGenerator
 
 @pytest.fixture
 def client():
@@ -127,5 +132,221 @@ class TestSigilGenerator:
             assert isinstance(style['colors'], list)
             assert len(style['colors']) > 0
 
+class TestDeterministicSeeding:
+    """Test process-stable seeding and render keys"""
+
+    SEED_SNIPPET = (
+        "from main import generator; "
+        "print(generator._generate_ultra_unique_seed('abundance', 'cosmic', {version}))"
+    )
+
+    def _seed_in_subprocess(self, version, hash_seed):
+        env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", self.SEED_SNIPPET.format(version=version)],
+            cwd=root, env=env, capture_output=True, text=True, check=True
+        )
+        return int(result.stdout.strip().splitlines()[-1])
+
+    def test_seed_is_stable_across_processes(self):
+        """Test the current seed scheme ignores the interpreter hash salt"""
+        assert self._seed_in_subprocess(2, 1) == self._seed_in_subprocess(2, 2)
+
+    def test_legacy_seed_depends_on_hash_salt(self):
+        """Test the legacy scheme is still available behind seed_version=1"""
+        assert self._seed_in_subprocess(1, 1) != self._seed_in_subprocess(1, 2)
+
+    def test_unsupported_seed_version(self):
+        """Test unknown seed versions are rejected"""
+        with pytest.raises(ValueError):
+            generator._generate_ultra_unique_seed("abundance", "cosmic", 99)
+
+    def test_render_key(self):
+        """Test render keys cover every input that changes the image"""
+        key = generator.render_key("abundance", "cosmic", False, 2)
+        assert key == generator.render_key("abundance", "cosmic", False, 2)
+        assert key != generator.render_key("abundance", "cosmic", True, 2)
+        assert key != generator.render_key("abundance", "crystal", False, 2)
+        assert key != generator.render_key("abundance", "cosmic", False, 1)
+        assert generator.render_key("abundance", "unknown") == generator.render_key("abundance", "mystical")
+
+    def test_generate_rejects_bad_seed_version(self, client):
+        """Test the API validates seed_version"""
+        response = client.post("/api/generate", json={"phrase": "abundance", "seed_version": 99})
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("seed_version", [True, 1.0, 2.0, "2"])
+    def test_seed_version_must_be_an_int(self, client, seed_version):
+        """Test booleans, floats and strings equal to a version are not accepted"""
+        response = client.post("/api/generate", json={"phrase": "abundance", "seed_version": seed_version})
+        assert response.status_code == 400
+        with pytest.raises(ValueError):
+            generator.resolve_seed_version(seed_version)
+
+    def test_unsupported_default_seed_version(self):
+        """Test SIGIL_SEED_VERSION is checked when the app is imported"""
+        env = dict(os.environ, SIGIL_SEED_VERSION="3")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", "import main"], cwd=root, env=env,
+                                capture_output=True, text=True)
+        assert result.returncode != 0
+        assert "Unsupported SIGIL_SEED_VERSION" in result.stderr
+
+class TestConcurrentRendering:
+    """Test renders are deterministic when run from several threads"""
+
+    def test_threaded_renders_match_sequential(self):
+        """Test concurrent renders produce the same images as sequential ones"""
+        gen = UltraRevolutionarySigilGenerator()
+        jobs = [("abundance", "cosmic"), ("protection", "crystal"), ("clarity", "storm")] * 2
+        sequential = [gen.generate_sigil_png(phrase, vibe) for phrase, vibe in jobs]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            threaded = list(pool.map(lambda job: gen.generate_sigil_png(*job), jobs))
+        assert threaded == sequential
+
+    def test_render_leaves_global_rng_untouched(self):
+        """Test rendering does not reseed the module-global generators"""
+        state = random.getstate()
+        UltraRevolutionarySigilGenerator().generate_sigil_png("abundance", "mystical")
+        assert random.getstate() == state
+
+class TestRenderModes:
+    """Test the supersampled advanced pipeline against the legacy one"""
+
+    MAX_MEAN_CHANNEL_DIFF = 4.0
+
+    def _pixels(self, png_bytes):
+        from PIL import Image
+        import numpy as np
+        return np.asarray(Image.open(BytesIO(png_bytes)).convert("RGBA")).astype("float32")
+
+    # A low-glow vibe, and light, the brightest glow over the thinnest strokes
+    @pytest.mark.parametrize("vibe", ["mystical", "crystal", "light"])
+    def test_supersample_matches_legacy_within_tolerance(self, vibe):
+        """Test supersampled advanced renders stay visually close to legacy ones"""
+        legacy = UltraRevolutionarySigilGenerator(render_mode="legacy")
+        fast = UltraRevolutionarySigilGenerator(render_mode="supersample")
+        expected = self._pixels(legacy.generate_sigil_png("abundance flows to me", vibe, True))
+        actual = self._pixels(fast.generate_sigil_png("abundance flows to me", vibe, True))
+        assert actual.shape == expected.shape == (1024, 1024, 4)
+        assert abs(actual - expected).mean() < self.MAX_MEAN_CHANNEL_DIFF
+
+    def test_render_mode_is_part_of_advanced_key(self):
+        """Test cached advanced renders are not shared between render modes"""
+        legacy = UltraRevolutionarySigilGenerator(render_mode="legacy")
+        fast = UltraRevolutionarySigilGenerator(render_mode="supersample")
+        assert legacy.render_key("abundance", "cosmic", True) != fast.render_key("abundance", "cosmic", True)
+        assert legacy.render_key("abundance", "cosmic", False) == fast.render_key("abundance", "cosmic", False)
+
+    def test_render_version_is_part_of_advanced_key(self, monkeypatch):
+        """Test bumping a render mode's output revision retires its cached advanced renders"""
+        import main
+        fast = UltraRevolutionarySigilGenerator(render_mode="supersample")
+        legacy = UltraRevolutionarySigilGenerator(render_mode="legacy")
+        keys = [gen.render_key("abundance", "cosmic", advanced) for gen in (fast, legacy) for advanced in (True, False)]
+        monkeypatch.setitem(main.RENDER_MODE_VERSIONS, "supersample", main.RENDER_MODE_VERSIONS["supersample"] + 1)
+        bumped = [gen.render_key("abundance", "cosmic", advanced) for gen in (fast, legacy) for advanced in (True, False)]
+        assert bumped[0] != keys[0]
+        assert bumped[1:] == keys[1:]
+
+    def test_unknown_render_mode(self):
+        """Test invalid render modes are rejected"""
+        with pytest.raises(ValueError):
+            UltraRevolutionarySigilGenerator(render_mode="turbo")
+
+class TestVibeTemplates:
+    """Test the precompiled vibe layer draws exactly what the pattern method draws"""
+
+    @pytest.mark.parametrize("vibe", ["mystical", "cosmic", "elemental", "crystal", "void"])
+    @pytest.mark.parametrize("size", [256, 1024, 2048])
+    def test_template_matches_direct_drawing(self, vibe, size):
+        """Test replaying a template is pixel-identical to drawing the pattern"""
+        from PIL import Image, ImageDraw
+        gen = UltraRevolutionarySigilGenerator()
+        style = gen.vibe_styles[vibe]
+        direct = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        gen._create_vibe_pattern(ImageDraw.Draw(direct), "any phrase", vibe, style, size)
+        replayed = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        gen._draw_vibe_template(ImageDraw.Draw(replayed), vibe, style, size)
+        assert replayed.tobytes() == direct.tobytes()
+
+    def test_templates_are_compiled_once(self):
+        """Test the template for a (vibe, size) pair is reused"""
+        gen = UltraRevolutionarySigilGenerator()
+        gen.generate_sigil_png("first phrase", "crystal")
+        template = gen._vibe_templates[("crystal", 1024)]
+        gen.generate_sigil_png("second phrase", "crystal")
+        assert gen._vibe_templates[("crystal", 1024)] is template
+
+class TestBinaryResponses:
+    """Test content negotiation and the cacheable image URL"""
+
+    def test_format_binary_returns_png(self, client):
+        """Test format=binary returns raw PNG bytes with metadata headers"""
+        response = client.post("/api/generate?format=binary", json={"phrase": "binary sigil", "vibe": "void"})
+        assert response.status_code == 200
+        assert response.mimetype == "image/png"
+        assert response.data.startswith(b"\x89PNG")
+        assert response.headers['X-Sigil-Vibe'] == "void"
+        assert response.headers['X-Sigil-Phrase'] == "binary%20sigil"
+        assert response.headers['ETag'].strip('"') == response.headers['X-Sigil-Render-Key']
+
+    def test_accept_header_negotiation(self, client):
+        """Test Accept: image/png selects the binary response"""
+        response = client.post("/api/generate", json={"phrase": "binary sigil"},
+                               headers={"Accept": "image/png"})
+        assert response.mimetype == "image/png"
+        response = client.post("/api/generate", json={"phrase": "binary sigil"},
+                               headers={"Accept": "*/*"})
+        assert response.mimetype == "application/json"
+
+    def test_sigil_url_and_etag(self, client):
+        """Test the render key URL serves the same image and honours If-None-Match"""
+        data = client.post("/api/generate", json={"phrase": "cached sigil", "vibe": "light"}).get_json()
+        url = data['metadata']['url']
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data == base64.b64decode(data['image'])
+        etag = response.headers['ETag']
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_evicted_key_is_rendered_again(self, client):
+        """Test keys remain resolvable after their image left the memory cache"""
+        from main import render_cache
+        data = client.post("/api/generate", json={"phrase": "evicted sigil"}).get_json()
+        render_cache.clear()
+        response = client.get(data['metadata']['url'])
+        assert response.status_code == 200
+        assert response.data == base64.b64decode(data['image'])
+
+    def test_unknown_and_invalid_keys(self, client):
+        """Test unknown keys 404 and malformed keys 400"""
+        assert client.get("/api/sigil/" + "0" * 64 + ".png").status_code == 404
+        assert client.get("/api/sigil/not-a-key.png").status_code == 400
+
+    def test_unknown_key_is_not_revalidated(self, client):
+        """Test If-None-Match cannot turn an unknown key into a 304"""
+        key = "0" * 64
+        assert client.get(f"/api/sigil/{key}.png", headers={"If-None-Match": f'"{key}"'}).status_code == 404
+
+    def test_extension_must_match_the_encoder(self, client):
+        """Test a key is only served under its own encoder's extension"""
+        data = client.post("/api/generate", json={"phrase": "extension sigil"}).get_json()
+        url = data['metadata']['url']
+        assert url.endswith(".png") and client.get(url).status_code == 200
+        assert client.get(url[:-len("png")] + "webp").status_code == 404
+        assert client.get(url[:-len("png")] + "webp", headers={"If-None-Match": "*"}).status_code == 404
+
+    def test_legacy_seed_has_no_content_address(self, client):
+        """Test legacy-seeded responses advertise no URL, ETag or immutable caching"""
+        data = client.post("/api/generate", json={"phrase": "legacy sigil", "seed_version": 1}).get_json()
+        assert data['success'] and 'url' not in data['metadata']
+        response = client.post("/api/generate?format=binary", json={"phrase": "legacy sigil", "seed_version": 1})
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers and 'Content-Location' not in response.headers
+        assert 'immutable' not in response.headers['Cache-Control']
+        assert client.get(f"/api/sigil/{response.headers['X-Sigil-Render-Key']}.png").status_code == 404
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
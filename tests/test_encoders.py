@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Output encoder tests for Sigilcraft
+"""
+import os
+import sys
+import base64
+import pytest
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from encoders import ENCODERS, ImageEncoder, encode_image, get_encoder, register_encoder
+from main import app, UltraRevolutionarySigilGenerator
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+@pytest.fixture
+def sigil():
+    img = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+    img.paste((255, 0, 255, 255), (16, 16, 48, 48))
+    return img
+
+class TestEncoderRegistry:
+    """Test the encoder registry"""
+
+    @pytest.mark.parametrize("name", sorted(name for name, encoder in ENCODERS.items() if not encoder.vector))
+    def test_every_encoder_round_trips(self, sigil, name):
+        data, info = encode_image(sigil, name)
+        assert info['encoder'] == name
+        assert info['bytes'] == len(data)
+        assert info['encode_ms'] >= 0
+        decoded = Image.open(BytesIO(data))
+        assert decoded.size == sigil.size
+        assert Image.MIME[decoded.format] == info['mimetype']
+
+    def test_jpeg_is_flattened(self, sigil):
+        data, _ = encode_image(sigil, "jpeg")
+        decoded = Image.open(BytesIO(data))
+        assert decoded.mode == "RGB"
+        assert decoded.getpixel((0, 0)) == (0, 0, 0)
+
+    def test_unknown_encoder(self):
+        with pytest.raises(ValueError):
+            get_encoder("bmp")
+
+    def test_register_custom_encoder(self, sigil):
+        register_encoder(ImageEncoder("png-store", "PNG", "image/png", "png", compress_level=0))
+        try:
+            data, info = encode_image(sigil, "png-store")
+            assert info['bytes'] > encode_image(sigil, "png")[1]['bytes']
+        finally:
+            ENCODERS.pop("png-store")
+
+class TestEncoderSelection:
+    """Test encoders through the generator and the API"""
+
+    def test_encoder_is_part_of_render_key(self):
+        gen = UltraRevolutionarySigilGenerator()
+        assert gen.render_key("abundance", "cosmic", False, 2, "png") != \
+            gen.render_key("abundance", "cosmic", False, 2, "jpeg")
+
+    def test_generate_with_jpeg(self, client):
+        response = client.post("/api/generate", json={"phrase": "encoded sigil", "encoder": "jpeg"})
+        data = response.get_json()
+        assert data['mimetype'] == "image/jpeg"
+        assert data['metadata']['encoding']['encoder'] == "jpeg"
+        assert data['metadata']['url'].endswith(".jpg")
+        assert base64.b64decode(data['image']).startswith(b"\xff\xd8")
+        assert client.get(data['metadata']['url']).mimetype == "image/jpeg"
+
+    def test_binary_response_uses_encoder_mimetype(self, client):
+        response = client.post("/api/generate?format=binary&encoder=png-fast", json={"phrase": "encoded sigil"})
+        assert response.mimetype == "image/png"
+        assert response.headers['X-Sigil-Encoder'] == "png-fast"
+
+    def test_unknown_encoder_is_rejected(self, client):
+        response = client.post("/api/generate", json={"phrase": "encoded sigil", "encoder": "bmp"})
+        assert response.status_code == 400
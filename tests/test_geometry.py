@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Geometry engine tests for Sigilcraft
+"""
+import os
+import sys
+import math
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+from PIL import Image, ImageDraw
+
+import main
+import geometry
+from main import UltraRevolutionarySigilGenerator
+
+PHRASES = ["abundance flows to me", "I am calm", "Ünïcödé straße İstanbul 🌟", "x y", "a" * 40,
+           "one two three four five six seven eight nine ten eleven"]
+
+def _draw(gen, phrase, size, vibe="cosmic"):
+    style = gen.vibe_styles[vibe]
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    gen._create_base_pattern(draw, phrase, style, size)
+    gen._create_text_pattern(draw, phrase, style, size)
+    return img.tobytes()
+
+class TestGlyphArrays:
+    """Test the phrase -> array stage without rasterizing"""
+
+    def test_base_glyphs_follow_the_character_formula(self):
+        glyphs = geometry.base_glyphs("Hi!", 1024, 7)
+        for i, char in enumerate("Hi!"):
+            angle = (ord(char) * 13 + i * 30) % 360
+            radius = 1024 // 10 + ord(char) % (1024 // 20)
+            assert glyphs['angle'][i] == angle
+            assert glyphs['x'][i] == 512 + radius * math.cos(math.radians(angle))
+            assert glyphs['size_factor'][i] == max(3, ord(char) % 15)
+            assert glyphs['shape'][i] == ord(char) % 3
+        assert glyphs['vertices'].shape == (3, 6, 2)
+
+    def test_word_glyphs_follow_the_word_formula(self):
+        glyphs = geometry.word_glyphs("Sun moonlight", 1024, 5)
+        assert glyphs['energy'].tolist() == [sum(map(ord, "sun")), sum(map(ord, "moonlight"))]
+        assert [geometry.WORD_SHAPES[s] for s in glyphs['shape']] == ['triangle', 'hexagon']
+        assert glyphs['distance'].tolist() == [1024 // 6 + 3 * 1024 // 40, 1024 // 6 + 9 * 1024 // 40]
+
+    def test_caps_and_dense_mode(self):
+        phrase = "one two three four five six seven eight nine ten eleven"
+        assert len(geometry.base_glyphs(phrase, 1024, 7)['x']) == geometry.BASE_GLYPH_LIMIT
+        assert len(geometry.word_glyphs(phrase, 1024, 7)['x']) == geometry.WORD_GLYPH_LIMIT
+        assert len(geometry.base_glyphs(phrase, 1024, 7, None)['x']) == len(phrase)
+        assert len(geometry.word_glyphs(phrase, 1024, 7, None)['x']) == 11
+
+    def test_empty_phrase(self):
+        assert len(geometry.base_glyphs("", 1024, 7)['x']) == 0
+        assert len(geometry.word_glyphs("   ", 1024, 7)['x']) == 0
+
+class TestVectorizedDrawing:
+    """Test the array-driven patterns draw exactly what the per-glyph loops drew"""
+
+    @pytest.mark.parametrize("dense", [False, True])
+    @pytest.mark.parametrize("size", [256, 1024, 2048])
+    def test_matches_scalar_loops(self, monkeypatch, dense, size):
+        gen = UltraRevolutionarySigilGenerator(dense_geometry=dense)
+        vectorized = [_draw(gen, phrase, size) for phrase in PHRASES]
+        monkeypatch.setattr(main, "NUMPY_AVAILABLE", False)
+        scalar = [_draw(gen, phrase, size) for phrase in PHRASES]
+        assert vectorized == scalar
+
+    def test_dense_geometry_is_part_of_render_key(self):
+        capped = UltraRevolutionarySigilGenerator(dense_geometry=False)
+        dense = UltraRevolutionarySigilGenerator(dense_geometry=True)
+        assert capped.render_key("abundance", "cosmic") != dense.render_key("abundance", "cosmic")
+        assert dense.worker_options()['dense_geometry'] is True
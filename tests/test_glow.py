@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Glow engine tests for Sigilcraft
+"""
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+from PIL import Image, ImageDraw, ImageFilter
+
+from glow import GlowEngine, gaussian_blur
+from main import UltraRevolutionarySigilGenerator
+
+MAX_MEAN_CHANNEL_DIFF = 1.0
+VIBES = ["mystical", "cosmic", "elemental", "crystal", "shadow", "light", "storm", "void"]
+DENSE_VIBES = {"shadow", "light", "storm", "void"}
+
+def _geometry(vibe, size=1024, phrase="abundance flows to me"):
+    gen = UltraRevolutionarySigilGenerator(glow_engine="pil")
+    style = gen.vibe_styles[vibe]
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    gen._create_base_pattern(draw, phrase, style, size)
+    gen._create_text_pattern(draw, phrase, style, size)
+    gen._create_vibe_pattern(draw, phrase, vibe, style, size)
+    return img, style
+
+def _mean_diff(a, b):
+    return np.abs(np.asarray(a, dtype=np.float32) - np.asarray(b, dtype=np.float32)).mean()
+
+class TestGaussianBlur:
+    """Test the NumPy blur against PIL's GaussianBlur"""
+
+    @pytest.mark.parametrize("sigma", [0.5, 1, 3, 5, 10])
+    def test_blur_matches_pil(self, sigma):
+        img, _ = _geometry("cosmic")
+        expected = np.asarray(img.filter(ImageFilter.GaussianBlur(sigma)), dtype=np.float32)
+        planar = np.ascontiguousarray(np.asarray(img, dtype=np.float32).transpose(2, 0, 1))
+        actual = gaussian_blur(planar, sigma).transpose(1, 2, 0)
+        assert actual.shape == expected.shape
+        assert np.abs(actual - expected).mean() < 0.5
+
+class TestGlowEngine:
+    """Test the vectorized effect chains against the PIL ones"""
+
+    @pytest.mark.parametrize("vibe", ["mystical", "light"])
+    def test_enhanced_effects_match_pil(self, vibe):
+        img, style = _geometry(vibe)
+        pil = UltraRevolutionarySigilGenerator(glow_engine="pil")._apply_enhanced_effects(img, style, "")
+        fast = UltraRevolutionarySigilGenerator(glow_engine="numpy")._apply_enhanced_effects(img, style, "")
+        assert fast.size == pil.size and fast.mode == "RGBA"
+        assert _mean_diff(fast, pil) < MAX_MEAN_CHANNEL_DIFF
+
+    @pytest.mark.parametrize("vibe", ["cosmic", "crystal"])
+    def test_ultra_effects_match_pil(self, vibe):
+        img, style = _geometry(vibe)
+        pil = UltraRevolutionarySigilGenerator(glow_engine="pil")._apply_ultra_effects(img, style, "", scale=2)
+        fast = UltraRevolutionarySigilGenerator(glow_engine="numpy")._apply_ultra_effects(img, style, "", scale=2)
+        assert _mean_diff(fast, pil) < MAX_MEAN_CHANNEL_DIFF
+
+    @pytest.mark.parametrize("vibe", VIBES)
+    def test_dense_vibes_fall_back_to_pil(self, vibe):
+        img, style = _geometry(vibe)
+        radii = UltraRevolutionarySigilGenerator()._glow_chain(style, True, scale=2)["radii"]
+        assert GlowEngine().outpaces_pil(img, radii) == (vibe not in DENSE_VIBES)
+        if vibe in DENSE_VIBES:
+            pil = UltraRevolutionarySigilGenerator(glow_engine="pil")._apply_ultra_effects(img, style, "", scale=2)
+            fast = UltraRevolutionarySigilGenerator(glow_engine="numpy")._apply_ultra_effects(img, style, "", scale=2)
+            assert fast.tobytes() == pil.tobytes()
+
+    def test_empty_image_is_returned_unchanged(self):
+        img = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+        out = GlowEngine().glow_stack(img, [2, 4], [1.0, 0.5], cascade=False)
+        assert out.tobytes() == img.tobytes()
+
+    def test_glow_engine_is_part_of_render_key(self):
+        pil = UltraRevolutionarySigilGenerator(glow_engine="pil")
+        fast = UltraRevolutionarySigilGenerator(glow_engine="numpy")
+        assert pil.render_key("abundance", "cosmic") != fast.render_key("abundance", "cosmic")
+
+    def test_unknown_glow_engine(self):
+        with pytest.raises(ValueError):
+            UltraRevolutionarySigilGenerator(glow_engine="opencl")
+
+def _best_of(fns, repeats=7):
+    """Best time of each function, run interleaved so they see the same machine noise"""
+    best = [float("inf")] * len(fns)
+    for _ in range(repeats + 1):
+        for index, fn in enumerate(fns):
+            start = time.perf_counter()
+            fn()
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+@pytest.mark.skipif(os.getenv("SIGIL_BENCHMARK") != "1", reason="set SIGIL_BENCHMARK=1 to run timing assertions")
+class TestGlowSpeed:
+    """Time the advanced effect stage per vibe against the PIL chain"""
+
+    @pytest.mark.parametrize("vibe", VIBES)
+    @pytest.mark.parametrize("size,scale", [(1024, 2), (2048, 1)])
+    def test_numpy_is_never_slower_than_pil(self, vibe, size, scale):
+        img, style = _geometry(vibe, size)
+        pil = UltraRevolutionarySigilGenerator(glow_engine="pil")
+        fast = UltraRevolutionarySigilGenerator(glow_engine="numpy")
+        pil_seconds, fast_seconds = _best_of([lambda: pil._apply_ultra_effects(img, style, "", scale=scale),
+                                              lambda: fast._apply_ultra_effects(img, style, "", scale=scale)])
+        # Dense vibes run the PIL chain either way; the rest must clearly win
+        speedup = 0.9 if vibe in DENSE_VIBES else 1.5
+        assert pil_seconds / fast_seconds >= speedup
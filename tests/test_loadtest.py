@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness tests for Sigilcraft
+"""
+import os
+import sys
+import json
+import random
+import threading
+import pytest
+from collections import Counter
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loadtest
+from loadtest import (HttpTarget, InProcessTarget, Workload, parse_mix, process_usage, run_load_test,
+                      summarize_step)
+from main import app
+
+@pytest.fixture
+def live_server():
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+class TestWorkload:
+    """Test the request mix"""
+
+    def test_phrases_follow_zipf(self):
+        workload = Workload(phrases=50, zipf_s=1.2, advanced_ratio=0.25)
+        rng = random.Random(7)
+        payloads = [workload.next_payload(rng) for _ in range(4000)]
+        counts = Counter(payload['phrase'] for payload in payloads)
+        ranked = [phrase for phrase, _ in counts.most_common(3)]
+        assert ranked[0] == workload.phrases[0]
+        assert counts[workload.phrases[0]] > 2 * counts[workload.phrases[1]] > 0
+        advanced = sum(payload['advanced'] for payload in payloads) / len(payloads)
+        assert 0.2 < advanced < 0.3
+
+    def test_vibe_mix_and_reproducibility(self):
+        workload = Workload(vibes=parse_mix('cosmic=3,storm=1'))
+        payloads = [workload.next_payload(random.Random(1)) for _ in range(3)]
+        assert payloads[0] == payloads[1] == payloads[2]
+        vibes = Counter(workload.next_payload(random.Random(seed))['vibe'] for seed in range(2000))
+        assert set(vibes) == {'cosmic', 'storm'} and 2.5 < vibes['cosmic'] / vibes['storm'] < 3.5
+
+    def test_parse_mix(self):
+        assert parse_mix('cosmic, storm=2') == {'cosmic': 1.0, 'storm': 2.0}
+        for text in ('', 'cosmic=0', 'cosmic=-1'):
+            with pytest.raises(ValueError):
+                parse_mix(text)
+
+class TestReport:
+    """Test step summaries and full runs"""
+
+    def test_summary_counts_errors_and_cache_outcomes(self):
+        samples = [(0.1, 200, 'hit'), (0.2, 200, 'miss'), (0.3, 503, None), (0.4, 'ConnectionResetError', None)]
+        step = summarize_step(4, samples, wall=2.0)
+        assert step['requests'] == 4 and step['rps'] == 2.0
+        assert step['error_rate'] == 0.5
+        assert step['errors'] == {'503': 1, 'ConnectionResetError': 1}
+        assert step['cache'] == {'hit': 1, 'miss': 1}
+        assert step['latency_ms']['p50'] == pytest.approx(250.0) and step['latency_ms']['max'] == 400.0
+
+    def test_in_process_run(self):
+        workload = Workload(phrases=1, vibes={'crystal': 1}, advanced_ratio=0)
+        report = run_load_test(InProcessTarget(), workload, [1, 2], duration=None, requests=3, warmup=1)
+        assert [step['concurrency'] for step in report['steps']] == [1, 2]
+        for step in report['steps']:
+            assert step['requests'] == 3 and step['error_rate'] == 0
+            assert step['cache'] == {'hit': 3}
+            assert step['cpu_seconds'] >= 0 and step['peak_rss_bytes'] > 0
+        json.dumps(report)
+        assert 'conc' in loadtest.format_report(report)
+
+    def test_http_run(self, live_server):
+        workload = Workload(phrases=1, vibes={'void': 1}, advanced_ratio=0, binary=True)
+        report = run_load_test(HttpTarget(live_server, pid=os.getpid()), workload, [2], duration=None,
+                               requests=4)
+        [step] = report['steps']
+        assert step['requests'] == 4 and step['error_rate'] == 0
+        assert report['meta']['target'] == 'http'
+
+    def test_connection_errors_are_reported(self):
+        workload = Workload(phrases=1, advanced_ratio=0)
+        report = run_load_test(HttpTarget('http://127.0.0.1:9', timeout=2), workload, [1], duration=None,
+                               requests=2)
+        [step] = report['steps']
+        assert step['error_rate'] == 1.0 and step['errors'] == {'ConnectionRefusedError': 2}
+        assert 'cpu_seconds' not in step
+
+    def test_process_usage(self):
+        usage = process_usage(os.getpid())
+        assert usage['cpu_seconds'] > 0 and usage['rss_bytes'] > 0
+        assert process_usage(None) is None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Stage timing, /metrics and Server-Timing tests for Sigilcraft
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, UltraRevolutionarySigilGenerator
+from render_metrics import Histogram, RenderMetrics, expose_value, server_timing
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+def _samples(text):
+    """Exposition lines as {series: value}, comments dropped"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            samples[series] = float(value)
+    return samples
+
+class TestExposition:
+    """Test the Prometheus text format"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = Histogram('sigil_test_seconds', 'Test histogram', ('vibe',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value, vibe='cosmic')
+        samples = _samples('\n'.join(hist.expose()))
+        assert samples['sigil_test_seconds_bucket{vibe="cosmic",le="0.1"}'] == 1
+        assert samples['sigil_test_seconds_bucket{vibe="cosmic",le="1.0"}'] == 3
+        assert samples['sigil_test_seconds_bucket{vibe="cosmic",le="+Inf"}'] == 4
+        assert samples['sigil_test_seconds_count{vibe="cosmic"}'] == 4
+        assert samples['sigil_test_seconds_sum{vibe="cosmic"}'] == pytest.approx(6.05)
+
+    def test_label_values_are_escaped(self):
+        lines = expose_value('sigil_test', 'gauge', 'Test gauge', [({'phrase': 'say "hi"\\n'}, 1)])
+        assert lines[-1] == 'sigil_test{phrase="say \\"hi\\"\\\\n"} 1'
+
+    def test_render_observation_feeds_stage_histograms(self):
+        metrics = RenderMetrics()
+        metrics.observe_render('cosmic', True, 0.5, {'effects': 120.0, 'encode': 300.0})
+        assert metrics.renders.count(vibe='cosmic', advanced='true') == 1
+        assert metrics.stages.count(stage='encode', vibe='cosmic', advanced='true') == 1
+
+    def test_server_timing_format(self):
+        header = server_timing({'effects': 1.234, 'encode': 5.0}, 7.5, 'miss')
+        assert header == 'cache;desc="miss", effects;dur=1.23, encode;dur=5.00, total;dur=7.50'
+
+class TestStageTimings:
+    """Test that renders report where their time went"""
+
+    def test_render_reports_every_stage(self):
+        gen = UltraRevolutionarySigilGenerator()
+        _, info = gen._render_image("abundance flows to me", "cosmic", True, 2)
+        assert set(info['stages_ms']) == {'seed', 'base', 'text', 'vibe', 'rasterize', 'effects', 'resize', 'encode'}
+        assert all(ms >= 0 for ms in info['stages_ms'].values())
+
+    def test_generator_observes_fresh_renders_only(self):
+        gen = UltraRevolutionarySigilGenerator(cache=None)
+        gen.metrics = RenderMetrics()
+        gen.generate_sigil_image("abundance flows to me", "storm")
+        assert gen.metrics.renders.count(vibe='storm', advanced='false') == 1
+        assert gen.metrics.stages.count(stage='effects', vibe='storm', advanced='false') == 1
+
+class TestMetricsEndpoint:
+    """Test /metrics and Server-Timing through the API"""
+
+    def test_generate_sends_server_timing(self, client):
+        response = client.post('/api/generate', json={'phrase': 'server timing', 'vibe': 'light'})
+        assert response.status_code == 200
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('cache;desc="miss"')
+        assert 'effects;dur=' in timing and 'encode;dur=' in timing and 'total;dur=' in timing
+        assert 'stages_ms' in response.get_json()['metadata']['encoding']
+
+        cached = client.post('/api/generate', json={'phrase': 'server timing', 'vibe': 'light'},
+                             headers={'Accept': 'image/png'})
+        assert cached.headers['Server-Timing'].startswith('cache;desc="hit"')
+
+    def test_metrics_endpoint(self, client):
+        client.post('/api/generate', json={'phrase': 'scrape me', 'vibe': 'crystal', 'advanced': True})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        samples = _samples(response.get_data(as_text=True))
+        assert samples['sigil_render_stage_seconds_count{stage="effects",vibe="crystal",advanced="true"}'] >= 1
+        assert samples['sigil_render_seconds_count{vibe="crystal",advanced="true"}'] >= 1
+        assert samples['sigil_http_request_seconds_count{endpoint="/api/generate",method="POST",status="200"}'] >= 1
+        assert 'sigil_cache_hits_total' in samples
+        assert 'sigil_jobs_queued{lane="advanced"}' in samples
+        assert 'sigil_jobs_result_bytes' in samples
+        assert 'sigil_renders_in_flight' in samples
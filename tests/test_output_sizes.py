@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Arbitrary output size and tiled rendering tests for Sigilcraft
+"""
+import os
+import sys
+import time
+import threading
+import pytest
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+from PIL import Image, ImageDraw
+
+import main
+from main import app, UltraRevolutionarySigilGenerator
+from encoders import PngStreamWriter
+from render_cache import RenderCache
+from render_memory import MemoryBudget
+from scene import Scene
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+@pytest.fixture
+def small_tiles(monkeypatch):
+    """Tile anything above 256 px in 128 px tiles so tiled renders stay fast"""
+    monkeypatch.setattr(main, "TILE_THRESHOLD", 256)
+    monkeypatch.setattr(main, "TILE_SIZE", 128)
+
+def _decode(data):
+    return np.asarray(Image.open(BytesIO(data)).convert("RGBA"), dtype=np.float32)
+
+class TestSizeParameter:
+    """Test size validation and keying"""
+
+    def test_resolve_size(self):
+        gen = UltraRevolutionarySigilGenerator()
+        assert gen.resolve_size() == 1024
+        assert gen.resolve_size(512) == 512
+        for bad in (0, 32, main.MAX_OUTPUT_SIZE + 1, "512", True):
+            with pytest.raises(ValueError):
+                gen.resolve_size(bad)
+        with pytest.raises(ValueError):
+            gen.resolve_size(main.TILE_THRESHOLD + 1, "jpeg")
+        assert gen.resolve_size(main.TILE_THRESHOLD + 1, "svg") == main.TILE_THRESHOLD + 1
+
+    def test_size_is_part_of_render_key(self):
+        gen = UltraRevolutionarySigilGenerator()
+        assert gen.render_key("abundance", "cosmic") == gen.render_key("abundance", "cosmic", size=1024)
+        assert gen.render_key("abundance", "cosmic") != gen.render_key("abundance", "cosmic", size=512)
+
+    def test_render_at_requested_size(self):
+        gen = UltraRevolutionarySigilGenerator()
+        data, _ = gen.generate_sigil_image("abundance flows to me", "cosmic", size=512)
+        assert Image.open(BytesIO(data)).size == (512, 512)
+
+    def test_api_rejects_bad_sizes(self, client):
+        for payload in ({"size": 10}, {"size": 100000}, {"size": main.TILE_THRESHOLD * 2, "encoder": "jpeg"}):
+            response = client.post("/api/generate", json=dict(payload, phrase="too big"))
+            assert response.status_code == 400
+
+class TestSceneScaling:
+    """Test scene scaling and per-tile replay"""
+
+    def test_scaled_scene(self):
+        scene = Scene(100, glow={'radii': [2.0], 'intensities': [0.5]})
+        scene.line([(0, 0), (10, 20)], fill=(255, 0, 0), width=2)
+        double = scene.scaled(2)
+        assert double.size == 200 and double.glow['radii'] == [4.0]
+        assert double.primitives[0][1] == [(0, 0), (20, 40)]
+        assert double.primitives[0][2]['width'] == 4
+        assert scene.scaled(1) is scene
+
+    def test_regions_reassemble_the_full_replay(self):
+        scene = UltraRevolutionarySigilGenerator().build_scene("abundance flows to me", "cosmic", 256)
+        full = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
+        scene.replay(ImageDraw.Draw(full))
+
+        bounds = scene.bounds()
+        tiled = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
+        for top in (0, 128):
+            for left in (0, 128):
+                tile = Image.new("RGBA", (128, 128), (0, 0, 0, 0))
+                scene.replay_region(ImageDraw.Draw(tile), (left, top, left + 128, top + 128), bounds)
+                tiled.paste(tile, (left, top))
+        # Antialiasing-free primitives land on the same pixels; only seams may differ
+        differing = np.any(np.asarray(full) != np.asarray(tiled), axis=2).mean()
+        assert differing < 0.01
+
+class TestTiledRendering:
+    """Test the banded PNG stream against the in-memory renderer"""
+
+    def test_png_stream_writer_round_trips(self):
+        rows = np.random.default_rng(7).integers(0, 256, (37, 19, 4), dtype=np.uint8)
+        writer = PngStreamWriter(19, 37)
+        chunks = [writer.header(), writer.write_rows(rows[:10]), writer.write_rows(rows[10:]), writer.finish()]
+        assert np.array_equal(np.asarray(Image.open(BytesIO(b''.join(chunks)))), rows)
+
+    @pytest.mark.parametrize("advanced", [False, True])
+    def test_tiled_matches_full_render(self, monkeypatch, small_tiles, advanced):
+        gen = UltraRevolutionarySigilGenerator()
+        tiled = b''.join(gen.iter_tiled_png("abundance flows to me", "cosmic", advanced, size=384))
+        monkeypatch.setattr(main, "TILE_THRESHOLD", 1024)
+        full, _ = gen._render_image("abundance flows to me", "cosmic", advanced, 2, size=384)
+        tiled_pixels, full_pixels = _decode(tiled), _decode(full)
+        assert tiled_pixels.shape == full_pixels.shape == (384, 384, 4)
+        assert np.abs(tiled_pixels - full_pixels).mean() < 2
+
+    def test_api_streams_tiled_png(self, client, small_tiles):
+        response = client.post("/api/generate", json={"phrase": "print size", "size": 300, "format": "binary"})
+        assert response.status_code == 200
+        assert response.content_length is None
+        assert response.headers["X-Sigil-Size"] == "300"
+        assert Image.open(BytesIO(response.get_data())).size == (300, 300)
+
+class TestTiledStreams:
+    """Test what happens around a streamed print-size render"""
+
+    def test_over_budget_stream_is_refused_before_the_response(self, client, small_tiles, monkeypatch):
+        monkeypatch.setattr(main.generator, "memory_budget", MemoryBudget(limit_bytes=256 * 1024, policy="reject"))
+        response = client.post("/api/generate", json={"phrase": "too big to stream", "size": 300,
+                                                      "format": "binary"})
+        assert response.status_code == 503 and response.is_json
+
+    def test_identical_streams_share_one_render(self, small_tiles):
+        gen = UltraRevolutionarySigilGenerator(cache=RenderCache())
+        leader = gen.open_tiled_stream("shared print", "cosmic", size=300)
+        follower = []
+        thread = threading.Thread(target=lambda: follower.append(gen.open_tiled_stream("shared print", "cosmic",
+                                                                                        size=300)))
+        thread.start()
+        deadline = time.time() + 5
+        while gen.single_flight.stats()['coalesced'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        data = b''.join(leader)
+        leader.close()
+        thread.join(5)
+        assert b''.join(follower[0]) == data
+        assert gen.cache.get(gen.render_key("shared print", "cosmic", size=300)) == data
+        assert gen.memory_budget.stats()['reserved'] == 0
+
+    def test_closed_stream_releases_memory_and_is_not_cached(self, small_tiles):
+        gen = UltraRevolutionarySigilGenerator(cache=RenderCache())
+        stream = gen.open_tiled_stream("abandoned print", "cosmic", size=300)
+        next(stream)
+        assert gen.memory_budget.stats()['reserved'] > 0
+        stream.close()
+        assert gen.memory_budget.stats()['reserved'] == 0
+        assert gen.single_flight.stats()['in_flight'] == 0
+        # The next caller renders it afresh
+        data, info = gen.generate_sigil_image("abandoned print", "cosmic", size=300)
+        assert not info['cached'] and Image.open(BytesIO(data)).size == (300, 300)
+
+    def test_streams_only_with_the_inline_executor(self, client, small_tiles, monkeypatch):
+        class PoolStandIn:
+            kind = 'process'
+
+            def render(self, phrase, vibe, advanced, seed_version, encoder='png', size=None):
+                return main.generator._render_image(phrase, vibe, advanced, seed_version, encoder, size)
+
+        monkeypatch.setattr(main.generator, "executor", PoolStandIn())
+        response = client.post("/api/generate", json={"phrase": "pooled print", "size": 300, "format": "binary"})
+        # Rendered whole by the executor, so its length is known up front
+        assert response.status_code == 200 and response.content_length == len(response.get_data())
+        assert Image.open(BytesIO(response.get_data())).size == (300, 300)
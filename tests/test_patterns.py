@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Vibe pattern registry tests for Sigilcraft
+"""
+import os
+import sys
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import patterns
+from main import app, UltraRevolutionarySigilGenerator
+from patterns import PatternSpec, get_pattern, resolve_patterns
+from scene import Scene
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+def _vibe_layer(gen, vibe, size=512):
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    gen._create_vibe_pattern(ImageDraw.Draw(img), '', vibe, gen.vibe_styles[vibe], size)
+    return img
+
+class TestResolution:
+    """Test how declared base_patterns become pattern layers"""
+
+    def test_every_vibe_resolves_to_its_own_declared_patterns(self):
+        gen = UltraRevolutionarySigilGenerator()
+        for vibe, style in gen.vibe_styles.items():
+            layers = gen.vibe_patterns(vibe)
+            assert set(layers) <= set(style['base_patterns'])
+        assert gen.vibe_patterns('storm') == ('lightning_tree', 'electric_web')
+        assert gen.vibe_patterns('unknown vibe') == gen.vibe_patterns('mystical')
+
+    def test_unregistered_patterns_fall_back_to_sacred_circle(self):
+        assert resolve_patterns(['not_a_pattern']) == ('sacred_circle',)
+
+    def test_budget_limits_extra_layers_but_keeps_the_first(self):
+        declared = ['lightning_tree', 'electric_web']
+        assert resolve_patterns(declared, budget=None) == ('lightning_tree', 'electric_web')
+        assert resolve_patterns(declared, budget=40) == ('lightning_tree',)
+        assert resolve_patterns(declared, budget=0) == ('lightning_tree',)
+
+    def test_unknown_pattern_name(self):
+        with pytest.raises(ValueError):
+            get_pattern('nope')
+
+    def test_renderers_are_imported_on_first_use(self):
+        spec = PatternSpec('test_lazy', 1, 'pattern_renderers:brilliant_star')
+        assert not spec.loaded
+        spec.render(Scene(256), {'colors': [(255, 0, 0), (0, 255, 0)]}, 256)
+        assert spec.loaded
+
+class TestRendering:
+    """Test the images the registry draws"""
+
+    def test_former_fallback_vibes_get_their_own_layers(self):
+        gen = UltraRevolutionarySigilGenerator()
+        mystical = _vibe_layer(gen, 'mystical').tobytes()
+        layers = {vibe: _vibe_layer(gen, vibe).tobytes() for vibe in ('shadow', 'light', 'storm', 'void')}
+        assert all(layer != mystical for layer in layers.values())
+        assert len(set(layers.values())) == len(layers)
+
+    def test_layers_stay_on_the_canvas(self):
+        gen = UltraRevolutionarySigilGenerator()
+        for vibe in gen.vibe_styles:
+            scene = Scene(1024)
+            gen._create_vibe_pattern(scene, '', vibe, gen.vibe_styles[vibe], 1024)
+            for left, top, right, bottom in scene.bounds():
+                assert left >= 0 and top >= 0 and right <= 1024 and bottom <= 1024, vibe
+
+    def test_budget_changes_the_drawn_layers(self):
+        full = UltraRevolutionarySigilGenerator()
+        single = UltraRevolutionarySigilGenerator(pattern_budget=0)
+        assert single.vibe_patterns('void') == ('infinite_spiral',)
+        assert _vibe_layer(full, 'void').tobytes() != _vibe_layer(single, 'void').tobytes()
+        assert single.worker_options()['pattern_budget'] == 0
+
+class TestRenderKeys:
+    """Test that only vibes whose layers changed get new keys"""
+
+    def test_legacy_vibes_keep_their_keys(self):
+        full = UltraRevolutionarySigilGenerator()
+        single = UltraRevolutionarySigilGenerator(pattern_budget=0)
+        for vibe in ('mystical', 'cosmic', 'elemental', 'crystal', 'unknown vibe'):
+            assert full.render_key('phrase', vibe) == single.render_key('phrase', vibe)
+
+    def test_pattern_layers_are_part_of_the_key(self):
+        full = UltraRevolutionarySigilGenerator()
+        single = UltraRevolutionarySigilGenerator(pattern_budget=0)
+        for vibe in ('shadow', 'light', 'storm', 'void'):
+            assert full.render_key('phrase', vibe) != single.render_key('phrase', vibe)
+
+    def test_vibes_endpoint_lists_layers(self, client):
+        data = client.get('/api/vibes').get_json()
+        assert data['patterns']['storm']['layers'] == ['lightning_tree', 'electric_web']
+        assert data['patterns']['storm']['cost'] == patterns.pattern_cost(['lightning_tree', 'electric_web'])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Bulk pre-render tests for Sigilcraft
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import prerender
+import sigilcraft
+from main import UltraRevolutionarySigilGenerator
+from prerender import Progress, plan_renders, read_phrases
+from render_cache import RenderCache
+
+@pytest.fixture
+def generator():
+    return UltraRevolutionarySigilGenerator()
+
+@pytest.fixture
+def phrase_file(tmp_path):
+    path = tmp_path / 'phrases.txt'
+    path.write_text("I am calm\n# top phrases\n\nabundance flows\nx\n  I am calm  \n", encoding='utf-8')
+    return str(path)
+
+class TestPlan:
+    """Test phrase parsing and the render plan"""
+
+    def test_read_phrases(self):
+        lines = ["  I am calm \n", "# comment\n", "\n", "x\n", "I am calm\n", "y" * 501 + "\n", "protection\n"]
+        assert read_phrases(lines) == ['I am calm', 'protection']
+
+    def test_plan_matches_server_keys(self, generator):
+        plan = plan_renders(generator, ['I am calm', 'protection'], ['cosmic', 'storm'], (False, True))
+        assert len(plan) == 8
+        key, item = plan[0]
+        assert item == ('I am calm', 'cosmic', False, 2, 'png', 1024)
+        assert key == generator.render_key('I am calm', 'cosmic', False, None, None, None)
+
+    def test_legacy_seeds_are_refused(self, generator):
+        with pytest.raises(ValueError):
+            plan_renders(generator, ['I am calm'], ['cosmic'], (False,), seed_version=1)
+
+    def test_progress_reports_throughput(self):
+        now = [0.0]
+        lines = []
+        progress = Progress(10, interval=5, report=lines.append, clock=lambda: now[0])
+        progress.skipped = 2
+        progress.tick(force=True)
+        now[0], progress.rendered = 2.0, 4
+        progress.tick()
+        now[0] = 6.0
+        progress.tick()
+        progress.tick(force=True)
+        assert len(lines) == 2
+        assert lines[-1].startswith('⚡ 6/10 done') and '0.67 renders/s' in lines[-1] and '~6s left' in lines[-1]
+
+class TestPrerender:
+    """Test runs against a disk cache"""
+
+    def test_fills_cache_the_server_reads(self, generator, tmp_path):
+        cache = RenderCache(max_bytes=0, disk_dir=str(tmp_path))
+        plan = plan_renders(generator, ['I am calm'], ['crystal', 'void'], (False,))
+        summary = prerender.prerender(generator, cache, plan, workers=1, progress=Progress(2, report=str))
+        assert summary['rendered'] == 2 and summary['skipped'] == 0 and summary['failed'] == 0
+
+        server = UltraRevolutionarySigilGenerator(cache=RenderCache(disk_dir=str(tmp_path)))
+        data, info = server.generate_sigil_image('I am calm', 'void')
+        assert info['cached'] and server.cache.stats()['disk_hits'] == 1
+        assert data == generator._render_image('I am calm', 'void', False, 2, 'png', 1024)[0]
+        assert server.cache.get_meta(plan[1][0])['phrase'] == 'I am calm'
+
+    def test_resumes_and_counts_failures(self, generator, tmp_path, monkeypatch):
+        cache = RenderCache(max_bytes=0, disk_dir=str(tmp_path))
+        plan = plan_renders(generator, ['I am calm', 'protection'], ['crystal'], (False,))
+        prerender.prerender(generator, cache, plan[:1], workers=1, progress=Progress(1, report=str))
+
+        real_render = generator._render_image
+        def flaky(phrase, *args):
+            if phrase == 'protection':
+                raise RuntimeError("canvas lost")
+            return real_render(phrase, *args)
+        monkeypatch.setattr(generator, '_render_image', flaky)
+        summary = prerender.prerender(generator, cache, plan, workers=1, progress=Progress(2, report=str))
+        assert (summary['skipped'], summary['rendered'], summary['failed']) == (1, 0, 1)
+        assert plan[1][0] not in cache
+
+    def test_process_pool(self, generator, tmp_path):
+        cache = RenderCache(max_bytes=0, disk_dir=str(tmp_path))
+        plan = plan_renders(generator, ['I am calm', 'protection', 'clarity'], ['void'], (False,))
+        summary = prerender.prerender(generator, cache, plan, workers=2, progress=Progress(3, report=str))
+        assert summary['workers'] == 2 and summary['rendered'] == 3
+        assert all(key in cache for key, _ in plan)
+
+class TestCommandLine:
+    """Test the sigilcraft entry point"""
+
+    def test_prerender_command(self, phrase_file, tmp_path, capsys):
+        cache_dir = str(tmp_path / 'cache')
+        args = ['prerender', phrase_file, '--cache-dir', cache_dir, '--vibes', 'Void', '--mode', 'basic',
+                '--workers', '1']
+        assert sigilcraft.main(args) == 0
+        assert '2 rendered, 0 already cached' in capsys.readouterr().out
+        assert sigilcraft.main(args) == 0
+        assert '0 rendered, 2 already cached' in capsys.readouterr().out
+
+    def test_requires_a_disk_cache(self, phrase_file, monkeypatch):
+        monkeypatch.delenv('SIGIL_CACHE_DIR', raising=False)
+        with pytest.raises(SystemExit):
+            sigilcraft.main(['prerender', phrase_file])
+
+    def test_unknown_vibe_and_command(self, phrase_file, tmp_path):
+        with pytest.raises(SystemExit):
+            sigilcraft.main(['prerender', phrase_file, '--cache-dir', str(tmp_path), '--vibes', 'disco'])
+        assert sigilcraft.main(['paint']) == 2
+        assert sigilcraft.main([]) == 2
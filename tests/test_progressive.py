@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Progressive (preview-first) rendering tests for Sigilcraft
+"""
+import os
+import sys
+import json
+import base64
+import pytest
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from main import app, UltraRevolutionarySigilGenerator, PREVIEW_SIZE
+from render_cache import RenderCache
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+def _events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+class TestPreview:
+    """Test UltraRevolutionarySigilGenerator.generate_sigil_preview"""
+
+    def test_preview_is_small_and_deterministic(self):
+        gen = UltraRevolutionarySigilGenerator()
+        data, info = gen.generate_sigil_preview("abundance flows", "cosmic")
+        assert Image.open(BytesIO(data)).size == (PREVIEW_SIZE, PREVIEW_SIZE)
+        assert info['size'] == PREVIEW_SIZE and info['cached'] is False
+        assert gen.generate_sigil_preview("abundance flows", "cosmic")[0] == data
+
+    def test_preview_is_skipped_when_final_is_cached(self):
+        gen = UltraRevolutionarySigilGenerator(cache=RenderCache())
+        stages = [stage for stage, _, _ in gen.iter_progressive("abundance", "light")]
+        assert stages == ['preview', 'final']
+        stages = [stage for stage, _, _ in gen.iter_progressive("abundance", "light")]
+        assert stages == ['final']
+
+class TestStreamEndpoint:
+    """Test /api/generate/stream"""
+
+    def test_preview_then_final(self, client):
+        response = client.post('/api/generate/stream', json={'phrase': 'progressive preview test', 'vibe': 'storm'})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = _events(response.get_data(as_text=True))
+        assert [event for event, _ in events] == ['preview', 'final']
+
+        preview, final = events[0][1], events[1][1]
+        assert Image.open(BytesIO(base64.b64decode(preview['image']))).size == (PREVIEW_SIZE, PREVIEW_SIZE)
+        assert Image.open(BytesIO(base64.b64decode(final['image']))).size == (1024, 1024)
+        assert final['metadata']['url'].endswith('.png')
+
+    def test_invalid_request(self, client):
+        response = client.post('/api/generate/stream', json={'phrase': 'x'})
+        assert response.status_code == 400
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Render cache tests for Sigilcraft
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render_cache import RenderCache
+from main import app, UltraRevolutionarySigilGenerator
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+class TestRenderCache:
+    """Test the memory and disk tiers"""
+
+    def test_hit_and_miss_counters(self):
+        cache = RenderCache(max_bytes=1024)
+        assert cache.get("a" * 64) is None
+        cache.put("a" * 64, b"png")
+        assert cache.get("a" * 64) == b"png"
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['bytes'] == 3
+
+    def test_lru_eviction_by_bytes(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("k1", b"12345")
+        cache.put("k2", b"12345")
+        cache.get("k1")
+        cache.put("k3", b"12345")
+        assert cache.get("k2") is None
+        assert cache.get("k1") == b"12345"
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] <= 10
+
+    def test_oversized_entries_are_not_kept_in_memory(self):
+        cache = RenderCache(max_bytes=4)
+        cache.put("big", b"12345")
+        assert cache.stats()['entries'] == 0
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        RenderCache(max_bytes=1024, disk_dir=str(tmp_path)).put("ab" + "c" * 62, b"png")
+        fresh = RenderCache(max_bytes=1024, disk_dir=str(tmp_path))
+        assert "ab" + "c" * 62 in fresh
+        assert fresh.get("ab" + "c" * 62) == b"png"
+        assert fresh.stats()['disk_hits'] == 1
+        assert fresh.stats()['entries'] == 1
+
+    def test_disk_tier_is_pruned_least_recently_used_first(self, tmp_path):
+        cache = RenderCache(max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=350)
+        keys = [f"{i:02d}" + "c" * 62 for i in range(3)]
+        for age, key in enumerate(keys):
+            cache.put(key, b"x" * 100, meta={'n': age})
+            os.utime(cache.disk_path(key), (1000 + age, 1000 + age))
+        # Reading the oldest image makes it the most recently used
+        assert cache.get(keys[0]) == b"x" * 100
+        cache.put("zz" + "c" * 62, b"x" * 100)
+        assert keys[0] in cache
+        assert keys[1] not in cache
+        stats = cache.stats()
+        assert stats['disk_bytes'] <= 350 and stats['disk_evictions'] >= 1
+        # The parameters outlive the image so the key can be rendered again
+        assert RenderCache(disk_dir=str(tmp_path)).get_meta(keys[1]) == {'n': 1}
+
+    def test_disk_limit_counts_files_already_on_disk(self, tmp_path):
+        RenderCache(max_bytes=0, disk_dir=str(tmp_path)).put("ab" + "c" * 62, b"x" * 100)
+        cache = RenderCache(max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=150)
+        assert cache.stats()['disk_bytes'] == 100
+        cache.put("cd" + "c" * 62, b"x" * 100)
+        assert "ab" + "c" * 62 not in cache and "cd" + "c" * 62 in cache
+
+    def test_disk_limit_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('SIGIL_CACHE_DIR', str(tmp_path))
+        monkeypatch.setenv('SIGIL_CACHE_DISK_MAX_MB', '2')
+        assert RenderCache.from_env().disk_max_bytes == 2 * 1024 * 1024
+
+class TestGeneratorCaching:
+    """Test generate_sigil goes through the cache"""
+
+    def test_repeat_request_is_served_from_cache(self):
+        cache = RenderCache()
+        gen = UltraRevolutionarySigilGenerator(cache=cache)
+        first = gen.generate_sigil("protection", "crystal", False, 2)
+        second = gen.generate_sigil("protection", "crystal", False, 2)
+        assert first == second
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['stores'] == 1
+
+    def test_legacy_seed_bypasses_cache(self):
+        cache = RenderCache()
+        gen = UltraRevolutionarySigilGenerator(cache=cache)
+        gen.generate_sigil("protection", "crystal", False, 1)
+        assert cache.stats()['stores'] == 0
+
+    def test_health_reports_cache_stats(self, client):
+        data = client.get("/health").get_json()
+        assert 'cache' in data
+        for field in ('hits', 'misses', 'evictions', 'bytes'):
+            assert field in data['cache']
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Render executor tests for Sigilcraft
+"""
+import os
+import sys
+import time
+import signal
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, generator, UltraRevolutionarySigilGenerator
+from render_executor import (InlineRenderExecutor, ProcessPoolRenderExecutor, RenderQueueFull,
+                             RenderTimeout, create_render_executor)
+
+class SlowGenerator:
+    """Stand-in generator for exercising queue limits and timeouts"""
+
+    def __init__(self, delay=0.5):
+        self.delay = delay
+
+    def generate_sigil_image(self, phrase, vibe, advanced, seed_version, encoder, size=None):
+        time.sleep(self.delay)
+        return phrase.encode(), {'encoder': encoder}
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+@pytest.fixture
+def pool():
+    executor = ProcessPoolRenderExecutor(UltraRevolutionarySigilGenerator, generator.worker_options(), pool_size=2)
+    yield executor
+    executor.shutdown()
+
+class TestProcessPoolRenderExecutor:
+    """Test the warm process pool"""
+
+    def test_pool_output_matches_inline(self, pool):
+        pool.start()
+        assert pool.stats()['started'] is True
+        expected = UltraRevolutionarySigilGenerator(**generator.worker_options()).generate_sigil_png("abundance", "cosmic")
+        image, info = pool.render("abundance", "cosmic", False, 2)
+        assert image == expected
+        assert info['encoder'] == "png"
+        assert pool.stats()['completed'] >= 1
+
+    def test_queue_depth_rejects_excess_jobs(self):
+        executor = ProcessPoolRenderExecutor(SlowGenerator, pool_size=1, queue_depth=1)
+        try:
+            future = executor.submit("first", "cosmic", False, 2)
+            with pytest.raises(RenderQueueFull):
+                executor.submit("second", "cosmic", False, 2)
+            assert future.result(timeout=10)[0] == b"first"
+            assert executor.stats()['rejected'] == 1
+        finally:
+            executor.shutdown()
+
+    def test_pool_recovers_after_a_child_dies(self, pool):
+        pool.start()
+        broken = pool._pool
+        os.kill(next(iter(broken._processes)), signal.SIGKILL)
+        deadline = time.time() + 10
+        while not broken._broken and time.time() < deadline:
+            time.sleep(0.05)
+        image, info = pool.render("abundance", "cosmic", False, 2)
+        assert image.startswith(b"\x89PNG")
+        stats = pool.stats()
+        assert stats['failed'] == 1
+        assert stats['restarts'] == 1
+        assert pool._pool is not broken
+
+    def test_failed_rebuild_reports_broken(self, monkeypatch):
+        errors = []
+        executor = ProcessPoolRenderExecutor(SlowGenerator, {'delay': 0}, pool_size=1, on_broken=errors.append)
+        try:
+            executor.start()
+            os.kill(next(iter(executor._pool._processes)), signal.SIGKILL)
+            deadline = time.time() + 10
+            while not executor._pool._broken and time.time() < deadline:
+                time.sleep(0.05)
+
+            pools = [executor._pool]
+
+            def rebuild():
+                if pools:
+                    return pools.pop()
+                raise OSError("no more processes")
+            monkeypatch.setattr(executor, '_ensure_pool', rebuild)
+            with pytest.raises(OSError):
+                executor.submit("after", "cosmic", False, 2)
+            assert errors and "could not be rebuilt" in errors[0]
+            assert executor.stats()['in_flight'] == 0
+        finally:
+            monkeypatch.undo()
+            executor.shutdown()
+
+    def test_timeout(self):
+        executor = ProcessPoolRenderExecutor(SlowGenerator, {'delay': 2}, pool_size=1, timeout=0.1)
+        try:
+            with pytest.raises(RenderTimeout):
+                executor.render("slow", "cosmic", False, 2)
+            assert executor.stats()['timeouts'] == 1
+        finally:
+            executor.shutdown(wait=False)
+
+class TestInlineRenderExecutor:
+    """Test the in-thread executor"""
+
+    def test_counts_are_not_lost_across_threads(self):
+        def render(phrase, *args):
+            if phrase == "bad":
+                raise ValueError(phrase)
+            return b"", {}
+        executor = InlineRenderExecutor(render)
+
+        def run(phrase):
+            for _ in range(500):
+                executor.submit(phrase, "cosmic", False, 2)
+        threads = [threading.Thread(target=run, args=(phrase,)) for phrase in ("ok", "bad") * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = executor.stats()
+        assert (stats['completed'], stats['failed'], stats['in_flight']) == (2000, 2000, 0)
+
+class TestExecutorSelection:
+    """Test executor configuration and API integration"""
+
+    def test_create_inline_by_default(self, monkeypatch):
+        monkeypatch.delenv('SIGIL_RENDER_EXECUTOR', raising=False)
+        executor = create_render_executor(None, lambda *args: b"", UltraRevolutionarySigilGenerator, {})
+        assert isinstance(executor, InlineRenderExecutor)
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            create_render_executor('gpu', lambda *args: b"", UltraRevolutionarySigilGenerator, {})
+
+    def test_health_reports_executor(self, client):
+        data = client.get("/health").get_json()
+        assert data['executor']['kind'] in ('inline', 'process')
+
+    def test_full_queue_returns_503(self, client, monkeypatch):
+        class FullExecutor(InlineRenderExecutor):
+            def render(self, *args):
+                raise RenderQueueFull("Render queue is full")
+
+        monkeypatch.setattr(generator, 'executor', FullExecutor(None))
+        monkeypatch.setattr(generator, 'cache', None)
+        response = client.post("/api/generate", json={"phrase": "queue test"})
+        assert response.status_code == 503
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Render job queue tests for Sigilcraft
+"""
+import os
+import sys
+import base64
+import threading
+import time
+import pytest
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from main import app, PREVIEW_SIZE
+from render_executor import RenderQueueFull
+from render_jobs import RenderJobQueue
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+def _gated_task(gate, order, name):
+    def task():
+        gate.wait(5)
+        order.append(name)
+        return name.encode(), {'mimetype': 'image/png'}
+    return task
+
+def _wait_running(job):
+    deadline = time.time() + 5
+    while job.status == 'queued' and time.time() < deadline:
+        time.sleep(0.01)
+
+class TestRenderJobQueue:
+    """Test RenderJobQueue scheduling, deduplication and retention"""
+
+    def test_identical_keys_share_one_job(self):
+        jobs = RenderJobQueue(workers=1)
+        gate, order = threading.Event(), []
+        first, created = jobs.submit('k', 'standard', _gated_task(gate, order, 'a'))
+        again, created_again = jobs.submit('k', 'standard', _gated_task(gate, order, 'b'))
+        assert created and not created_again
+        assert again is first and first.attached == 1
+        gate.set()
+        assert first.wait(5)
+        assert first.result[0] == b'a' and order == ['a']
+        assert jobs.stats()['deduplicated'] == 1
+
+    def test_preview_lane_runs_before_advanced(self):
+        jobs = RenderJobQueue(workers=1)
+        blocker, order = threading.Event(), []
+        running, _ = jobs.submit('busy', 'standard', _gated_task(blocker, order, 'busy'))
+        _wait_running(running)
+        advanced, _ = jobs.submit('adv', 'advanced', _gated_task(threading.Event(), order, 'adv'))
+        preview, _ = jobs.submit('pre', 'preview', _gated_task(threading.Event(), order, 'pre'))
+        blocker.set()
+        assert advanced.wait(15) and preview.wait(15)
+        assert order == ['busy', 'pre', 'adv']
+
+    def test_finished_jobs_expire(self):
+        jobs = RenderJobQueue(workers=1, result_ttl=0)
+        gate = threading.Event()
+        gate.set()
+        job, _ = jobs.submit('k', 'standard', _gated_task(gate, [], 'a'))
+        assert job.wait(5)
+        assert jobs.get(job.id) is None
+        _, created = jobs.submit('k', 'standard', _gated_task(gate, [], 'a'))
+        assert created
+
+    def test_retained_results_are_capped(self):
+        jobs = RenderJobQueue(workers=1, max_result_bytes=10)
+        def task(size):
+            return lambda: (b'x' * size, {'mimetype': 'image/png'})
+        first, _ = jobs.submit('a', 'standard', task(6))
+        assert first.wait(5)
+        second, _ = jobs.submit('b', 'standard', task(6))
+        assert second.wait(5)
+        assert jobs.get(first.id) is None and jobs.get(second.id) is second
+        stats = jobs.stats()
+        assert stats['result_bytes'] == 6 and stats['evicted'] == 1
+        # A result over the whole cap is still kept until the next one finishes
+        big, _ = jobs.submit('c', 'standard', task(50))
+        assert big.wait(5) and jobs.get(big.id) is big and jobs.get(second.id) is None
+        _, created = jobs.submit('a', 'standard', task(6))
+        assert created
+
+    def test_failed_jobs_are_retried(self):
+        jobs = RenderJobQueue(workers=1)
+        def boom():
+            raise RuntimeError('boom')
+        failed, _ = jobs.submit('k', 'standard', boom)
+        assert failed.wait(5) and failed.status == 'failed' and failed.error == 'boom'
+        retry, created = jobs.submit('k', 'standard', boom)
+        assert created and retry is not failed
+
+    def test_worker_survives_base_exceptions(self):
+        jobs = RenderJobQueue(workers=1)
+        def exit_task():
+            raise SystemExit(3)
+        failed, _ = jobs.submit('exit', 'standard', exit_task)
+        assert failed.wait(5) and failed.status == 'failed'
+        gate = threading.Event()
+        gate.set()
+        after, _ = jobs.submit('after', 'standard', _gated_task(gate, [], 'after'))
+        assert after.wait(5) and after.status == 'done'
+        assert jobs.stats()['failed'] == 1
+
+    def test_full_queue_is_rejected(self):
+        jobs = RenderJobQueue(workers=1, max_queued=1)
+        gate = threading.Event()
+        _wait_running(jobs.submit('a', 'standard', _gated_task(gate, [], 'a'))[0])
+        jobs.submit('b', 'standard', _gated_task(gate, [], 'b'))
+        with pytest.raises(RenderQueueFull):
+            jobs.submit('c', 'standard', _gated_task(gate, [], 'c'))
+        gate.set()
+
+class TestJobEndpoints:
+    """Test /api/jobs"""
+
+    def test_submit_and_poll(self, client):
+        response = client.post('/api/jobs', json={'phrase': 'queued job test', 'vibe': 'void'})
+        assert response.status_code == 202
+        job = response.get_json()
+        assert response.headers['Location'] == f"/api/jobs/{job['job_id']}"
+        assert job['lane'] == 'standard'
+
+        again = client.post('/api/jobs', json={'phrase': 'queued job test', 'vibe': 'void'}).get_json()
+        assert again['job_id'] == job['job_id'] and again['deduplicated']
+
+        result = client.get(f"/api/jobs/{job['job_id']}?wait=30").get_json()
+        assert result['status'] == 'done'
+        assert Image.open(BytesIO(base64.b64decode(result['image']))).size == (1024, 1024)
+        assert client.get(result['url']).status_code == 200
+
+    def test_preview_job(self, client):
+        job = client.post('/api/jobs', json={'phrase': 'queued preview test', 'preview': True}).get_json()
+        assert job['lane'] == 'preview'
+        result = client.get(f"/api/jobs/{job['job_id']}?wait=30").get_json()
+        assert Image.open(BytesIO(base64.b64decode(result['image']))).size == (PREVIEW_SIZE, PREVIEW_SIZE)
+
+    def test_unknown_job(self, client):
+        assert client.get('/api/jobs/does-not-exist').status_code == 404
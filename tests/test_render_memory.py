@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Buffer pool and memory budget tests for Sigilcraft
+"""
+import os
+import sys
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from main import app, UltraRevolutionarySigilGenerator
+from render_executor import RenderQueueFull
+from render_memory import BufferPool, MemoryBudget, RenderMemoryExceeded
+
+MiB = 1024 * 1024
+
+class EchoGenerator:
+    """Stand-in pool generator that returns the phrase after a short render"""
+
+    def generate_sigil_image(self, phrase, vibe, advanced, seed_version, encoder, size=None):
+        time.sleep(0.2)
+        return phrase.encode(), {'encoder': encoder}
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+class TestBufferPool:
+    """Test canvas reuse"""
+
+    def test_released_canvases_are_reused_cleared(self):
+        pool = BufferPool()
+        img = pool.acquire('RGBA', (16, 16))
+        img.paste((255, 0, 0, 255), (0, 0, 8, 8))
+        pool.release(img)
+
+        again = pool.acquire('RGBA', (16, 16))
+        assert again is img
+        assert again.getextrema() == ((0, 0),) * 4
+        assert pool.acquire('RGBA', (16, 16)) is not img
+        assert pool.stats()['hits'] == 1 and pool.stats()['misses'] == 2
+
+    def test_keys_are_mode_and_size(self):
+        pool = BufferPool()
+        with pool.canvas('RGBA', (8, 8)) as img:
+            pass
+        assert pool.acquire('RGBA', (8, 9)) is not img
+        assert pool.acquire('RGB', (8, 8)) is not img
+        assert pool.acquire('RGBA', (8, 8)) is img
+
+    def test_pool_is_bounded(self):
+        pool = BufferPool(max_bytes=3 * 16 * 16 * 4, max_per_key=2)
+        for _ in range(3):
+            pool.release(Image.new('RGBA', (16, 16)))
+        assert pool.stats()['idle'] == 2
+        pool.release(Image.new('RGBA', (16, 32)))
+        assert pool.stats()['bytes'] <= pool.max_bytes
+        pool.release(Image.new('RGBA', (64, 64)))
+        assert pool.stats()['bytes'] <= pool.max_bytes
+
+class TestMemoryBudget:
+    """Test admission control"""
+
+    def test_oversized_render_is_rejected(self):
+        budget = MemoryBudget(limit_bytes=10 * MiB)
+        with pytest.raises(RenderMemoryExceeded):
+            budget.acquire(11 * MiB)
+        assert issubclass(RenderMemoryExceeded, RenderQueueFull)
+
+    def test_reject_policy_fails_fast(self):
+        budget = MemoryBudget(limit_bytes=10 * MiB, policy='reject')
+        with budget.reserve(6 * MiB):
+            with pytest.raises(RenderMemoryExceeded):
+                budget.acquire(6 * MiB)
+        budget.acquire(6 * MiB)
+        assert budget.stats()['rejected'] == 1 and budget.stats()['reserved'] == 6 * MiB
+
+    def test_queue_policy_waits_for_room(self):
+        budget = MemoryBudget(limit_bytes=10 * MiB, policy='queue', wait=5)
+        budget.acquire(6 * MiB)
+        admitted = threading.Event()
+
+        def second():
+            with budget.reserve(6 * MiB):
+                admitted.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+        budget.release(6 * MiB)
+        thread.join(5)
+        assert admitted.is_set()
+        assert budget.stats()['waited'] == 1 and budget.stats()['reserved'] == 0
+
+    def test_queue_policy_times_out(self):
+        budget = MemoryBudget(limit_bytes=10 * MiB, policy='queue', wait=0.05)
+        budget.acquire(6 * MiB)
+        with pytest.raises(RenderMemoryExceeded):
+            budget.acquire(6 * MiB)
+
+    def test_zero_limit_disables_the_budget(self):
+        budget = MemoryBudget(limit_bytes=0)
+        budget.acquire(10 ** 12)
+        assert budget.stats()['reserved'] == 0
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            MemoryBudget(policy='drop')
+
+class TestGeneratorMemory:
+    """Test the generator's use of the pool and the budget"""
+
+    def test_renders_reuse_canvases_and_return_their_reservation(self):
+        gen = UltraRevolutionarySigilGenerator()
+        first, _ = gen._render_image("abundance flows to me", "cosmic", False, 2)
+        second, _ = gen._render_image("abundance flows to me", "cosmic", False, 2)
+        assert first == second
+        assert gen.buffer_pool.stats()['hits'] >= 1
+        assert gen.memory_budget.stats()['reserved'] == 0
+
+    def test_render_over_budget_is_rejected(self):
+        gen = UltraRevolutionarySigilGenerator()
+        gen.memory_budget = MemoryBudget(limit_bytes=gen.estimate_render_bytes(1024, True) - 1)
+        with pytest.raises(RenderMemoryExceeded):
+            gen._render_image("abundance flows to me", "cosmic", True, 2)
+        gen._render_image("abundance flows to me", "cosmic", False, 2)
+
+    def test_api_returns_503_when_over_budget(self, client, monkeypatch):
+        import main
+        monkeypatch.setattr(main.generator, "memory_budget", MemoryBudget(limit_bytes=MiB))
+        monkeypatch.setattr(main.generator, "cache", None)
+        response = client.post("/api/generate", json={"phrase": "too heavy for this worker"})
+        assert response.status_code == 503
+        assert client.get("/health").get_json()['memory']['budget']['limit_bytes'] > 0
+
+    def test_concurrent_tiled_renders_that_fit_in_turn_both_finish(self, monkeypatch):
+        import main
+        monkeypatch.setattr(main, "TILE_THRESHOLD", 256)
+        monkeypatch.setattr(main, "TILE_SIZE", 128)
+        gen = UltraRevolutionarySigilGenerator()
+        gen._render_image("abundance flows to me", "cosmic", False, 2, size=384)
+        # Room for exactly one tiled render; a render that waits while holding part of it would deadlock
+        gen.memory_budget = MemoryBudget(limit_bytes=gen.memory_budget.stats()['peak_reserved'], wait=30)
+        errors = []
+
+        def render(phrase):
+            try:
+                gen._render_image(phrase, "cosmic", False, 2, size=384)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=render, args=(phrase,)) for phrase in ("first print", "second print")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        assert errors == []
+        assert gen.memory_budget.stats()['admitted'] == 2 and gen.memory_budget.stats()['reserved'] == 0
+
+    def test_render_bytes_matches_what_a_render_reserves(self, monkeypatch):
+        import main
+        gen = UltraRevolutionarySigilGenerator()
+        assert gen.render_bytes("any", "cosmic", True, 2) == gen.estimate_render_bytes(1024, True)
+        assert gen.render_bytes("any", "cosmic", False, 2, 'svg') == 0
+        monkeypatch.setattr(main, "TILE_THRESHOLD", 256)
+        gen._render_image("abundance flows to me", "cosmic", False, 2, size=384)
+        assert gen.memory_budget.stats()['peak_reserved'] == gen.render_bytes("any", "cosmic", False, 2, size=384)
+
+class TestPoolAdmission:
+    """Test the process pool admitting jobs against the serving worker's budget"""
+
+    def test_default_render_fits_with_a_pool_per_cpu(self, monkeypatch):
+        from render_executor import ProcessPoolRenderExecutor
+        gen = UltraRevolutionarySigilGenerator()
+        # Room for one advanced render; any per-child share of it would be too small
+        limit = gen.estimate_render_bytes(1024, True) * 3 // 2
+        monkeypatch.setenv("SIGIL_WORKER_MEMORY_MB", str(limit / MiB))
+        budget = MemoryBudget(limit_bytes=limit, wait=60)
+        pool = ProcessPoolRenderExecutor(UltraRevolutionarySigilGenerator, gen.worker_options(),
+                                         pool_size=max(os.cpu_count() or 1, 4),
+                                         memory_budget=budget, estimate_bytes=gen.render_bytes)
+        try:
+            image, _ = pool.render("abundance flows to me", "cosmic", True, 2)
+            assert image and budget.stats()['admitted'] == 1
+            assert pool.stats()['completed'] == 1
+        finally:
+            pool.shutdown()
+        assert budget.stats()['reserved'] == 0
+
+    def test_jobs_over_the_pool_budget_are_rejected_until_one_finishes(self):
+        from render_executor import ProcessPoolRenderExecutor
+        budget = MemoryBudget(limit_bytes=10 * MiB, policy='reject')
+        pool = ProcessPoolRenderExecutor(EchoGenerator, pool_size=2, memory_budget=budget,
+                                         estimate_bytes=lambda *args: 6 * MiB)
+        try:
+            first = pool.submit("first", "cosmic", False, 2)
+            with pytest.raises(RenderMemoryExceeded):
+                pool.submit("second", "cosmic", False, 2)
+            assert first.result(timeout=30)[0] == b"first"
+            deadline = time.time() + 5
+            while budget.stats()['reserved'] and time.time() < deadline:
+                time.sleep(0.01)
+            assert budget.stats()['reserved'] == 0
+            assert pool.submit("third", "cosmic", False, 2).result(timeout=30)[0] == b"third"
+        finally:
+            pool.shutdown()
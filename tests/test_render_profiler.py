@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Slow and sampled render profiling tests for Sigilcraft
+"""
+import os
+import sys
+import json
+import time
+import pstats
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import UltraRevolutionarySigilGenerator
+from render_profiler import RenderProfiler
+
+def _busy(seconds):
+    """Spin in Python code so the sampler has frames to see"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+def _profiles(directory, suffix):
+    return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+
+class TestRenderProfiler:
+    """Test triggers, output formats and rotation"""
+
+    def test_disabled_by_default(self, tmp_path):
+        assert not RenderProfiler().enabled
+        assert not RenderProfiler(directory=str(tmp_path)).enabled
+        with RenderProfiler(directory=str(tmp_path)).profile({}):
+            pass
+        assert os.listdir(tmp_path) == []
+
+    def test_slow_renders_are_kept_with_their_parameters(self, tmp_path):
+        profiler = RenderProfiler(directory=str(tmp_path), slow_ms=20, interval=0.001)
+        with profiler.profile({'phrase': 'fast'}):
+            pass
+        with profiler.profile({'phrase': 'slow'}):
+            _busy(0.05)
+
+        assert profiler.stats()['profiled'] == 2 and profiler.stats()['saved'] == 1
+        [meta_name] = _profiles(tmp_path, '.json')
+        meta = json.loads((tmp_path / meta_name).read_text())
+        assert meta['phrase'] == 'slow' and meta['trigger'] == 'slow' and meta['duration_ms'] >= 20
+        collapsed = (tmp_path / meta['profile']).read_text().splitlines()
+        assert collapsed and all(line.rsplit(' ', 1)[1].isdigit() for line in collapsed)
+        assert any('test_render_profiler.py:_busy' in line for line in collapsed)
+
+    def test_sampled_renders_are_kept_regardless_of_latency(self, tmp_path):
+        profiler = RenderProfiler(directory=str(tmp_path), sample_rate=1.0)
+        with profiler.profile({'phrase': 'sampled'}):
+            pass
+        [meta_name] = _profiles(tmp_path, '.json')
+        assert json.loads((tmp_path / meta_name).read_text())['trigger'] == 'sampled'
+
+    def test_cprofile_mode_writes_pstats(self, tmp_path):
+        profiler = RenderProfiler(directory=str(tmp_path), slow_ms=0, mode='cprofile')
+        with profiler.profile({'phrase': 'deterministic'}):
+            _busy(0.01)
+        [name] = _profiles(tmp_path, '.pstats')
+        functions = {func[2] for func in pstats.Stats(str(tmp_path / name)).stats}
+        assert '_busy' in functions
+
+    def test_rotation_keeps_the_newest_profiles(self, tmp_path):
+        profiler = RenderProfiler(directory=str(tmp_path), sample_rate=1.0, max_files=3)
+        for index in range(5):
+            with profiler.profile({'phrase': f'render {index}'}):
+                pass
+        phrases = sorted(json.loads((tmp_path / name).read_text())['phrase']
+                         for name in _profiles(tmp_path, '.json'))
+        assert phrases == ['render 2', 'render 3', 'render 4']
+        assert len(os.listdir(tmp_path)) == 6
+
+    def test_size_cap(self, tmp_path):
+        profiler = RenderProfiler(directory=str(tmp_path), sample_rate=1.0, max_bytes=1500)
+        for index in range(5):
+            with profiler.profile({'phrase': f'render {index}', 'padding': 'x' * 400}):
+                pass
+        assert sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)) <= 1500
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            RenderProfiler(mode='perf')
+
+class TestGeneratorProfiling:
+    """Test profiles taken around real renders"""
+
+    def test_slow_render_profile_includes_stage_timings(self, tmp_path):
+        gen = UltraRevolutionarySigilGenerator()
+        gen.profiler = RenderProfiler(directory=str(tmp_path), slow_ms=0)
+        gen._render_image("abundance flows to me", "cosmic", False, 2)
+        [meta_name] = _profiles(tmp_path, '.json')
+        meta = json.loads((tmp_path / meta_name).read_text())
+        assert meta['phrase'] == "abundance flows to me" and meta['vibe'] == "cosmic"
+        assert set(meta['stages_ms']) >= {'effects', 'encode'}
+        assert os.path.exists(tmp_path / meta['profile'])
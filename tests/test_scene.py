@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Scene graph and SVG backend tests for Sigilcraft
+"""
+import os
+import sys
+import base64
+import pytest
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from main import app, UltraRevolutionarySigilGenerator
+from encoders import encode_image, encode_scene
+from scene import Scene
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+class TestScene:
+    """Test the scene graph and its backends"""
+
+    def test_pil_backend_matches_direct_drawing(self):
+        gen = UltraRevolutionarySigilGenerator()
+        phrase, vibe = "abundance flows to me", "elemental"
+        style = gen.vibe_styles[vibe]
+        direct = Image.new("RGBA", (1024, 1024), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(direct)
+        gen._create_base_pattern(draw, phrase, style, 1024)
+        gen._create_text_pattern(draw, phrase, style, 1024)
+        gen._create_vibe_pattern(draw, phrase, vibe, style, 1024)
+
+        replayed = Image.new("RGBA", (1024, 1024), (0, 0, 0, 0))
+        gen.build_scene(phrase, vibe, 1024).replay(ImageDraw.Draw(replayed))
+        assert replayed.tobytes() == direct.tobytes()
+
+    def test_svg_has_one_element_per_primitive(self):
+        scene = Scene(100, glow={'radii': [2, 4], 'intensities': [0.8, 0.5]})
+        scene.line([(0, 0), (10, 10)], fill=(255, 0, 0), width=2)
+        scene.ellipse([10, 10, 20, 30], outline=(0, 255, 0), width=2)
+        scene.polygon([(0, 0), (5, 0), (5, 5)], outline=(0, 0, 255), width=1)
+        scene.rectangle([1, 2, 3, 4], fill=(1, 2, 3))
+
+        root = ET.fromstring(scene.to_svg())
+        assert root.get("viewBox") == "0 0 100 100"
+        shapes = [el.tag[len(SVG_NS):] for el in root.iter() if el.tag[len(SVG_NS):] in
+                  ("polyline", "ellipse", "polygon", "rect")]
+        assert shapes == ["polyline", "ellipse", "polygon", "rect"]
+        assert len(root.findall(f".//{SVG_NS}feGaussianBlur")) == 2
+        ellipse = root.find(f".//{SVG_NS}ellipse")
+        assert (ellipse.get("cx"), ellipse.get("ry"), ellipse.get("stroke")) == ("15", "10", "#00ff00")
+
+    def test_encoders_reject_the_wrong_input(self):
+        with pytest.raises(ValueError):
+            encode_image(Image.new("RGBA", (8, 8)), "svg")
+        with pytest.raises(ValueError):
+            encode_scene(Scene(8), "png")
+
+class TestSvgOutput:
+    """Test SVG output through the generator and the API"""
+
+    def test_svg_render_is_small_and_resolution_independent(self):
+        gen = UltraRevolutionarySigilGenerator()
+        svg, info = gen.generate_sigil_image("abundance flows to me", "cosmic", True, encoder="svg")
+        root = ET.fromstring(svg)
+        assert info['mimetype'] == "image/svg+xml"
+        assert root.get("viewBox") == "0 0 2048 2048" and root.get("width") == "1024"
+        assert len(svg) < gen.generate_sigil_image("abundance flows to me", "cosmic", True)[1]['bytes']
+
+    def test_svg_via_api(self, client):
+        response = client.post("/api/generate", json={"phrase": "vector sigil", "encoder": "svg"},
+                               headers={"Accept": "image/svg+xml"})
+        assert response.status_code == 200
+        assert response.mimetype == "image/svg+xml"
+        assert response.headers["Content-Location"].endswith(".svg")
+        assert client.get(response.headers["Content-Location"]).data == response.data
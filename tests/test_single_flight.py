@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing tests for Sigilcraft
+"""
+import os
+import sys
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import UltraRevolutionarySigilGenerator
+from single_flight import SingleFlight
+
+class CountingExecutor:
+    """Executor stand-in that holds every render until released"""
+
+    kind = 'inline'
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def render(self, phrase, vibe, advanced, seed_version, encoder='png', size=None):
+        self.calls += 1
+        self.release.wait(5)
+        return phrase.encode(), {'encoder': encoder, 'cached': False}
+
+def _wait_for(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+class TestSingleFlight:
+    """Test SingleFlight.do"""
+
+    def test_concurrent_callers_share_one_call(self):
+        flight, gate, calls = SingleFlight(), threading.Event(), []
+
+        def work():
+            calls.append(1)
+            gate.wait(5)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, 'key', work) for _ in range(4)]
+            _wait_for(lambda: flight.stats()['coalesced'] == 3)
+            gate.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert {value for value, _ in results} == {'result'}
+        assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 3}
+
+    def test_exceptions_reach_every_waiter(self):
+        flight, gate = SingleFlight(), threading.Event()
+
+        def work():
+            gate.wait(5)
+            raise RuntimeError('boom')
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(flight.do, 'key', work) for _ in range(2)]
+            _wait_for(lambda: flight.stats()['coalesced'] == 1)
+            gate.set()
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+    def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        assert flight.do('key', lambda: 1) == (1, False)
+        assert flight.do('key', lambda: 2) == (2, False)
+
+class TestGeneratorCoalescing:
+    """Test identical concurrent generate calls render once"""
+
+    def test_duplicate_requests_render_once(self):
+        gen = UltraRevolutionarySigilGenerator()
+        gen.executor = CountingExecutor()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(gen.generate_sigil_image, 'trending phrase', 'cosmic') for _ in range(5)]
+            _wait_for(lambda: gen.single_flight.stats()['coalesced'] == 4)
+            gen.executor.release.set()
+            results = [future.result() for future in futures]
+
+        assert gen.executor.calls == 1
+        assert {data for data, _ in results} == {b'trending phrase'}
+        assert sum(1 for _, info in results if info.get('coalesced')) == 4
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Warm-up and readiness tests for Sigilcraft
+"""
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import app, UltraRevolutionarySigilGenerator, PREVIEW_SIZE
+from render_executor import ProcessPoolRenderExecutor
+from warmup import WarmupState, parse_importtime, warm_up
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+class TestWarmUp:
+    """Test what a warm-up leaves behind"""
+
+    def test_warm_up_compiles_every_template_and_renders_once(self):
+        gen = UltraRevolutionarySigilGenerator()
+        state = warm_up(gen)
+        assert state.ready and state.error is None
+        assert set(state.phases) == {'pil', 'encoders', 'templates', 'render'}
+        for vibe in gen.vibe_styles:
+            for size in (1024, 2048, PREVIEW_SIZE):
+                assert (vibe, size) in gen._vibe_templates
+        assert gen.buffer_pool.stats()['bytes'] == 0
+
+    def test_warm_up_without_renders(self):
+        state = warm_up(UltraRevolutionarySigilGenerator(), render=False, template_sizes=[256])
+        assert state.ready and 'render' not in state.phases
+
+    def test_failed_render_is_not_ready(self, monkeypatch):
+        gen = UltraRevolutionarySigilGenerator()
+        def broken(*args, **kwargs):
+            raise RuntimeError("no canvas")
+        monkeypatch.setattr(gen, '_render_image', broken)
+        state = warm_up(gen)
+        assert not state.ready and 'no canvas' in state.error
+
+    def test_forked_state_is_not_ready_until_reset_and_warmed(self):
+        state = WarmupState()
+        state.mark_ready()
+        state.pid = -1  # as seen from a child forked after the parent warmed up
+        assert not state.ready
+        state.reset()
+        assert not state.ready
+        state.mark_ready()
+        assert state.ready
+
+    def test_forked_state_resets_itself_on_first_check(self):
+        forks = []
+        state = WarmupState(on_fork=lambda: forks.append(os.getpid()))
+        state.mark_ready()
+        state.pid = -1  # forked without anything calling reset()
+        assert not state.stats()['ready'] and forks == [os.getpid()]
+        state.mark_ready()
+        assert state.ready and forks == [os.getpid()]
+
+    def test_templates_use_the_generators_preview_size(self):
+        gen = UltraRevolutionarySigilGenerator()
+        gen.preview_size = 320
+        warm_up(gen, render=False)
+        assert ('void', 320) in gen._vibe_templates
+
+    def test_parse_importtime(self):
+        text = ("import time: self [us] | cumulative | imported package\n"
+                "import time:       120 |        120 |   _io\n"
+                "import time:      1431 |      60833 | numpy\n")
+        assert parse_importtime(text) == [('_io', 120, 120), ('numpy', 1431, 60833)]
+
+class TestReadiness:
+    """Test /ready against /health"""
+
+    def test_ready_once_warm(self, client):
+        response = client.get('/ready')
+        assert response.status_code == 200 and response.get_json()['ready']
+        assert client.get('/health').get_json()['warmup']['ready']
+
+    def test_not_ready_while_warming(self, client, monkeypatch):
+        monkeypatch.setattr(main, 'readiness', WarmupState())
+        response = client.get('/ready')
+        assert response.status_code == 503 and not response.get_json()['ready']
+        assert client.get('/health').status_code == 200
+
+    def test_worker_forked_without_the_hook_turns_ready(self, client, monkeypatch):
+        assert main.readiness.on_fork is main.start_worker
+        state = WarmupState(on_fork=main.start_worker)
+        state.mark_ready()
+        state.pid = -1  # as inherited under --preload without gunicorn_config
+        monkeypatch.setattr(main, 'readiness', state)
+        client.get('/ready')
+        deadline = time.monotonic() + 30
+        while not state.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get('/ready').status_code == 200
+        assert 'executor' in state.phases and state.pid == os.getpid()
+
+    def test_start_worker_starts_the_executor(self, monkeypatch):
+        monkeypatch.setattr(main, 'readiness', WarmupState())
+        pool = ProcessPoolRenderExecutor(UltraRevolutionarySigilGenerator, pool_size=1, warm=True)
+        monkeypatch.setattr(main.generator, 'executor', pool)
+        try:
+            main.start_worker().join(timeout=60)
+            assert main.readiness.ready and 'executor' in main.readiness.phases
+            assert pool.stats()['started']
+        finally:
+            pool.shutdown()
@@ -8,6 +8,15 @@ Production-ready Flask backend with WSGI server
 import os
 import sys
 import signal
+
+# Renders run in a warm process pool so request threads stay free for I/O
+os.environ.setdefault('SIGIL_RENDER_EXECUTOR', 'process')
+# Warm up in the --preload master so recycled workers start warm instead of cold
+os.environ.setdefault('SIGIL_WARMUP', 'true')
+GUNICORN_THREADS = os.environ.get('SIGIL_GUNICORN_THREADS', '8')
+# 'wsgi' serves the Flask app with gunicorn; 'asgi' serves asgi.py with uvicorn (falls back to wsgi)
+SERVER_MODE = os.environ.get('SIGIL_SERVER', 'wsgi').lower()
+
 from main import app as flask_app
 from flask import send_from_directory
 
@@ -45,6 +54,17 @@ if __name__ == '__main__':
     print("🎨 Ultra-revolutionary sigil generation ready!")
     print(f"🌍 Access your app at: https://your-repl-name.replit.app")
 
+    if SERVER_MODE == 'asgi':
+        try:
+            import uvicorn
+        except ImportError:
+            print("⚠️  Uvicorn not available - falling back to the WSGI server")
+        else:
+            print("✅ Uvicorn available - serving the async app (asgi.py)")
+            uvicorn.run('asgi:app', host='0.0.0.0', port=port, workers=1, lifespan='on',
+                        log_level='info')
+            sys.exit(0)
+
     # Always try to use Gunicorn for production-ready serving
     print("🚀 Attempting to run with production WSGI server...")
     
@@ -57,11 +77,13 @@ if __name__ == '__main__':
             'gunicorn',
             '--bind', f'0.0.0.0:{port}',
             '--workers', '1',  # Single worker for Replit's resource limits
-            '--worker-class', 'sync',
+            '--worker-class', 'gthread',  # Threads wait on the render pool; /health stays responsive
+            '--threads', GUNICORN_THREADS,
             '--timeout', '30',
             '--max-requests', '1000',
             '--max-requests-jitter', '100',
             '--preload',
+            '--config', 'python:gunicorn_config',
             '--log-level', 'info',
             '--access-logfile', '-',
             '--error-logfile', '-',
@@ -84,11 +106,13 @@ if __name__ == '__main__':
                 'gunicorn',
                 '--bind', f'0.0.0.0:{port}',
                 '--workers', '1',
-                '--worker-class', 'sync',
+                '--worker-class', 'gthread',
+                '--threads', GUNICORN_THREADS,
                 '--timeout', '30',
                 '--max-requests', '1000',
                 '--max-requests-jitter', '100',
                 '--preload',
+                '--config', 'python:gunicorn_config',
                 '--log-level', 'info',
                 '--access-logfile', '-',
                 '--error-logfile', '-',
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SIGILCRAFT WARM-UP
+Pre-fork warm-up of templates, encoders and code paths, plus per-process readiness
+
+Usage:
+    python warmup.py              # run a warm-up and print how long each phase took
+    python warmup.py --imports    # profile the import time of main.py by module
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from encoders import ENCODERS, encode_image, encode_scene
+from scene import Scene
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PHRASE = 'warm up'
+
+
+class WarmupState:
+    """Readiness of one process: warm-up phases, their timings and any failure.
+
+    A process that forks workers after warming up passes its state on; each
+    worker calls :meth:`reset` and finishes its own warm-up (its render pool)
+    before reporting ready again. A worker that never calls it is caught on
+    its first readiness check: the state resets itself there and calls
+    ``on_fork``, which should start the worker's own warm-up.
+    """
+
+    def __init__(self, on_fork: Optional[Callable[[], object]] = None):
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+        self.phases: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._ready = False
+        self.on_fork = on_fork
+
+    @property
+    def ready(self) -> bool:
+        self._check_fork()
+        return self._ready
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def mark_ready(self):
+        with self._lock:
+            self._ready = True
+
+    def fail(self, error: str):
+        with self._lock:
+            self.error = error
+            self._ready = False
+
+    def reset(self):
+        """Start over in a freshly forked process, keeping the phases inherited from the parent"""
+        with self._lock:
+            self._start_over()
+
+    def _check_fork(self):
+        with self._lock:
+            if self.pid == os.getpid():
+                return
+            self._start_over()
+        logger.info(f"🔥 Process {self.pid} was forked without a warm-up; starting it now")
+        if self.on_fork is not None:
+            self.on_fork()
+
+    def _start_over(self):
+        # Caller holds the lock
+        self.pid = os.getpid()
+        self.error = None
+        self._ready = False
+
+    def stats(self) -> Dict:
+        self._check_fork()
+        with self._lock:
+            return {
+                'ready': self._ready,
+                'pid': self.pid,
+                'phases_ms': dict(self.phases),
+                'error': self.error
+            }
+
+
+def warm_up(generator, state: Optional[WarmupState] = None, render: bool = True,
+            template_sizes: Optional[Sequence[int]] = None) -> WarmupState:
+    """Pay first-use costs up front: PIL plugins, every encoder, vibe templates and one render per mode.
+
+    Run before forking so workers inherit the warm state. Templates are
+    compiled at ``template_sizes`` (by default the generator's output size,
+    the 2x advanced canvas and its preview size). A failed render marks the state
+    failed; the other phases are best effort.
+    """
+    state = state or WarmupState()
+    start = time.perf_counter()
+
+    with state.phase('pil'):
+        Image.init()
+
+    with state.phase('encoders'):
+        sample = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
+        for name, encoder in ENCODERS.items():
+            try:
+                if encoder.vector:
+                    encode_scene(Scene(64), name)
+                else:
+                    encode_image(sample, name)
+            except Exception as e:
+                logger.warning(f"⚠️ Warm-up could not encode with {name}: {e}")
+
+    with state.phase('templates'):
+        sizes = template_sizes or sorted({generator.size, generator.size * 2, generator.preview_size})
+        sink = Scene(generator.size)
+        for vibe, style in generator.vibe_styles.items():
+            for size in sizes:
+                generator._draw_vibe_template(sink, vibe, style, size)
+
+    if render:
+        with state.phase('render'):
+            try:
+                for advanced in (False, True):
+                    generator._render_image(WARMUP_PHRASE, 'mystical', advanced,
+                                            generator.resolve_seed_version())
+            except Exception as e:
+                state.fail(f"Warm-up render failed: {e}")
+                logger.error(f"❌ {state.error}")
+                return state
+            finally:
+                # Canvases pooled by the warm-up would only be copied into every forked worker
+                generator.buffer_pool.clear()
+
+    state.mark_ready()
+    phases = ', '.join(f'{name} {ms:.0f} ms' for name, ms in state.phases.items())
+    logger.info(f"🔥 Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms ({phases})")
+    return state
+
+
+def parse_importtime(text: str) -> List[Tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` rows from ``python -X importtime`` output"""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def import_times(module: str = 'main', top: int = 20) -> List[Tuple[str, int, int]]:
+    """Import ``module`` in a fresh interpreter and return its slowest imports by cumulative time"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+    rows = parse_importtime(result.stderr)
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Warm up a sigil generator or profile its import time')
+    parser.add_argument('--imports', action='store_true', help='profile the import time of --module instead')
+    parser.add_argument('--module', default='main', help='module to import-profile (default: main)')
+    parser.add_argument('--top', type=int, default=20, help='number of imports to list')
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        rows = import_times(args.module, args.top)
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, self_us, cumulative_us in rows:
+            print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+        return 0
+
+    logging.getLogger('main').setLevel(logging.WARNING)
+    from main import UltraRevolutionarySigilGenerator
+    state = warm_up(UltraRevolutionarySigilGenerator())
+    for name, ms in state.phases.items():
+        print(f"{name:>10}: {ms:8.1f} ms")
+    return 0 if state.ready else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())